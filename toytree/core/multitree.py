@@ -41,7 +41,7 @@ import numpy as np
 from loguru import logger
 from toytree.utils import ToytreeError
 from toytree.core import ToyTree, Node
-from toytree.style import TreeStyle, get_base_tree_style_by_name, tree_style_to_css_dict
+from toytree.style import TreeStyle, get_base_tree_style_by_name
 from toytree.drawing.src.setup_canvas import get_canvas_and_axes
 from toytree.drawing.src.setup_grid import Grid
 from toytree.drawing.src.draw_cloudtree import draw_cloudtree
@@ -81,6 +81,8 @@ class MultiTree:
     def __init__(self, treelist: List[ToyTree]):
         self.treelist: List[ToyTree] = treelist
         """List of ToyTree objects in the MultiTree."""
+        self._consensus_tip_order: Optional[Tuple[Tuple, List[str]]] = None
+        """Cached consensus tip order used by draw_cloud_tree."""
 
         # self.data: pd.DataFrame = self._init_data(treelist, data)
         # """DataFrame with tree metadata (e.g., ipcoal.Model.df)."""
@@ -498,11 +500,13 @@ class MultiTree:
     def draw_cloud_tree(
         self,
         axes: Cartesian = None,
-        fixed_order: Sequence[str] = None,
+        fixed_order: Union[Sequence[str], bool] = None,
         jitter: float = 0.0,
         idxs: Optional[Sequence[int]] = None,
+        interior_algorithm: int = 1,
+        density: bool = False,
         **kwargs,
-    ):
+    ) -> Tuple[Canvas, Cartesian, Mark]:
         """Return a cloud of overlapping low-opacity tree drawings.
 
         Draw multiple trees overlapping in coordinate space. The
@@ -512,6 +516,12 @@ class MultiTree:
         styling options to further visualize patterns among subtrees
         within the cloud.
 
+        All trees are drawn in a single CloudTreeMark, in which the
+        edges of all trees that share the same edge style are merged
+        into a single SVG path, or optionally rendered as a density
+        raster image, making it efficient to draw thousands of trees.
+        Only linear layouts are supported.
+
         Parameters
         ----------
         axes: None or toyplot.coordinates.Cartesian
@@ -523,17 +533,25 @@ class MultiTree:
             multitree, the order of which will determine the fixed
             order of tips in plotted trees. If None (default) then a
             consensus tree is inferred and its ladderized tip order
-            is used.
+            is used. This is cached for repeated drawings.
         jitter: float
             A value by which to randomly shift the baseline of tree
             subplots so that they do not overlap perfectly. This adds
             a value drawn from np.random.uniform(-jitter, jitter).
         idxs: None or Sequence[int]
             Optional select indices of which trees to draw.
+        interior_algorithm: int
+            Place internal Nodes in the middle of their children (0)
+            or in the middle of their descendant tips (1).
+        density: bool
+            If True edges are rendered as a raster image of the density
+            of edges across trees rather than as SVG paths.
         **kwargs:
-            All drawing style arguments supported in the .draw()
-            function of toytree objects are also supported by
-            .draw_cloudtree(), most notably here, edge_style.
+            Drawing style arguments supported in the .draw() function
+            of toytree objects that apply to edges and tip labels are
+            also supported, most notably here, edge_style. The edge
+            style of each tree in the treelist is used unless it is
+            overridden by user args.
 
         Notes
         -----
@@ -541,115 +559,20 @@ class MultiTree:
         styles will be re-ordered by fixed_order to apply to all trees
         correctly.
         """
-        logger.warning(("kwargs", kwargs))
-        # which trees to draw
-        treelist = self.treelist if idxs is None else idxs
-
-        # TreeStyle used for canvas, axes setup only, based on
-        # kwargs, not .style from any subtrees.
-        fstyle = TreeStyle()
-        fstyle.width = kwargs.get("width", None)
-        fstyle.height = kwargs.get("height", None)
-        fstyle.layout = kwargs.get("layout", 'r')
-        fstyle.padding = kwargs.get("padding", 20)
-        fstyle.scale_bar = kwargs.get("scale_bar", False)
-        fstyle.use_edge_lengths = kwargs.get("use_edge_lengths", True)
-        fstyle.edge_type = kwargs.get("edge_type", 'c')
-        fstyle.xbaseline = kwargs.get("xbaseline", 0)
-        fstyle.ybaseline = kwargs.get("ybaseline", 0)
-        fstyle.tip_labels = (
-            self.treelist[0].get_tip_labels() if "tip_labels" not in kwargs
-            else kwargs["tip_labels"]
-        )
-        logger.warning(("fstyle.tip_labels", fstyle.tip_labels))
-        fstyle.edge_style.stroke_opacity = 1 / len(treelist)
-        if "edge_style" in kwargs:
-            for key, val in kwargs["edge_style"]:
-                setattr(fstyle, key, val)
-        logger.warning(("fstyle.edge_style", fstyle.edge_style))
-
-        # get fixed order of tips from consensus tree if not provided.
-        if fixed_order is None:
-            fixed_order = (
-                MultiTree(self.treelist)
-                .get_consensus_tree()
-                .get_tip_labels()
-            )
-        logger.warning(("fixed_order", fixed_order))
-
-        # require fixed_order to match ntips
-        ntips = self.treelist[0].ntips
-        assert len(fixed_order) == ntips, (
-            f"fixed_order arg (len={len(fixed_order)}) "
-            f"must be the same length as ntips (len={ntips}). "
-            f"You entered: {fixed_order}")
-
-        # draw trees sequentially to get a list of ToyTreeMark objects
-        marks = []
-        for tidx, tree in enumerate(treelist):
-
-            # make copy of fstyle
-            tmpstyle = fstyle.copy()
-
-            # add jitter to tip coordinates
-            if jitter:
-                if fstyle.layout in "rl":
-                    tmpstyle.ybaseline = fstyle.ybaseline + np.random.uniform(-jitter, jitter)
-                else:
-                    tmpstyle.xbaseline = fstyle.xbaseline + np.random.uniform(-jitter, jitter)
-
-            # set the edge stroke-opacity
-            if tree.style.edge_style.stroke_opacity is not None:
-                tmpstyle.edge_style.stroke_opacity
-
-            # plot tip labels by reordering those of tree tidx=0
-            if not tidx:
-                tmpstyle.tip_labels = fstyle.tip_labels
-            else:
-                tmpstyle.tip_labels = False
-
-            # add mark to axes
-            kwargs = tree_style_to_css_dict(tmpstyle)
-            logger.warning(("kwargs", kwargs))
-            if not tidx:
-                canvas, axes, mark = tree.draw(axes=axes, fixed_order=fixed_order, **kwargs)
-            else:
-                _, _, mark = tree.draw(axes=axes, fixed_order=fixed_order, **kwargs)
-            marks.append(mark)
-
-        # get shared tree styles.
-        return canvas, axes, marks
-
-
-    def draw_cloud_tree(
-        self,
-        axes: Cartesian = None,
-        fixed_order: Union[Sequence[str], bool] = None,
-        jitter: float = 0.0,
-        idxs: Optional[Sequence[int]] = None,
-        interior_algorithm: int = 1,
-        **kwargs,
-    ):
-        """...
-        """
         kwargs["jitter"] = jitter
-        kwargs["axes"] = axes
         kwargs["idxs"] = idxs
-        kwargs["tree_style"] = None
+        kwargs["tree_style"] = kwargs.pop("ts", kwargs.get("tree_style"))
         kwargs["fixed_order"] = fixed_order
         kwargs["interior_algorithm"] = interior_algorithm
+        kwargs["density"] = density
         kwargs["kwargs"] = {}
-        marks = draw_cloudtree(self, **kwargs)
+        mark = draw_cloudtree(self, **kwargs)
 
         # get or create axes and canvas
         canvas, axes = get_canvas_and_axes(
-            axes, marks[0],
-            kwargs.get("width"), kwargs.get("height"),
+            axes, mark, kwargs.get("width"), kwargs.get("height"),
         )
-
-        # add marks to axes
-        for mark in marks:
-            axes.add_mark(mark)
+        axes.add_mark(mark)
 
         # style axes
         # scale bar was not allowed on individual trees. Add scale
@@ -662,8 +585,7 @@ class MultiTree:
                 axes.x.show = False
                 axes.y.show = False
 
-        return canvas, axes, marks
-
+        return canvas, axes, mark
 
     def reset_tree_styles(self):
         """Set the .style to default for all ToyTrees in treelist."""
@@ -306,8 +306,13 @@ class Node:
         return False
 
     def __hash__(self) -> int:
-        """Return a hash of the Node based on its repr."""
-        return hash(repr(self))
+        """Return a hash of the Node based on its identity.
+
+        Equality of Nodes is by identity, and hashing by repr caused
+        all new unnamed Nodes (idx=-1) to share a hash, making dicts
+        of Nodes, e.g., in ToyTree._update, quadratic in size.
+        """
+        return id(self)
 
     #####################################################
     # NODE CONNECTIONS
@@ -37,3 +37,6 @@ Examples
 from toytree.distance._src.nodedist import *
 from toytree.distance._src.treedist import *
 from toytree.distance._src.quartet_dist import *
+from toytree.distance._src.split_index import *
+from toytree.distance._src.split_sketch import *
+from toytree.distance._src.tree_move_dists import *
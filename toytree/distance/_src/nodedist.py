@@ -6,8 +6,8 @@ These functions take a tree as input and use Node int idx labels
 to select Nodes.
 """
 
-from typing import TypeVar, Tuple, Union, Dict, Iterator
-import itertools
+from typing import TypeVar, Tuple, Union, Dict, Iterator, Optional, Sequence
+from pathlib import Path
 import numpy as np
 import pandas as pd
 from toytree import Node, ToyTree
@@ -25,10 +25,18 @@ __all__ = [
     "get_node_distance_matrix",
     "get_internal_node_distance_matrix",
     "get_tip_distance_matrix",
+    "iter_tip_distance_blocks",
+    "write_tip_distance_matrix",
     "get_descendant_dists",
     "iter_descendant_dists",
     "get_farthest_node",
     "get_farthest_node_distance",
+    "get_node_eccentricities",
+    "get_tree_diameter",
+    "get_node_lcas",
+    "get_node_path_lengths",
+    "get_node_path_membership",
+    "get_edge_path_counts",
 ]
 
 
@@ -143,14 +151,96 @@ def get_node_distance(
     return dist
 
 
+def _get_lca_depth_arrays(
+    tree: ToyTree,
+    topology_only: bool = False,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return arrays used to compute distances between any two Nodes.
+
+    Tip Nodes are labeled 0-ntips in left-to-right order, such that the
+    tips descended from any Node form a contiguous range of idx labels.
+    The LCA of tips i < j is therefore the shallowest of the LCAs of
+    the adjacent tip pairs (i, i+1), ..., (j-1, j), and the depth of
+    the LCA of any two Nodes is found from their first descendant tips.
+
+    Returns
+    -------
+    depths: np.ndarray
+        Distance (or number of edges) from the root to each Node.
+    firsts: np.ndarray
+        The lowest tip idx label descended from each Node.
+    adjacent: np.ndarray
+        The depth of the LCA of each pair of adjacent tips (i, i+1).
+    """
+    depths = np.zeros(tree.nnodes)
+    firsts = np.arange(tree.nnodes)
+    adjacent = np.zeros(max(0, tree.ntips - 1))
+    for node in tree.traverse("preorder"):
+        if node._up:
+            depths[node._idx] = depths[node._up._idx] + (1 if topology_only else node._dist)
+    for node in tree[tree.ntips:]:
+        firsts[node._idx] = firsts[node._children[0]._idx]
+        for child in node._children[1:]:
+            adjacent[firsts[child._idx] - 1] = depths[node._idx]
+    return depths, firsts, adjacent
+
+
+def _get_tip_lca_depth_block(
+    adjacent: np.ndarray,
+    depths: np.ndarray,
+    start: int,
+    stop: int,
+) -> np.ndarray:
+    """Return depths of the LCAs of tips in [start, stop) and all tips.
+
+    The running minima of `adjacent` are computed once for the tips to
+    the left and right of the block, and then broadcast against each
+    row, such that only the small within-block region is computed row
+    by row.
+    """
+    ntips = adjacent.size + 1
+    size = stop - start
+    inner = adjacent[start:stop - 1]
+    block = np.empty((size, ntips))
+
+    # within block: running min over adjacent pairs from each row
+    for row in range(size):
+        tidx = start + row
+        block[row, tidx] = depths[tidx]
+        block[row, tidx + 1:stop] = np.minimum.accumulate(inner[row:])
+        block[row, start:tidx] = np.minimum.accumulate(inner[:row][::-1])[::-1]
+
+    # right of block: min(adjacent[i:stop-1]) and running min from stop
+    if stop < ntips:
+        suffix = np.append(np.minimum.accumulate(inner[::-1])[::-1], np.inf)
+        right = np.minimum.accumulate(adjacent[stop - 1:])
+        block[:, stop:] = np.minimum(suffix[:, None], right[None, :])
+
+    # left of block: min(adjacent[start:i]) and running min to start
+    if start > 0:
+        prefix = np.append(np.inf, np.minimum.accumulate(inner))
+        left = np.minimum.accumulate(adjacent[:start][::-1])[::-1]
+        block[:, :start] = np.minimum(prefix[:, None], left[None, :])
+    return block
+
+
+def _get_block_size(nnodes: int, max_size: int = 2 ** 23) -> int:
+    """Return a number of rows to compute at once to limit memory."""
+    return max(1, max_size // max(1, nnodes))
+
+
 @add_subpackage_method(TreeDistanceAPI)
 def get_node_distance_matrix(
     tree: ToyTree,
     topology_only: bool = False,
-    df: bool = False
+    df: bool = False,
+    dtype: Optional[np.dtype] = None,
 ) -> Union[np.array, pd.DataFrame]:
     """Return pairwise distances between all Nodes in a ToyTree.
 
+    Distances are computed as depth[i] + depth[j] - 2 * depth[lca(i, j)]
+    using vectorized array operations in blocks of rows.
+
     Parameters
     ----------
     tree: toytree.ToyTree
@@ -159,6 +249,9 @@ def get_node_distance_matrix(
         If True distances represent the number of edges between Nodes.
     df: bool
         If True a pandas.DataFrame is returned instead of np.ndarray.
+    dtype: np.dtype or None
+        The dtype of the returned array, e.g., np.float32 to reduce
+        memory. Default is int if topology_only else float.
 
     Returns
     -------
@@ -173,55 +266,28 @@ def get_node_distance_matrix(
     >>> tree = toytree.rtree.unittree(10, seed=123)
     >>> toytree.distance.get_node_distance_matrix(tree)
     """
-    dtype = int if topology_only else float
-
-    # postorder ordered
+    dtype = (int if topology_only else float) if dtype is None else dtype
+    depths, firsts, adjacent = _get_lca_depth_arrays(tree, topology_only)
     arr = np.zeros((tree.nnodes, tree.nnodes), dtype=dtype)
 
-    # store list of descendants indices for each node
-    clade_map = {}
-
-    # reorder
-    reorder = []
-
-    # traverse tree in postorder, but first visit all tips (idxorder).
-    for idx, node in enumerate(tree.traverse("postorder")):
-
-        # init clade list to store descendants of this node
-        clade_map[node] = [idx]
-
-        # store idxorder index for re-sorting later.
-        reorder.append(node.idx)
-
-        # build desc list from children desc lists
-        for child in node._children:
-
-            # store child's clade list to parent's clade list
-            clade = clade_map[child]
-            clade_map[node].extend(clade)
-
-            # set dist from child's clade members to parent
-            arr[clade, idx] = arr[clade, max(clade)] + (1 if topology_only else child._dist)
-
-        # set children clade's dists to each other
-        for ch0, ch1 in itertools.combinations(node._children, 2):
-            ch0 = clade_map[ch0]
-            ch1 = clade_map[ch1]
-            for c in ch0:
-                arr[c, ch1] = arr[c, idx] + arr[ch1, idx]
-
-    # mirror fill
-    arr[np.tril_indices_from(arr)] = arr.T[np.tril_indices_from(arr)]
-
-    # reorder into idx order
-    idxorder = [reorder.index(i) for i in range(tree.nnodes)]
+    # the LCA of two Nodes is the shallowest of the two Nodes and the
+    # LCA of their first descendant tips. Fill rows for Nodes whose
+    # first tip is in each block of tips.
+    size = _get_block_size(tree.nnodes)
+    for start in range(0, tree.ntips, size):
+        stop = min(start + size, tree.ntips)
+        block = _get_tip_lca_depth_block(adjacent, depths, start, stop)
+        nidxs = np.nonzero((firsts >= start) & (firsts < stop))[0]
+        lcas = block[firsts[nidxs] - start][:, firsts]
+        lcas = np.minimum(lcas, depths[nidxs, None])
+        lcas = np.minimum(lcas, depths[None, :])
+        arr[nidxs] = depths[nidxs, None] + depths[None, :] - 2 * lcas
 
     # optionally format as dataframe
     if not df:
-        return arr[idxorder][:, idxorder]
+        return arr
     index = tree.get_tip_labels() + [str(i.idx) for i in tree[tree.ntips:]]
-    return pd.DataFrame(
-        arr[idxorder][:, idxorder], columns=index, index=index)
+    return pd.DataFrame(arr, columns=index, index=index)
 
 
 @add_subpackage_method(TreeDistanceAPI)
@@ -229,6 +295,7 @@ def get_internal_node_distance_matrix(
     tree: ToyTree,
     topology_only: bool = False,
     df: bool = False,
+    dtype: Optional[np.dtype] = None,
 ) -> Union[np.array, pd.DataFrame]:
     """Return pairwise distances between non-leaf Nodes in a ToyTree.
 
@@ -240,6 +307,9 @@ def get_internal_node_distance_matrix(
         If True distances represent the number of edges between Nodes.
     df: bool
         If True a pandas.DataFrame is returned instead of np.ndarray.
+    dtype: np.dtype or None
+        The dtype of the returned array. Default is int if
+        topology_only else float.
 
     Returns
     -------
@@ -252,7 +322,7 @@ def get_internal_node_distance_matrix(
     >>> tree = toytree.rtree.unittree(10, seed=123)
     >>> toytree.distance.get_internal_node_distance_matrix(tree)
     """
-    arr = get_node_distance_matrix(tree, topology_only=topology_only, df=df)
+    arr = get_node_distance_matrix(tree, topology_only=topology_only, df=df, dtype=dtype)
     if not df:
         return arr[tree.ntips:, tree.ntips:]
     return arr.iloc[tree.ntips:, tree.ntips:]
@@ -262,10 +332,17 @@ def get_internal_node_distance_matrix(
 def get_tip_distance_matrix(
     tree: ToyTree,
     topology_only: bool = False,
-    df: bool = False
+    df: bool = False,
+    dtype: Optional[np.dtype] = None,
+    condensed: bool = False,
 ) -> Union[np.array, pd.DataFrame]:
     """Return pairwise distances between tip Nodes in a ToyTree.
 
+    Distances are computed only among tips (the internal Node block
+    of the full Node distance matrix is never allocated) from the
+    depths of tips and of the LCAs of adjacent tips, using vectorized
+    array operations in blocks of rows.
+
     Parameters
     ----------
     tree: toytree.ToyTree
@@ -275,6 +352,14 @@ def get_tip_distance_matrix(
     df: bool
         If True a pandas.DataFrame is returned instead of np.array
         with str Node names as index and column names.
+    dtype: np.dtype or None
+        The dtype of the returned array, e.g., np.float32 to halve
+        memory for large trees. Default is int if topology_only
+        else float.
+    condensed: bool
+        If True a 1-D condensed distance array of the upper triangle is
+        returned, in the same layout as `scipy.spatial.distance.pdist`,
+        which requires half the memory of the square matrix.
 
     Returns
     -------
@@ -287,11 +372,130 @@ def get_tip_distance_matrix(
     --------
     >>> tree = toytree.rtree.unittree(10, seed=123)
     >>> toytree.distance.get_tip_distance_matrix(tree)
+    >>> toytree.distance.get_tip_distance_matrix(tree, dtype=np.float32, condensed=True)
     """
-    arr = get_node_distance_matrix(tree, topology_only=topology_only, df=df)
+    if df and condensed:
+        raise ValueError("df and condensed options cannot be used together.")
+    dtype = (int if topology_only else float) if dtype is None else dtype
+    ntips = tree.ntips
+    if condensed:
+        arr = np.zeros(ntips * (ntips - 1) // 2, dtype=dtype)
+    else:
+        arr = np.zeros((ntips, ntips), dtype=dtype)
+
+    # fill in blocks of rows
+    offset = 0
+    for start, block in iter_tip_distance_blocks(tree, topology_only=topology_only):
+        if not condensed:
+            arr[start:start + block.shape[0]] = block
+            continue
+        for row, tidx in enumerate(range(start, start + block.shape[0])):
+            arr[offset:offset + ntips - tidx - 1] = block[row, tidx + 1:]
+            offset += ntips - tidx - 1
+
+    # optionally format as dataframe
     if not df:
-        return arr[:tree.ntips, :tree.ntips]
-    return arr.iloc[:tree.ntips, :tree.ntips]
+        return arr
+    names = tree.get_tip_labels()
+    return pd.DataFrame(arr, columns=names, index=names)
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def iter_tip_distance_blocks(
+    tree: ToyTree,
+    block_size: Optional[int] = None,
+    topology_only: bool = False,
+    dtype: Optional[np.dtype] = None,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """Generator of (start, block) row blocks of the tip distance matrix.
+
+    Each block is an array of shape (nrows, ntips) with distances from
+    tips with idx labels in [start, start + nrows) to all tips. Blocks
+    are computed from depth and adjacent-tip LCA arrays that are built
+    once, such that memory scales with block_size x ntips rather than
+    ntips x ntips. This can be used to consume the distance matrix of
+    very large trees out of core.
+
+    Parameters
+    ----------
+    tree: toytree.ToyTree
+        The input ToyTree instance.
+    block_size: int or None
+        The number of rows in each block. Default is None, which
+        selects a size such that each block has ~8M values.
+    topology_only: bool
+        If True then all edges lengths are set to 1.
+    dtype: np.dtype or None
+        The dtype of the blocks. Default is float.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(1000, seed=123)
+    >>> for start, block in tree.distance.iter_tip_distance_blocks(100):
+    >>>     print(start, block.shape)
+    """
+    depths, _, adjacent = _get_lca_depth_arrays(tree, topology_only)
+    depths = depths[:tree.ntips]
+    size = _get_block_size(tree.ntips) if block_size is None else int(block_size)
+    if size < 1:
+        raise ValueError("block_size must be >= 1.")
+    for start in range(0, tree.ntips, size):
+        stop = min(start + size, tree.ntips)
+        block = _get_tip_lca_depth_block(adjacent, depths, start, stop)
+        block *= -2
+        block += depths[start:stop, None]
+        block += depths[None, :]
+        yield start, (block if dtype is None else block.astype(dtype))
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def write_tip_distance_matrix(
+    tree: ToyTree,
+    path: Union[str, Path],
+    block_size: Optional[int] = None,
+    topology_only: bool = False,
+    dtype: np.dtype = np.float32,
+) -> np.memmap:
+    """Write the tip distance matrix to a .npy file in blocks of rows.
+
+    The matrix is filled in a memory-mapped array (numpy.memmap) one
+    block of rows at a time (see `iter_tip_distance_blocks`), such that
+    it is never held in memory. The file can be re-opened out of core
+    with `np.load(path, mmap_mode="r")`. Note that the size of the file
+    is ntips x ntips x dtype bytes (e.g., 160 GB for 200K tips in
+    float32).
+
+    Parameters
+    ----------
+    tree: toytree.ToyTree
+        The input ToyTree instance.
+    path: str or Path
+        A file path to write the matrix to in .npy format.
+    block_size: int or None
+        The number of rows to compute at a time.
+    topology_only: bool
+        If True then all edges lengths are set to 1.
+    dtype: np.dtype
+        The dtype of the matrix. Default is np.float32.
+
+    Returns
+    -------
+    np.memmap
+        The memory-mapped matrix with rows and columns ordered by
+        tip Node idx labels.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(1000, seed=123)
+    >>> mmap = tree.distance.write_tip_distance_matrix("/tmp/dists.npy")
+    >>> dists = np.load("/tmp/dists.npy", mmap_mode="r")
+    """
+    arr = np.lib.format.open_memmap(
+        Path(path), mode="w+", dtype=dtype, shape=(tree.ntips, tree.ntips))
+    for start, block in iter_tip_distance_blocks(tree, block_size, topology_only):
+        arr[start:start + block.shape[0]] = block
+    arr.flush()
+    return arr
 
 
 @add_subpackage_method(TreeDistanceAPI)
@@ -355,6 +559,297 @@ def iter_descendant_dists(
         yield desc, ndists[desc._idx]
 
 
+def _get_lca_lookup(tree: ToyTree) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return arrays used to look up the LCA of any two Nodes in O(1).
+
+    The LCA of tips i < j is the shallowest of the LCAs of adjacent
+    tips (i, i+1), ..., (j-1, j) (see `_get_lca_depth_arrays`), which
+    is found by a range-min query on a sparse table in which row k
+    stores the idx of the shallowest adjacent LCA in [i, i + 2^k).
+
+    Returns
+    -------
+    levels: np.ndarray
+        Number of edges from the root to each Node.
+    firsts: np.ndarray
+        The lowest tip idx label descended from each Node.
+    lasts: np.ndarray
+        The highest tip idx label descended from each Node.
+    table: np.ndarray
+        Sparse table of idx labels of adjacent tip LCAs.
+    """
+    levels, firsts, _ = _get_lca_depth_arrays(tree, topology_only=True)
+    levels = levels.astype(int)
+    lasts = np.arange(tree.nnodes)
+    adjacent = np.zeros(max(1, tree.ntips - 1), dtype=int)
+    for node in tree[tree.ntips:]:
+        lasts[node._idx] = lasts[node._children[-1]._idx]
+        for child in node._children[1:]:
+            adjacent[firsts[child._idx] - 1] = node._idx
+
+    nlevels = int(np.log2(adjacent.size)) + 1
+    table = np.zeros((nlevels, adjacent.size), dtype=int)
+    table[0] = adjacent
+    for level in range(1, nlevels):
+        step = 1 << (level - 1)
+        left, right = table[level - 1, :-step], table[level - 1, step:]
+        table[level, :-step] = np.where(levels[left] <= levels[right], left, right)
+    return levels, firsts, lasts, table
+
+
+def _get_lca_idxs(lookup: Tuple[np.ndarray, ...], idxs0: np.ndarray, idxs1: np.ndarray) -> np.ndarray:
+    """Return idx labels of the LCAs of pairs of Nodes by idx label.
+
+    The LCA of two Nodes is the shallowest of the two Nodes and the
+    LCA of their first descendant tips.
+    """
+    levels, firsts, _, table = lookup
+    low = np.minimum(firsts[idxs0], firsts[idxs1])
+    high = np.maximum(firsts[idxs0], firsts[idxs1])
+    level = np.log2(np.maximum(1, high - low)).astype(int)
+    left = table[level, np.minimum(low, table.shape[1] - 1)]
+    right = table[level, np.clip(high - (1 << level), 0, table.shape[1] - 1)]
+    lcas = np.where(levels[left] <= levels[right], left, right)
+    lcas = np.where(high == low, low, lcas)
+    lcas = np.where(levels[idxs0] < levels[lcas], idxs0, lcas)
+    return np.where(levels[idxs1] < levels[lcas], idxs1, lcas)
+
+
+def _get_idx_array(tree: ToyTree, nodes: Sequence[int]) -> np.ndarray:
+    """Return an int array of Node idx labels and check their range."""
+    idxs = np.asarray(nodes, dtype=int)
+    if idxs.size and ((idxs.min() < 0) or (idxs.max() >= tree.nnodes)):
+        raise ValueError(f"Node idx labels must be in range 0-{tree.nnodes - 1}.")
+    return idxs
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_node_lcas(
+    tree: ToyTree,
+    nodes0: Sequence[int],
+    nodes1: Sequence[int],
+) -> np.ndarray:
+    """Return idx labels of the LCAs (MRCAs) of many pairs of Nodes.
+
+    This is vectorized over pairs of Nodes selected by int idx labels
+    (e.g., arrays of any shape that can be broadcast together), and
+    each query takes O(1) time after an O(n log n) setup.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A tree containing the queried Nodes.
+    nodes0: Sequence[int]
+        Node int idx labels at the start of each path.
+    nodes1: Sequence[int]
+        Node int idx labels at the end of each path.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(10, seed=123)
+    >>> tree.distance.get_node_lcas([0, 1, 2], [3, 3, 3])
+    """
+    idxs0 = _get_idx_array(tree, nodes0)
+    idxs1 = _get_idx_array(tree, nodes1)
+    return _get_lca_idxs(_get_lca_lookup(tree), idxs0, idxs1)
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_node_path_lengths(
+    tree: ToyTree,
+    nodes0: Sequence[int],
+    nodes1: Sequence[int],
+    topology_only: bool = False,
+) -> np.ndarray:
+    """Return path lengths (or number of edges) between pairs of Nodes.
+
+    Distances are computed as depth[i] + depth[j] - 2 * depth[lca(i, j)]
+    for many pairs of Nodes selected by int idx labels, rather than by
+    walking the path between each pair (see `get_node_path`).
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A tree containing the queried Nodes.
+    nodes0: Sequence[int]
+        Node int idx labels at the start of each path.
+    nodes1: Sequence[int]
+        Node int idx labels at the end of each path.
+    topology_only: bool
+        If True then the number of edges on each path is returned.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(10, seed=123)
+    >>> tree.distance.get_node_path_lengths([0, 1, 2], [3, 3, 3])
+    """
+    idxs0 = _get_idx_array(tree, nodes0)
+    idxs1 = _get_idx_array(tree, nodes1)
+    lookup = _get_lca_lookup(tree)
+    lcas = _get_lca_idxs(lookup, idxs0, idxs1)
+    depths = lookup[0] if topology_only else _get_lca_depth_arrays(tree)[0]
+    return depths[idxs0] + depths[idxs1] - 2 * depths[lcas]
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_node_path_membership(
+    tree: ToyTree,
+    nodes0: Sequence[int],
+    nodes1: Sequence[int],
+    query: Union[int, Sequence[int]],
+) -> np.ndarray:
+    """Return boolean array of whether a Node is on the path of pairs.
+
+    A Node is on the path between two Nodes (including its ends) if
+    it is a descendant of (or is) their LCA and an ancestor of (or is)
+    either of the two Nodes. Ancestry is tested in O(1) from the range
+    of tip idx labels descended from each Node.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A tree containing the queried Nodes.
+    nodes0: Sequence[int]
+        Node int idx labels at the start of each path.
+    nodes1: Sequence[int]
+        Node int idx labels at the end of each path.
+    query: int or Sequence[int]
+        A Node int idx label tested on every path, or an array of idx
+        labels to test for each path.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(10, seed=123)
+    >>> tree.distance.get_node_path_membership([0, 1, 2], [3, 3, 3], 12)
+    """
+    idxs0 = _get_idx_array(tree, nodes0)
+    idxs1 = _get_idx_array(tree, nodes1)
+    query = _get_idx_array(tree, query)
+    lookup = _get_lca_lookup(tree)
+    levels, firsts, lasts, _ = lookup
+    lcas = _get_lca_idxs(lookup, idxs0, idxs1)
+
+    def is_ancestor(anc: np.ndarray, desc: np.ndarray) -> np.ndarray:
+        return (
+            (firsts[anc] <= firsts[desc])
+            & (lasts[desc] <= lasts[anc])
+            & (levels[anc] <= levels[desc])
+        )
+    return is_ancestor(lcas, query) & (is_ancestor(query, idxs0) | is_ancestor(query, idxs1))
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_edge_path_counts(
+    tree: ToyTree,
+    nodes0: Optional[Sequence[int]] = None,
+    nodes1: Optional[Sequence[int]] = None,
+) -> np.ndarray:
+    """Return the number of paths between pairs of Nodes on each edge.
+
+    Edges are represented by the idx label of the Node below them. By
+    default the paths between all pairs of tips are counted, which is
+    s * (ntips - s) for an edge above s tips, computed in O(n) from
+    the number of tips below each Node. Alternatively, paths between
+    pairs of Nodes selected by int idx labels are counted in
+    O(n + npairs) by adding 1 to each end of a path and subtracting 2
+    from its LCA, and summing these values over the subtree below
+    each edge.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A tree on which to count paths across edges.
+    nodes0: Sequence[int] or None
+        Node int idx labels at the start of each path, or None to
+        count paths among all pairs of tips.
+    nodes1: Sequence[int] or None
+        Node int idx labels at the end of each path.
+
+    Returns
+    -------
+    An int array of counts for the edge above each Node, in which the
+    value for the root Node (no edge) is 0.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(10, seed=123)
+    >>> tree.distance.get_edge_path_counts()
+    """
+    if (nodes0 is None) != (nodes1 is None):
+        raise ValueError("nodes0 and nodes1 must both be None or both be set.")
+    counts = np.zeros(tree.nnodes, dtype=np.int64)
+    if nodes0 is None:
+        counts[:tree.ntips] = 1
+    else:
+        idxs0 = _get_idx_array(tree, nodes0).ravel()
+        idxs1 = _get_idx_array(tree, nodes1).ravel()
+        lcas = _get_lca_idxs(_get_lca_lookup(tree), idxs0, idxs1)
+        counts += np.bincount(idxs0, minlength=tree.nnodes)
+        counts += np.bincount(idxs1, minlength=tree.nnodes)
+        counts -= 2 * np.bincount(lcas, minlength=tree.nnodes)
+
+    # sum values over subtrees, visiting children before parents
+    for node in tree[:-1]:
+        counts[node._up._idx] += counts[node._idx]
+    if nodes0 is None:
+        counts = counts * (tree.ntips - counts)
+    counts[-1] = 0
+    return counts
+
+
+def _get_eccentricity_arrays(
+    tree: ToyTree,
+    topology_only: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the distance to, and idx of, the farthest Node from each.
+
+    This is computed in O(n) by two passes over Node idx labels. The
+    first pass (children before parents) finds the farthest Node in
+    each subtree, and the second pass (parents before children) finds
+    the farthest Node outside of each subtree, from the farthest Node
+    outside of its parent's subtree or in the subtrees of its sisters.
+    If >1 Nodes are equally distant the one w/ lowest idx is stored.
+
+    Returns
+    -------
+    dists: np.ndarray
+        The distance from each Node to its farthest Node.
+    farthest: np.ndarray
+        The idx label of the farthest Node from each Node.
+    """
+    nnodes = tree.nnodes
+    dists = [1 if topology_only else i._dist for i in tree]
+
+    # farthest (dist, -idx) in the subtree of each Node, and the best
+    # two values over the children of each Node as seen from the Node.
+    down = [(0, -i) for i in range(nnodes)]
+    best = [[(-np.inf, 0), (-np.inf, 0)] for i in range(nnodes)]
+    for node in tree[:-1]:
+        dist, nidx = down[node._idx]
+        value = (dist + dists[node._idx], nidx)
+        pbest = best[node._up._idx]
+        if value > pbest[0]:
+            pbest[0], pbest[1] = value, pbest[0]
+        elif value > pbest[1]:
+            pbest[1] = value
+        if value > down[node._up._idx]:
+            down[node._up._idx] = value
+
+    # farthest (dist, -idx) outside the subtree of each Node
+    out = [(-np.inf, 0) for i in range(nnodes)]
+    for node in tree[::-1][1:]:
+        pidx = node._up._idx
+        dist, nidx = down[node._idx]
+        sister = best[pidx][0]
+        if sister == (dist + dists[node._idx], nidx):
+            sister = best[pidx][1]
+        value = max(out[pidx], (0, -pidx), sister)
+        out[node._idx] = (value[0] + dists[node._idx], value[1])
+
+    ecc = [max(i, j) for (i, j) in zip(down, out)]
+    return np.array([i[0] for i in ecc]), np.array([-i[1] for i in ecc])
+
+
 @add_subpackage_method(TreeDistanceAPI)
 def get_farthest_node(
     tree: ToyTree,
@@ -383,7 +878,7 @@ def get_farthest_node(
         If True then the farthest Node is only searched among the
         descendants of the 'node' query, or the root is no Node was
         selected. If False then the farthest Node is searched across
-        the entire tree using `get_node_distance_matrix()`.
+        the entire tree using `get_node_eccentricities()`.
     """
     # get distances to all, or only descendants
     node = tree.treenode if node is None else tree.get_nodes(node)[0]
@@ -391,9 +886,8 @@ def get_farthest_node(
         ndists = get_descendant_dists(tree, node, topology_only)
         return max(ndists, key=lambda x: ndists[x])
     else:
-        ndists = get_node_distance_matrix(tree, topology_only)
-        nidx = ndists[node.idx].argmax()
-        return tree[nidx]
+        _, farthest = _get_eccentricity_arrays(tree, topology_only)
+        return tree[farthest[node._idx]]
 
 
 @add_subpackage_method(TreeDistanceAPI)
@@ -422,7 +916,78 @@ def get_farthest_node_distance(
     node = tree.treenode if node is None else tree.get_nodes(node)[0]
     if descendants_only:
         return max(i[1] for i in iter_descendant_dists(tree, node, topology_only))
-    return max(get_node_distance_matrix(tree, topology_only)[node._idx])
+    return _get_eccentricity_arrays(tree, topology_only)[0][node._idx]
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_node_eccentricities(
+    tree: ToyTree,
+    topology_only: bool = False,
+    df: bool = False,
+) -> Union[np.ndarray, pd.DataFrame]:
+    """Return the distance from every Node to its farthest Node.
+
+    The eccentricity of a Node is its max distance to any other Node
+    in the tree. This is computed for all Nodes at once in O(n) time
+    by dynamic programming over Node idx labels, rather than from a
+    matrix of pairwise distances.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        The ToyTree on which to measure Node distances.
+    topology_only: bool
+        If True distances are measured as number of edges between
+        two Nodes, rather than the sum of edge distances.
+    df: bool
+        If True a pandas.DataFrame is returned with the eccentricity
+        and the idx label of the farthest Node (lowest idx if tied)
+        for each Node.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(10, seed=123)
+    >>> toytree.distance.get_node_eccentricities(tree)
+    """
+    dists, farthest = _get_eccentricity_arrays(tree, topology_only)
+    if not df:
+        return dists
+    return pd.DataFrame({"eccentricity": dists, "farthest": farthest})
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_tree_diameter(
+    tree: ToyTree,
+    topology_only: bool = False,
+    return_nodes: bool = False,
+) -> Union[float, Tuple[float, Node, Node]]:
+    """Return the longest path between any two Nodes in the tree.
+
+    The diameter is the max eccentricity of any Node, which is found
+    in O(n) time (see `get_node_eccentricities`).
+
+    Parameters
+    ----------
+    tree: ToyTree
+        The ToyTree on which to measure Node distances.
+    topology_only: bool
+        If True distances are measured as number of edges between
+        two Nodes, rather than the sum of edge distances.
+    return_nodes: bool
+        If True then (diameter, Node, Node) is returned with the two
+        Nodes at the ends of the path. If >1 paths are equally long
+        the ends with lowest idx labels are returned.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(10, seed=123)
+    >>> dist, node0, node1 = tree.distance.get_tree_diameter(return_nodes=True)
+    """
+    dists, farthest = _get_eccentricity_arrays(tree, topology_only)
+    nidx = dists.argmax()
+    if return_nodes:
+        return dists[nidx], tree[nidx], tree[farthest[nidx]]
+    return dists[nidx]
 
 
 if __name__ == "__main__":
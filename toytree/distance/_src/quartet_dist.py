@@ -29,45 +29,183 @@ References
 - ...
 """
 
-from typing import Mapping
+from typing import Mapping, Tuple, Iterator, Sequence, Optional, Dict, Union
 import itertools
+from loguru import logger
 import pandas as pd
 import numpy as np
+from scipy.stats import norm
 from toytree.core import ToyTree
 from toytree.core.apis import TreeDistanceAPI, add_subpackage_method
+from toytree.distance._src.nodedist import _get_lca_depth_arrays
 import toytree
 
+logger = logger.bind(name="toytree")
 
 __all__ = [
     "get_treedist_quartets",
+    "get_quartet_resolutions",
+    "iter_quartet_resolutions",
 ]
 
 
+def _iter_quartet_combinations(ntips: int, chunk_size: int) -> Iterator[np.ndarray]:
+    """Yield arrays of all combinations of 4 of ntips in sorted order.
+
+    Rows are in the same order as `itertools.combinations(range(ntips),
+    4)`, in arrays of approximately chunk_size rows (or fewer), built
+    from the lexicographic (k, l) pairs following each (i, j).
+    """
+    pairs = np.column_stack(np.triu_indices(ntips, 1))
+    blocks = []
+    size = 0
+    for idx, jdx in itertools.combinations(range(ntips), 2):
+        offset = pairs.shape[0] - (ntips - jdx - 1) * (ntips - jdx - 2) // 2
+        tail = pairs[offset:]
+        if not tail.size:
+            continue
+        block = np.empty((tail.shape[0], 4), dtype=int)
+        block[:, 0] = idx
+        block[:, 1] = jdx
+        block[:, 2:] = tail
+        blocks.append(block)
+        size += block.shape[0]
+        if size >= chunk_size:
+            yield np.concatenate(blocks)
+            blocks = []
+            size = 0
+    if blocks:
+        yield np.concatenate(blocks)
+
+
+def _sample_distinct_quartets(rng: np.random.Generator, ntips: int, size: int) -> np.ndarray:
+    """Return (size, 4) array of quartets of 4 distinct random tips.
+
+    The kth tip is drawn from the ntips - k tips not yet drawn by
+    sampling an int in [0, ntips - k) and shifting it past each of
+    the previously drawn tips (in ascending order) that it reaches.
+    """
+    qrts = np.empty((size, 4), dtype=int)
+    drawn = np.empty((size, 0), dtype=int)
+    for col in range(4):
+        draw = rng.integers(0, ntips - col, size=size)
+        for prev in drawn.T:
+            draw += draw >= prev
+        qrts[:, col] = draw
+        drawn = np.sort(qrts[:, :col + 1], axis=1)
+    return qrts
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_quartet_resolutions(
+    tree: ToyTree,
+    quartets: np.ndarray,
+    names: Optional[Sequence[str]] = None,
+) -> np.ndarray:
+    """Return the resolution of each quartet in a batch of quartets.
+
+    Resolutions are computed for an array of quartets of tips using
+    the four-point condition on topological distances between tips,
+    each found in O(1) from a cached table of LCA depths. Quartet ABCD
+    resolves as AB|CD if d(A,B) + d(C,D) is less than the two other
+    sums of distances between pairs, and is unresolved if there is no
+    unique min (a polytomy).
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A tree with unique tip names.
+    quartets: np.ndarray
+        An int array of shape (nquartets, 4) of distinct tip indices
+        in the order of `names`.
+    names: Sequence[str] or None
+        Tip names indexed by the values in quartets. Default is the
+        alphanumerically sorted tip names of the tree.
+
+    Returns
+    -------
+    An int array of resolutions, 0 if unresolved, or 1-3 for the
+    position of the tip paired with the first tip in each quartet,
+    e.g., 1 = AB|CD, 2 = AC|BD, 3 = AD|BC.
+    """
+    names = sorted(tree.get_tip_labels()) if names is None else list(names)
+    if len(names) != len(set(names)):
+        raise ValueError("duplicate tip names are not allowed")
+    lookup = _get_tip_lca_lookup(tree, names)
+    return _get_quartet_resolutions(lookup, np.asarray(quartets, dtype=int).reshape(-1, 4))
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def iter_quartet_resolutions(
+    tree: ToyTree,
+    nsamples: Optional[int] = None,
+    seed: Optional[int] = None,
+    names: Optional[Sequence[str]] = None,
+    chunk_size: int = 2**20,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield (quartets, resolutions) arrays in chunks.
+
+    By default all quartets are enumerated as sorted combinations of
+    tip indices (in `names` order) in lexicographic order. If nsamples
+    is set then random quartets of 4 distinct tips are sampled (with
+    replacement among quartets). Resolutions are coded as in
+    `get_quartet_resolutions`.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A tree with unique tip names.
+    nsamples: int or None
+        Number of random quartets to sample, or None to enumerate all.
+    seed: int or None
+        Seed for the random number generator when sampling.
+    names: Sequence[str] or None
+        Tip names indexed by quartet values. Default is sorted names.
+    chunk_size: int
+        Approx. max number of quartets in each yielded array.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(50, seed=123)
+    >>> for qrts, res in iter_quartet_resolutions(tree, nsamples=10**6, seed=1):
+    >>>     print(qrts.shape, np.bincount(res, minlength=4))
+    """
+    names = sorted(tree.get_tip_labels()) if names is None else list(names)
+    if len(names) != len(set(names)):
+        raise ValueError("duplicate tip names are not allowed")
+    lookup = _get_tip_lca_lookup(tree, names)
+
+    # enumerate all quartets
+    if nsamples is None:
+        for qrts in _iter_quartet_combinations(len(names), chunk_size):
+            yield qrts, _get_quartet_resolutions(lookup, qrts)
+        return
+
+    # sample random quartets of four distinct tips
+    if len(names) < 4:
+        raise ValueError("trees must have at least 4 tips to sample quartets.")
+    rng = np.random.default_rng(seed)
+    remaining = int(nsamples)
+    while remaining:
+        size = min(remaining, chunk_size)
+        qrts = _sample_distinct_quartets(rng, len(names), size)
+        remaining -= size
+        yield qrts, _get_quartet_resolutions(lookup, qrts)
+
+
 def get_quartet_resolutions_table(tree: ToyTree, df: bool = False) -> np.ndarray:
     """Return an array of quartet resolutions.
 
     The returned table can be an array of dataframe and is ordered
     alphanumerically by the names of the tips in the tree. If the tree
-    has duplicate tip names an error will be raised.
+    has duplicate tip names an error will be raised. Resolutions are
+    computed in vectorized chunks (see `iter_quartet_resolutions`).
     """
     snames = sorted(tree.get_tip_labels())
-    assert len(snames) == len(set(snames)), "duplicate tip names are not allowed"
-
-    # an empty array to enumerate all quartets and their resolutions
-    ntips = toytree.enum.get_n_quartets(tree.ntips)
-    arr = np.zeros(ntips, dtype=np.int_)
-
-    # a dict to map {tipset: resolved} as {frozenset(abcd): tuple(abcd)}
-    # note: this has a large memory usage for large trees.
-    riter = tree.enum.iter_quartets(collapse=True, type=tuple, sort=True)
-    rdict = {frozenset(i): i for i in riter}
-
-    # iterator over tuples of sorted tip names: abcd, abce, abde
-    iter_snames = itertools.combinations(snames, 4)
-    for idx, qrt in enumerate(iter_snames):
-        resolved = rdict.get(frozenset(qrt))
-        if resolved:
-            arr[idx] = qrt.index(resolved[1])
+    if len(snames) != len(set(snames)):
+        raise ValueError("duplicate tip names are not allowed")
+    chunks = [i[1] for i in iter_quartet_resolutions(tree, names=snames)]
+    arr = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int_)
 
     # optionally return as df with index labels for debugging
     if df:
@@ -75,14 +213,38 @@ def get_quartet_resolutions_table(tree: ToyTree, df: bool = False) -> np.ndarray
     return arr
 
 
-def get_quartet_comparison(tree1: ToyTree, tree2: ToyTree) -> Mapping[str, int]:
+def get_quartet_comparison(
+    tree1: ToyTree,
+    tree2: ToyTree,
+    method: str = "count",
+) -> Mapping[str, int]:
     """Return dict of quartet similarity/resolution data for two trees.
 
     This is used internally. Users should call `get_quartet_metrics`.
+
+    Parameters
+    ----------
+    tree1: ToyTree
+        A tree.
+    tree2: ToyTree
+        A tree with the same tip labels as tree1.
+    method: str
+        "count" (default) counts quartets without enumerating them in
+        O(n^2 d^2) time for trees with n tips and max degree d (see
+        `_get_quartet_comparison_by_counting`). "enumerate" compares
+        tables of all quartet resolutions in O(n^4) time.
     """
     # require trees to share the same tips
     assert set(tree1.get_tip_labels()) == set(tree2.get_tip_labels())
+    if method == "count":
+        return _get_quartet_comparison_by_counting(tree1, tree2)
+    if method == "enumerate":
+        return _get_quartet_comparison_by_enumeration(tree1, tree2)
+    raise ValueError("method must be 'count' or 'enumerate'.")
+
 
+def _get_quartet_comparison_by_enumeration(tree1: ToyTree, tree2: ToyTree) -> Mapping[str, int]:
+    """Return dict of quartet data by enumerating all quartets."""
     # get each quartet resolution array
     arr1 = get_quartet_resolutions_table(tree1)
     arr2 = get_quartet_resolutions_table(tree2)
@@ -116,6 +278,270 @@ def get_quartet_comparison(tree1: ToyTree, tree2: ToyTree) -> Mapping[str, int]:
     return data
 
 
+######################################################################
+# COUNT QUARTETS WITHOUT ENUMERATION
+#
+# A quartet ab|cd is resolved in a tree iff there is a Node x at which
+# a and b are in different directions (subtrees around x) and c and d
+# are together in a third direction. Exactly two Nodes satisfy this
+# for each resolved quartet (one with {a,b} apart, one with {c,d}
+# apart), and none do for an unresolved quartet. Thus, for every pair
+# of internal Nodes (x in tree1, y in tree2), the number of shared
+# and conflicting resolved quartets can be counted from the matrix of
+# leaves shared between the directions around x and around y.
+######################################################################
+
+
+def _get_node_directions(tree: ToyTree) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return arrays of the directions around each internal Node.
+
+    Each direction is a (Node idx, complement) pair representing the
+    tips in the clade of a child, or the complement of the Node's own
+    clade (the 'up' direction). Arrays are padded to the max degree.
+    Returns (internal Node idxs, direction Node idxs, complement flags).
+    """
+    nodes = [i for i in tree if not i.is_leaf()]
+    ndirs = max(len(i._children) + (not i.is_root()) for i in nodes)
+    didxs = np.full((len(nodes), ndirs), -1)
+    comps = np.zeros((len(nodes), ndirs), dtype=int)
+    for row, node in enumerate(nodes):
+        cidxs = [i._idx for i in node._children]
+        didxs[row, :len(cidxs)] = cidxs
+        if not node.is_root():
+            didxs[row, len(cidxs)] = node._idx
+            comps[row, len(cidxs)] = 1
+    return np.array([i._idx for i in nodes]), didxs, comps
+
+
+def _get_clade_intersections(tree1: ToyTree, tree2: ToyTree) -> np.ndarray:
+    """Return (nnodes1, nnodes2) array with N tips shared by clades.
+
+    Computed in O(n^2) by summing rows of children in idx order, first
+    for tree2 clade membership, and then for tree1 clades.
+    """
+    positions = {j: i for (i, j) in enumerate(tree1.get_tip_labels())}
+    order = [positions[i] for i in tree2.get_tip_labels()]
+
+    # clade membership of tree2 Nodes (nnodes2, ntips) in tree1 tip order
+    member2 = np.zeros((tree2.nnodes, tree2.ntips), dtype=np.int32)
+    member2[np.arange(tree2.ntips), order] = 1
+    for node in tree2[tree2.ntips:]:
+        member2[node._idx] = sum(member2[i._idx] for i in node._children)
+
+    # intersections of tree1 Nodes with tree2 Nodes.
+    inter = np.zeros((tree1.nnodes, tree2.nnodes), dtype=np.int32)
+    inter[:tree1.ntips] = member2.T
+    for node in tree1[tree1.ntips:]:
+        inter[node._idx] = sum(inter[i._idx] for i in node._children)
+    return inter
+
+
+def _get_n_resolved_quartets(tree: ToyTree) -> int:
+    """Return the number of resolved quartets in a tree."""
+    ntips = tree.ntips
+    sizes = np.zeros(tree.nnodes, dtype=np.int64)
+    sizes[:ntips] = 1
+    for node in tree[ntips:]:
+        sizes[node._idx] = sum(sizes[i._idx] for i in node._children)
+
+    # size of each direction around each internal Node, 0 if padded
+    _, didxs, comps = _get_node_directions(tree)
+    dsizes = np.where(comps, ntips - sizes[didxs], sizes[didxs]) * (didxs >= 0)
+
+    # at each Node, pairs in one direction x pairs in two others
+    others = (ntips - dsizes) ** 2 - ((dsizes ** 2).sum(axis=1, keepdims=True) - dsizes ** 2)
+    total = (dsizes * (dsizes - 1) // 2) * (others // 2)
+    return int(total.sum() // 2)
+
+
+def _get_quartet_comparison_by_counting(
+    tree1: ToyTree,
+    tree2: ToyTree,
+    max_size: int = 2 ** 22,
+) -> Mapping[str, int]:
+    """Return dict of quartet data by counting over pairs of Nodes.
+
+    For each pair of internal Nodes (x, y) an overlap matrix A with
+    the number of tips in direction i of x and direction j of y is
+    computed. Shared resolved quartets (S) are counted from cells in
+    which two leaves {c,d} are together, and two others {a,b} are in
+    different rows and columns, each counted twice across pairs.
+    Conflicting quartets (D) are counted as tuples in which the pairs
+    of leaves that are apart at x and at y share one leaf, each counted
+    four times across pairs. Other values are found from the number of
+    resolved quartets in each tree. This is computed for blocks of
+    Node pairs with array operations. Runtime is O(n^2 d^2) and memory
+    O(n^2) for n tips and max Node degree d.
+    """
+    ntips = tree1.ntips
+    inter = _get_clade_intersections(tree1, tree2).astype(np.int64)
+    sizes1 = inter[:, -1]
+    sizes2 = inter[-1, :]
+    _, didxs1, comps1 = _get_node_directions(tree1)
+    _, didxs2, comps2 = _get_node_directions(tree2)
+    valid2 = (didxs2 >= 0)[None, None]
+    sgn2 = (1 - 2 * comps2)[None, None]
+    comp2 = comps2[None, None]
+    size2 = sizes2[didxs2][None, None]
+
+    # iterate over blocks of Nodes in tree1
+    scount = dcount = 0
+    cells = didxs2.size * didxs1.shape[1]
+    bsize = max(1, max_size // max(1, cells))
+    for start in range(0, didxs1.shape[0], bsize):
+        dir1 = didxs1[start:start + bsize]
+        comp1 = comps1[start:start + bsize][:, :, None, None]
+
+        # (bx, p, ny, q) -> (bx, ny, p, q) overlap matrices
+        arr = inter[dir1[:, :, None, None], didxs2[None, None, :, :]]
+        arr = (
+            (1 - 2 * comp1) * sgn2 * arr
+            + comp2 * (1 - 2 * comp1) * sizes1[dir1][:, :, None, None]
+            + comp1 * (1 - 2 * comp2) * size2
+            + comp1 * comp2 * ntips
+        )
+        arr = arr * ((dir1 >= 0)[:, :, None, None] & valid2)
+        arr = arr.transpose(0, 2, 1, 3)
+
+        # row and col sums and sums of squares
+        rsum = arr.sum(axis=3, keepdims=True)
+        csum = arr.sum(axis=2, keepdims=True)
+        rsq = (arr ** 2).sum(axis=3, keepdims=True)
+        csq = (arr ** 2).sum(axis=2, keepdims=True)
+        rsum2 = (rsum ** 2).sum(axis=2, keepdims=True)
+        csum2 = (csum ** 2).sum(axis=3, keepdims=True)
+        asq = (arr ** 2).sum(axis=(2, 3), keepdims=True)
+        gamma = (rsum * arr).sum(axis=2, keepdims=True)
+        delta = (arr * csum).sum(axis=3, keepdims=True)
+
+        # S: {c,d} in cell (l,m), ordered {a,b} in other rows and cols
+        zsum = ntips - rsum - csum + arr
+        pairs = (
+            zsum ** 2
+            - (rsum2 - rsum ** 2 - gamma + rsum * arr)
+            - (csum2 - csum ** 2 - delta + csum * arr)
+            + (delta - arr * csum - rsq + arr ** 2)
+            + (gamma - arr * rsum - csq + arr ** 2)
+            + (asq - rsq - csq + arr ** 2)
+        )
+        scount += int((arr * (arr - 1) // 2 * pairs).sum()) // 2
+
+        # D: t in (l,m), b in row l, a in col m, s in other rows/cols
+        alpha = csum - arr
+        beta = rsum - arr
+        garr = arr @ np.swapaxes(arr, 2, 3) @ arr
+        dcount += int((arr * (
+            (ntips - rsum - csum + arr) * alpha * beta
+            - (gamma - arr * rsum) * beta
+            - (delta - arr * csum) * alpha
+            + (csq - arr ** 2) * beta
+            + (rsq - arr ** 2) * alpha
+            + garr - arr * rsq - arr * csq + arr ** 3
+        )).sum())
+
+    # each S counted twice for each ordered {a,b}; D four times.
+    data = {}
+    data["Q"] = ntips * (ntips - 1) * (ntips - 2) * (ntips - 3) // 24
+    data["S"] = scount // 2
+    data["D"] = dcount // 4
+    res1 = _get_n_resolved_quartets(tree1)
+    res2 = _get_n_resolved_quartets(tree2)
+    data["U"] = data["Q"] - res1 - res2 + data["S"] + data["D"]
+    data["R1"] = res1 - data["S"] - data["D"]
+    data["R2"] = res2 - data["S"] - data["D"]
+    data["N"] = data["S"] + data["D"] + data["R1"] + data["R2"] + data["U"]
+    return data
+
+
+######################################################################
+# SAMPLE QUARTETS FOR APPROXIMATE METRICS
+#
+# For very large trees random sets of 4 tips are sampled and resolved
+# in each tree by the four-point condition on topological distances:
+# ab|cd is resolved iff d(a,b) + d(c,d) is less than the two other
+# sums. The depth of the LCA of two tips is found in O(1) from a
+# sparse table of range minima of the LCA depths of adjacent tips.
+######################################################################
+
+
+def _get_tip_lca_lookup(tree: ToyTree, names: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return arrays used to look up distances between tips in O(1).
+
+    Returns the idx label of each tip in `names` order, the number of
+    edges from the root to each Node, and a sparse table in which row
+    k stores the min LCA depth of adjacent tips in [i, i + 2^k).
+    """
+    depths, _, adjacent = _get_lca_depth_arrays(tree, topology_only=True)
+    nlevels = int(np.log2(max(1, adjacent.size))) + 1
+    table = np.full((nlevels, adjacent.size), np.inf)
+    table[0] = adjacent
+    for level in range(1, nlevels):
+        step = 1 << (level - 1)
+        table[level, :-step] = np.minimum(table[level - 1, :-step], table[level - 1, step:])
+    idxs = {j: i for (i, j) in enumerate(tree.get_tip_labels())}
+    return np.array([idxs[i] for i in names]), depths, table
+
+
+def _get_tip_distances(lookup: Tuple[np.ndarray, np.ndarray, np.ndarray], tips0: np.ndarray, tips1: np.ndarray) -> np.ndarray:
+    """Return number of edges between pairs of different tips."""
+    order, depths, table = lookup
+    idx0 = order[tips0]
+    idx1 = order[tips1]
+    low = np.minimum(idx0, idx1)
+    high = np.maximum(idx0, idx1)
+    level = np.log2(high - low).astype(int)
+    lca = np.minimum(table[level, low], table[level, high - (1 << level)])
+    return depths[idx0] + depths[idx1] - 2 * lca
+
+
+def _get_quartet_resolutions(lookup: Tuple[np.ndarray, np.ndarray, np.ndarray], qrts: np.ndarray) -> np.ndarray:
+    """Return resolution of each quartet (row of 4 tips) in a tree.
+
+    Values are 0 if unresolved, or 1-3 for the position of the tip
+    paired with the first tip, as in `get_quartet_resolutions_table`.
+    """
+    tip0, tip1, tip2, tip3 = qrts.T
+    sums = np.column_stack([
+        _get_tip_distances(lookup, tip0, tip1) + _get_tip_distances(lookup, tip2, tip3),
+        _get_tip_distances(lookup, tip0, tip2) + _get_tip_distances(lookup, tip1, tip3),
+        _get_tip_distances(lookup, tip0, tip3) + _get_tip_distances(lookup, tip1, tip2),
+    ])
+    ordered = np.sort(sums, axis=1)
+    return np.where(ordered[:, 0] < ordered[:, 1], sums.argmin(axis=1) + 1, 0)
+
+
+def _iter_sampled_quartet_counts(
+    tree1: ToyTree,
+    tree2: ToyTree,
+    batch_size: int = 10_000,
+    seed: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """Yield counts of random quartets in categories S, D, U, R1, R2.
+
+    Each batch samples `batch_size` random sets of 4 tips (with
+    replacement among quartets), excluding any with repeated tips.
+    """
+    names = tree1.get_tip_labels()
+    if len(names) < 4:
+        raise ValueError("trees must have at least 4 tips to sample quartets.")
+    lookup1 = _get_tip_lca_lookup(tree1, names)
+    lookup2 = _get_tip_lca_lookup(tree2, names)
+    rng = np.random.default_rng(seed)
+    while 1:
+        qrts = rng.integers(0, len(names), size=(batch_size, 4))
+        qrts = qrts[(np.diff(np.sort(qrts, axis=1), axis=1) > 0).all(axis=1)]
+        res1 = _get_quartet_resolutions(lookup1, qrts)
+        res2 = _get_quartet_resolutions(lookup2, qrts)
+        both = (res1 > 0) & (res2 > 0)
+        yield np.array([
+            np.sum(both & (res1 == res2)),
+            np.sum(both & (res1 != res2)),
+            np.sum((res1 == 0) & (res2 == 0)),
+            np.sum((res1 > 0) & (res2 == 0)),
+            np.sum((res1 == 0) & (res2 > 0)),
+        ])
+
+
 ######################################################################
 # COMPUTE METRICS GIVEN A DATA DICT WITH KEYS D, S, R1, R2, U, N, Q
 # calculated in `get_quartet_comparison()`
@@ -175,6 +601,95 @@ QUARTET_METRICS = {
     "marczewski_steinhaus": get_qrt_metric_marczewski_steinhaus,
 }
 
+######################################################################
+# CONFIDENCE INTERVALS FOR METRICS FROM SAMPLED QUARTETS
+######################################################################
+
+QUARTET_CATEGORIES = ("S", "D", "U", "R1", "R2")
+
+
+def _get_sampled_data(counts: np.ndarray, nquartets: float) -> Dict[str, float]:
+    """Return a data dict of sample counts scaled to nquartets."""
+    data = {"Q": nquartets}
+    for key, count in zip(QUARTET_CATEGORIES, counts):
+        data[key] = nquartets * count / counts.sum()
+    data["N"] = nquartets
+    return data
+
+
+def _get_wilson_interval(value: float, nobs: float, ci: float) -> Tuple[float, float]:
+    """Return the Wilson score interval of a binomial proportion."""
+    zval = norm.ppf(0.5 + ci / 2)
+    denom = 1 + zval ** 2 / nobs
+    center = (value + zval ** 2 / (2 * nobs)) / denom
+    half = zval * np.sqrt(value * (1 - value) / nobs + zval ** 2 / (4 * nobs ** 2)) / denom
+    return max(0., center - half), min(1., center + half)
+
+
+def _get_sampled_metric_interval(counts: np.ndarray, metric: str, ci: float) -> Tuple[float, float, float]:
+    """Return (estimate, low, high) of a metric from sampled quartets.
+
+    The variance of the metric is estimated by the delta method from
+    the multinomial proportions of each category (with a pseudocount
+    of 0.5 so that it is > 0), and converted to an effective number of
+    binomial trials for a Wilson score interval. For metrics that are
+    proportions of a subset of quartets (e.g., S / (S + D)) this is
+    the Wilson interval with the size of that subset. Metrics outside
+    of [0, 1] use a normal interval.
+    """
+    func = QUARTET_METRICS[metric]
+    nobs = counts.sum()
+    try:
+        value = func(_get_sampled_data(counts, 1.))
+    except ZeroDivisionError:
+        return np.nan, np.nan, np.nan
+
+    # numerical gradient of the metric at the category proportions
+    props = (counts + 0.5) / (nobs + 0.5 * counts.size)
+    base = func(_get_sampled_data(props, 1.))
+    grad = np.zeros(counts.size)
+    for idx in range(counts.size):
+        step = props.copy()
+        step[idx] += 1e-7
+        grad[idx] = (func(_get_sampled_data(step, 1.)) - base) / 1e-7
+    var = grad @ (np.diag(props) - np.outer(props, props)) @ grad / nobs
+
+    if (0 < base < 1) and (0 <= value <= 1) and (var > 0):
+        neff = base * (1 - base) / var
+        return (value, *_get_wilson_interval(value, neff, ci))
+    half = norm.ppf(0.5 + ci / 2) * np.sqrt(var)
+    return value, value - half, value + half
+
+
+def _get_sampled_quartet_estimates(
+    tree1: ToyTree,
+    tree2: ToyTree,
+    metrics: Sequence[str],
+    precision: float = 0.005,
+    ci: float = 0.95,
+    max_samples: int = 1_000_000,
+    batch_size: int = 10_000,
+    seed: Optional[int] = None,
+) -> Tuple[np.ndarray, Dict[str, Tuple[float, float, float]]]:
+    """Return sample counts and (estimate, low, high) of each metric.
+
+    Quartets are sampled in batches until the half-width of the
+    confidence interval of every metric is <= precision, or until
+    max_samples quartets were sampled.
+    """
+    assert set(tree1.get_tip_labels()) == set(tree2.get_tip_labels())
+    counts = np.zeros(len(QUARTET_CATEGORIES), dtype=np.int64)
+    batch_size = min(batch_size, int(max_samples))
+    for batch in _iter_sampled_quartet_counts(tree1, tree2, batch_size, seed):
+        counts += batch
+        estimates = {i: _get_sampled_metric_interval(counts, i, ci) for i in metrics}
+        halfs = [(high - low) / 2 for (_, low, high) in estimates.values()]
+        if all(i <= precision for i in halfs) or counts.sum() >= max_samples:
+            break
+    logger.debug(f"sampled {counts.sum()} quartets")
+    return counts, estimates
+
+
 ######################################################################
 ######################################################################
 ######################################################################
@@ -185,7 +700,12 @@ def get_quartet_metric(
     tree2: ToyTree,
     metric: str = None,
     similarity: bool = False,
-) -> float:
+    approx: bool = False,
+    precision: float = 0.005,
+    ci: float = 0.95,
+    max_samples: int = 1_000_000,
+    seed: Optional[int] = None,
+) -> Union[float, Tuple[float, float, float], Dict[str, float]]:
     """Return a single quartet metric for two trees.
 
     Metrics
@@ -203,6 +723,28 @@ def get_quartet_metric(
     similarity: bool
         True returns similarity score, False returns a tree distance
         metric (1-similarity). Default is False.
+    approx: bool
+        If True the metric is estimated from randomly sampled quartets
+        and returned as a tuple (estimate, low, high) with a binomial
+        (Wilson) confidence interval. If metric is None, the data dict
+        of estimated counts is returned.
+    precision: float
+        Sampling stops early when the half-width of the confidence
+        interval is <= precision. Only used if approx=True.
+    ci: float
+        Confidence level of the interval. Only used if approx=True.
+    max_samples: int
+        Max number of quartets to sample. Only used if approx=True.
+    seed: int or None
+        Random seed for sampling quartets. Only used if approx=True.
+
+    Returns
+    -------
+    metric: float, Tuple[float, float, float], or Dict[str, float]
+        The metric value as a float, or if approx=True a tuple of
+        (estimate, low, high) where low and high are the bounds of
+        the confidence interval. If metric is None the dict of
+        (exact or estimated) quartet counts is returned instead.
 
     Example
     -------
@@ -212,7 +754,25 @@ def get_quartet_metric(
     >>> # {'Q': 70, 'S': 70, 'D': 0, 'U': 0, 'R1': 0, 'R2': 0, 'N': 140}
     >>> get_quartet_metric(tree1, tree2, "steel_and_penny")
     >>> # 0.5
+    >>> get_quartet_metric(tree1, tree2, "steel_and_penny", approx=True)
+    >>> # (0.497, 0.492, 0.502)
     """
+    if metric is not None and metric not in QUARTET_METRICS:
+        raise ValueError(
+            f"metric {metric} not recognized, must be one of "
+            f"{sorted(QUARTET_METRICS.keys())}.")
+
+    if approx:
+        counts, estimates = _get_sampled_quartet_estimates(
+            tree1, tree2, [metric] if metric else list(QUARTET_METRICS),
+            precision=precision, ci=ci, max_samples=max_samples, seed=seed)
+        if metric is None:
+            return _get_sampled_data(counts, toytree.enum.get_num_quartets(tree1.ntips))
+        value, low, high = estimates[metric]
+        if not similarity:
+            return 1 - value, 1 - high, 1 - low
+        return value, low, high
+
     data = get_quartet_comparison(tree1, tree2)
     if metric is None:
         return data
@@ -231,12 +791,18 @@ def get_treedist_quartets(
     tree1: ToyTree,
     tree2: ToyTree,
     similarity: bool = False,
+    approx: bool = False,
+    precision: float = 0.005,
+    ci: float = 0.95,
+    max_samples: int = 1_000_000,
+    seed: Optional[int] = None,
 ) -> pd.Series:
     """Return a pd.Series with all quartet metrics for two trees.
 
     This returns all quartet metrics computed between two trees, since
-    once quartets are enumerated and compared calculating the metrics
-    is fast and simple.
+    once quartets are counted and compared calculating the metrics is
+    fast and simple. Quartets are counted without enumerating them (see
+    `get_quartet_comparison`), in O(n^2) time for binary trees.
 
     Parameters
     ----------
@@ -247,6 +813,23 @@ def get_treedist_quartets(
     similarity: bool
         True returns similarity score, False returns a tree distance
         metric (1-similarity). Default is False.
+    approx: bool
+        If True, quartets are randomly sampled (rather than counted)
+        and resolved in each tree by the four-point condition using
+        O(1) lookups of LCA depths. This is useful for trees with tens
+        of thousands of tips. A pd.DataFrame is returned with columns
+        'estimate', 'low' and 'high' for the estimates and binomial
+        (Wilson) confidence intervals of counts and metrics, and the
+        number of sampled quartets in `.attrs["nsamples"]`.
+    precision: float
+        Sampling stops early when the half-width of the confidence
+        interval of every metric is <= precision. Default is 0.005.
+    ci: float
+        Confidence level of intervals. Default is 0.95.
+    max_samples: int
+        Max number of quartets to sample. Default is 1e6.
+    seed: int or None
+        Random seed for sampling quartets.
 
     Examples
     --------
@@ -302,6 +885,29 @@ def get_treedist_quartets(
     ---------
     https://ms609.github.io/Quartet/reference/SimilarityMetrics.html
     """
+    if approx:
+        counts, estimates = _get_sampled_quartet_estimates(
+            tree1, tree2, list(QUARTET_METRICS),
+            precision=precision, ci=ci, max_samples=max_samples, seed=seed)
+        nquartets = toytree.enum.get_num_quartets(tree1.ntips)
+        data = _get_sampled_data(counts, nquartets)
+        frame = pd.DataFrame(
+            index=list(data.keys()) + list(QUARTET_METRICS.keys()),
+            columns=["estimate", "low", "high"],
+            dtype=np.float64,
+        )
+        for key, value in data.items():
+            frame.loc[key] = value, value, value
+        for key, count in zip(QUARTET_CATEGORIES, counts):
+            low, high = _get_wilson_interval(count / counts.sum(), counts.sum(), ci)
+            frame.loc[key, ["low", "high"]] = nquartets * low, nquartets * high
+        for metric, (value, low, high) in estimates.items():
+            if not similarity:
+                value, low, high = 1 - value, 1 - high, 1 - low
+            frame.loc[metric] = value, low, high
+        frame.attrs["nsamples"] = int(counts.sum())
+        return frame
+
     data = get_quartet_comparison(tree1, tree2)
     methods = list(data.keys()) + list(QUARTET_METRICS.keys())
     frame = pd.Series(index=methods, dtype=np.float64)
@@ -338,3 +944,13 @@ if __name__ == "__main__":
     tree2 = toytree.rtree.unittree(8, seed=1233)
     tree2.mod.collapse_nodes(10, 11, inplace=True)
     print(get_treedist_quartets(tree1, tree2, similarity=False))
+
+    # benchmark counting versus enumerating quartets
+    import time
+    for ntips in (10, 20, 40):
+        tree1 = toytree.rtree.rtree(ntips, seed=123)
+        tree2 = toytree.rtree.rtree(ntips, seed=321)
+        for method in ("enumerate", "count"):
+            start = time.time()
+            get_quartet_comparison(tree1, tree2, method=method)
+            print(f"ntips={ntips} {method}: {time.time() - start:.4f}s")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+
+"""Inverted index of splits for nearest-tree search.
+
+A SplitIndex maps the hash of every non-trivial split (bipartition)
+in a collection of trees to the ids of trees containing it, stored as
+a sorted array of unique split hashes with CSR-style offsets into an
+array of tree ids. A query tree is compared to all trees by looking
+up only its own splits, and counting the number of times each tree
+id occurs in their postings, which gives the number of shared splits
+and thus the RF distance (or Jaccard distance) to every tree without
+comparing pairs of trees.
+
+Split hashes are computed in a single pass over Node idx labels as
+the XOR of 64-bit hashes of tip names, such that the hash of a clade
+and its complement are related by XOR with the hash of all tips, and
+the smaller of the two is used as the canonical hash of the split.
+"""
+
+from typing import Dict, Sequence, Union, TypeVar
+import hashlib
+import numpy as np
+import pandas as pd
+from toytree.core import ToyTree
+from toytree.distance._src.treedist import get_treedist_rf
+
+MultiTree = TypeVar("MultiTree")
+
+__all__ = ["SplitIndex"]
+
+
+def _get_tip_hashes(names: Sequence[str]) -> Dict[str, int]:
+    """Return a dict mapping tip names to 64-bit int hashes.
+
+    Hashes are derived from the names themselves, such that they are
+    consistent across trees, collections, and sessions.
+    """
+    return {
+        i: int.from_bytes(hashlib.blake2b(str(i).encode(), digest_size=8).digest(), "little")
+        for i in names
+    }
+
+
+def _get_split_hashes(tree: ToyTree, tip_hashes: Dict[str, int]) -> np.ndarray:
+    """Return sorted array of unique uint64 hashes of non-trivial splits.
+
+    The hash of each clade is the XOR of the hashes of its tips, and
+    a split is represented by the min of the hashes of its two sides.
+    Trivial splits (single tips) and the root are excluded, and
+    the two clades of a bifurcating root are the same split.
+    """
+    ntips = tree.ntips
+    hashes = [0] * tree.nnodes
+    sizes = [1] * ntips + [0] * (tree.nnodes - ntips)
+    try:
+        for node in tree[:ntips]:
+            hashes[node._idx] = tip_hashes[node.name]
+    except KeyError as exc:
+        raise ValueError(f"tip {exc} is not in the indexed trees.") from exc
+    for node in tree[ntips:]:
+        for child in node._children:
+            hashes[node._idx] ^= hashes[child._idx]
+            sizes[node._idx] += sizes[child._idx]
+
+    # canonical hashes of non-trivial splits
+    arr = np.array(hashes[ntips:-1], dtype=np.uint64)
+    size = np.array(sizes[ntips:-1])
+    arr = arr[(size > 1) & (size < ntips - 1)]
+    arr = np.minimum(arr, arr ^ np.uint64(hashes[-1]))
+    return np.unique(arr)
+
+
+class SplitIndex:
+    """Inverted index of split hashes to tree ids for fast search.
+
+    The index is built once for a collection of trees (e.g., a
+    MultiTree) that share the same set of tip names, and can then be
+    queried for the trees closest to a query tree by RF or Jaccard
+    distance of their split sets. A query looks up only the splits of
+    the query tree, and the top candidates are re-ranked using
+    `toytree.distance.get_treedist_rf`.
+
+    Parameters
+    ----------
+    trees: MultiTree or Sequence[ToyTree]
+        A collection of trees with the same tip names.
+
+    Examples
+    --------
+    >>> mtree = toytree.mtree([toytree.rtree.rtree(20, seed=i) for i in range(1000)])
+    >>> index = toytree.distance.SplitIndex(mtree)
+    >>> index.query(mtree[0], k=5)
+    """
+    def __init__(self, trees: Union[MultiTree, Sequence[ToyTree]]):
+        self.trees = list(trees)
+        """: the indexed trees."""
+        self.tip_hashes = _get_tip_hashes(self.trees[0].get_tip_labels())
+        """: dict of 64-bit hash of each tip name."""
+
+        # get split hashes of each tree and concatenate as (hash, tree id)
+        hashes = [_get_split_hashes(i, self.tip_hashes) for i in self.trees]
+        self.nsplits = np.array([i.size for i in hashes], dtype=np.int64)
+        """: number of unique non-trivial splits in each tree."""
+        hashes = np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.uint64)
+        tree_ids = np.repeat(np.arange(len(self.trees), dtype=np.int32), self.nsplits)
+
+        # sort by hash and store CSR-style postings
+        order = np.argsort(hashes, kind="stable")
+        self.splits, counts = np.unique(hashes[order], return_counts=True)
+        """: sorted array of unique split hashes."""
+        self.indptr = np.concatenate([[0], np.cumsum(counts)])
+        """: offsets of the postings of each split in `tree_ids`."""
+        self.tree_ids = tree_ids[order]
+        """: ids of trees containing each split, grouped by split."""
+
+    def __len__(self) -> int:
+        return len(self.trees)
+
+    def __repr__(self) -> str:
+        return f"<toytree.SplitIndex ntrees={len(self)} nsplits={self.splits.size}>"
+
+    def get_shared_split_counts(self, tree: ToyTree) -> np.ndarray:
+        """Return the number of splits each indexed tree shares with tree.
+
+        This looks up the postings of only the splits in the query
+        tree, and counts the occurrences of each tree id.
+        """
+        query = _get_split_hashes(tree, self.tip_hashes)
+        pos = np.searchsorted(self.splits, query).clip(max=max(0, self.splits.size - 1))
+        pos = pos[self.splits[pos] == query] if self.splits.size else pos[:0]
+
+        # concatenate the ranges of tree ids of each found split
+        starts = self.indptr[pos]
+        lengths = self.indptr[pos + 1] - starts
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        postings = self.tree_ids[np.repeat(starts, lengths) + offsets]
+        return np.bincount(postings, minlength=len(self))
+
+    def query(
+        self,
+        tree: ToyTree,
+        k: int = 10,
+        metric: str = "rf",
+        normalize: bool = False,
+        rerank: bool = True,
+    ) -> pd.DataFrame:
+        """Return a DataFrame with the k closest indexed trees to tree.
+
+        Parameters
+        ----------
+        tree: ToyTree
+            A query tree with the same tip names as the indexed trees.
+        k: int
+            The number of closest trees to return (>= 1).
+        metric: str
+            "rf" for the Robinson-Foulds distance (symmetric difference
+            of split sets) or "jaccard" for 1 - the Jaccard similarity
+            of split sets.
+        normalize: bool
+            If True the RF distance is normalized by the total number
+            of splits in both trees, as in `get_treedist_rf`.
+        rerank: bool
+            If True (default) distances to the top candidates, which
+            are estimated from split hashes, are re-computed exactly
+            with `get_treedist_rf` before ranking. Estimates differ only
+            if hashes of different splits collide (very unlikely).
+
+        Returns
+        -------
+        A pd.DataFrame with the index of each tree in the collection
+        ('tree'), the number of shared splits ('shared'), and its
+        distance ('rf' or 'jaccard'), sorted by distance.
+        """
+        if metric not in ("rf", "jaccard"):
+            raise ValueError("metric must be 'rf' or 'jaccard'.")
+        if k < 1:
+            raise ValueError("k must be >= 1.")
+        shared = self.get_shared_split_counts(tree)
+        nquery = _get_split_hashes(tree, self.tip_hashes).size
+
+        # select 2k candidates with the lowest estimated distances
+        ncands = min(len(self), 2 * k)
+        scores = self._get_scores(shared, nquery, self.nsplits, metric, normalize)
+        cands = np.argpartition(scores, ncands - 1)[:ncands]
+
+        # re-compute shared split counts from exact RF distances
+        if rerank:
+            dists = np.array([get_treedist_rf(tree, self.trees[i]) for i in cands])
+            shared[cands] = (nquery + self.nsplits[cands] - dists) // 2
+            scores = self._get_scores(shared, nquery, self.nsplits, metric, normalize)
+
+        # sort by distance, then tree index, and return top k
+        cands = cands[np.lexsort((cands, scores[cands]))][:k]
+        return pd.DataFrame({
+            "tree": cands,
+            "shared": shared[cands],
+            metric: scores[cands],
+        })
+
+    @staticmethod
+    def _get_scores(shared, nquery, nsplits, metric, normalize) -> np.ndarray:
+        """Return RF or Jaccard distances from shared split counts."""
+        if metric == "jaccard":
+            union = nquery + nsplits - shared
+            return 1 - np.divide(shared, union, out=np.ones(union.size), where=union > 0)
+        dists = nquery + nsplits - 2 * shared
+        if normalize:
+            total = nquery + nsplits
+            return np.divide(dists, total, out=np.zeros(total.size), where=total > 0)
+        return dists
+
+
+if __name__ == "__main__":
+
+    import toytree
+    TREES = [toytree.rtree.rtree(20, seed=i) for i in range(200)]
+    INDEX = SplitIndex(toytree.mtree(TREES))
+    print(INDEX)
+    print(INDEX.query(TREES[0], k=5))
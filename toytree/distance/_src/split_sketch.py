@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+
+"""MinHash sketches of split sets for approximate RF at scale.
+
+A MinHash sketch of a tree is a fixed-size signature of k uint64
+values, each the min over the tree's canonical split hashes (see
+`split_index`) of a different random hash function. The proportion
+of positions at which the sketches of two trees are equal is an
+unbiased estimate of the Jaccard similarity J of their split sets,
+with standard error sqrt(J(1 - J) / k). The RF distance follows from
+J and the number of splits in each tree, since the number of shared
+splits is J (n1 + n2) / (1 + J).
+
+All-pairs similarity among many trees is thus a vectorized comparison
+of an (ntrees, k) array of signatures, rather than a comparison of
+sets of splits for every pair of trees.
+
+References
+----------
+- Broder, A. Z. (1997) "On the resemblance and containment of
+  documents". Proceedings of Compression and Complexity of Sequences.
+"""
+
+from typing import Union, Sequence, TypeVar, Optional, Tuple
+import numpy as np
+from toytree.core import ToyTree
+from toytree.distance._src.split_index import _get_tip_hashes, _get_split_hashes
+
+MultiTree = TypeVar("MultiTree")
+
+__all__ = [
+    "sketch_splits",
+    "get_sketch_jaccard_matrix",
+    "get_treedist_rf_sketch_matrix",
+]
+
+EMPTY = np.iinfo(np.uint64).max
+
+
+def _mix64(arr: np.ndarray) -> np.ndarray:
+    """Return uint64 hashes of uint64 values (splitmix64 finalizer)."""
+    arr = arr + np.uint64(0x9E3779B97F4A7C15)
+    arr = (arr ^ (arr >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    arr = (arr ^ (arr >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return arr ^ (arr >> np.uint64(31))
+
+
+def sketch_splits(
+    trees: Union[ToyTree, MultiTree, Sequence[ToyTree]],
+    k: int = 128,
+    seed: int = 0,
+    return_nsplits: bool = False,
+    chunk_size: int = 1000,
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """Return MinHash sketches of the split sets of one or more trees.
+
+    Each tree's non-trivial splits are hashed to canonical 64-bit
+    values from its tip names, such that sketches of trees with the
+    same tip names are comparable across collections and sessions if
+    they use the same k and seed. Trees with no non-trivial splits
+    (star trees) have sketches of the max uint64 value.
+
+    Parameters
+    ----------
+    trees: ToyTree, MultiTree, or Sequence[ToyTree]
+        A tree, or collection of trees sharing the same tip names.
+    k: int
+        Number of hash functions, i.e., the size of each sketch. The
+        standard error of Jaccard similarity estimates is <= 0.5/sqrt(k).
+    seed: int
+        Seed used to generate the k hash functions.
+    return_nsplits: bool
+        If True, also return the number of splits in each tree, which
+        is needed to estimate un-normalized RF distances.
+    chunk_size: int
+        Number of trees for which splits are hashed at a time.
+
+    Returns
+    -------
+    An array of shape (k,) for a single ToyTree, or (ntrees, k) for a
+    collection of trees, and optionally an array of nsplits.
+
+    Examples
+    --------
+    >>> mtree = toytree.mtree([toytree.rtree.rtree(50, seed=i) for i in range(100)])
+    >>> sketches, nsplits = toytree.distance.sketch_splits(mtree, k=256, return_nsplits=True)
+    >>> rf = toytree.distance.get_treedist_rf_sketch_matrix(sketches, nsplits1=nsplits)
+    """
+    single = isinstance(trees, ToyTree)
+    trees = [trees] if single else list(trees)
+    tip_hashes = _get_tip_hashes(trees[0].get_tip_labels())
+    salts = np.random.default_rng(seed).integers(0, EMPTY, size=k, dtype=np.uint64, endpoint=True)
+
+    # hash each split with each salt and take the min for each tree,
+    # for chunks of trees at a time, skipping trees with no splits.
+    hashes = [_get_split_hashes(i, tip_hashes) for i in trees]
+    nsplits = np.array([i.size for i in hashes], dtype=np.int64)
+    sketches = np.full((len(trees), k), EMPTY, dtype=np.uint64)
+    tidxs = np.nonzero(nsplits)[0]
+    for start in range(0, tidxs.size, chunk_size):
+        chunk = tidxs[start:start + chunk_size]
+        splits = np.concatenate([hashes[i] for i in chunk])
+        offsets = np.concatenate([[0], np.cumsum(nsplits[chunk])[:-1]])
+        sketches[chunk] = np.minimum.reduceat(_mix64(splits[:, None] ^ salts), offsets, axis=0)
+
+    if single:
+        sketches, nsplits = sketches[0], nsplits[0]
+    if return_nsplits:
+        return sketches, nsplits
+    return sketches
+
+
+def get_sketch_jaccard_matrix(
+    sketches1: np.ndarray,
+    sketches2: Optional[np.ndarray] = None,
+    chunk_size: int = 1000,
+) -> np.ndarray:
+    """Return estimated Jaccard similarity of split sets from sketches.
+
+    The estimate for each pair of trees is the proportion of equal
+    values in their sketches. This is computed in chunks of rows of
+    sketches1, comparing one hash position at a time, such that the
+    memory of intermediate arrays is chunk_size x ntrees2.
+
+    Parameters
+    ----------
+    sketches1: np.ndarray
+        Array of shape (ntrees1, k) from `sketch_splits`.
+    sketches2: np.ndarray or None
+        Array of shape (ntrees2, k) from `sketch_splits` with the same
+        k and seed. If None then sketches1 is compared to itself.
+    chunk_size: int
+        Number of rows of sketches1 compared at a time.
+
+    Returns
+    -------
+    A float array of shape (ntrees1, ntrees2).
+    """
+    sketches1 = np.atleast_2d(sketches1)
+    sketches2 = sketches1 if sketches2 is None else np.atleast_2d(sketches2)
+    if sketches1.shape[1] != sketches2.shape[1]:
+        raise ValueError("sketches must have the same size (k).")
+    ksize = sketches1.shape[1]
+    sims = np.zeros((sketches1.shape[0], sketches2.shape[0]))
+    for start in range(0, sketches1.shape[0], chunk_size):
+        chunk = sketches1[start:start + chunk_size]
+        counts = np.zeros((chunk.shape[0], sketches2.shape[0]), dtype=np.int32)
+        for col in range(ksize):
+            counts += chunk[:, col, None] == sketches2[None, :, col]
+        sims[start:start + chunk_size] = counts / ksize
+    return sims
+
+
+def get_treedist_rf_sketch_matrix(
+    sketches1: np.ndarray,
+    sketches2: Optional[np.ndarray] = None,
+    nsplits1: Optional[np.ndarray] = None,
+    nsplits2: Optional[np.ndarray] = None,
+    normalize: bool = True,
+    chunk_size: int = 1000,
+) -> np.ndarray:
+    """Return approximate RF distances between trees from sketches.
+
+    The RF distance is estimated from the estimated Jaccard similarity
+    J of split sets. The normalized RF distance (normalized by the
+    total number of splits in both trees, as in `get_treedist_rf`) is
+    (1 - J) / (1 + J), whereas the un-normalized distance also requires
+    the number of splits in each tree (see `sketch_splits`).
+
+    Parameters
+    ----------
+    sketches1: np.ndarray
+        Array of shape (ntrees1, k) from `sketch_splits`.
+    sketches2: np.ndarray or None
+        Array of shape (ntrees2, k). If None then sketches1 is compared
+        to itself.
+    nsplits1: np.ndarray or None
+        Number of splits in each tree of sketches1. Required if
+        normalize=False.
+    nsplits2: np.ndarray or None
+        Number of splits in each tree of sketches2. If None and
+        sketches2 is None then nsplits1 is used.
+    normalize: bool
+        Return RF distances normalized to [0, 1].
+    chunk_size: int
+        Number of rows of sketches1 compared at a time.
+    """
+    sims = get_sketch_jaccard_matrix(sketches1, sketches2, chunk_size)
+    if normalize:
+        return (1 - sims) / (1 + sims)
+    if nsplits1 is None:
+        raise ValueError("nsplits1 is required to estimate un-normalized RF.")
+    if nsplits2 is None:
+        if sketches2 is not None:
+            raise ValueError("nsplits2 is required if sketches2 is not None.")
+        nsplits2 = nsplits1
+    total = np.atleast_1d(nsplits1)[:, None] + np.atleast_1d(nsplits2)[None, :]
+    return total - 2 * sims * total / (1 + sims)
+
+
+if __name__ == "__main__":
+
+    import toytree
+    TREES = [toytree.rtree.rtree(30, seed=i) for i in range(100)]
+    SKETCHES, NSPLITS = sketch_splits(TREES, k=256, return_nsplits=True)
+    print(get_treedist_rf_sketch_matrix(SKETCHES, nsplits1=NSPLITS, normalize=False)[:5, :5].round(1))
+    print(np.array([[toytree.distance.get_treedist_rf(i, j) for j in TREES[:5]] for i in TREES[:5]]))
@@ -2,55 +2,776 @@
 
 """Tree distance measures based on tree moves (SPR and NNI).
 
-TODO.
+rSPR distance
+-------------
+The rooted subtree-prune-and-regraft (rSPR) distance between two
+rooted binary trees is the min number of rSPR moves that transform
+one tree into the other. It is equal to the number of components in
+a maximum agreement forest (MAF) of the two trees minus one, after
+adding a root leaf 'rho' above the root of each tree (Bordewich and
+Semple 2005). This is computed exactly with a fixed-parameter (FPT)
+branching algorithm in O(3^k n) time for a distance of k, after
+kernelization reductions that shrink the problem:
+
+- subtree reduction: clades with the same topology in both trees
+  (common pendant subtrees) are contracted into a single leaf.
+- chain reduction: common chains of > 3 pendant leaves are reduced to
+  3 leaves (Bordewich and Semple 2005).
+
+NNI distance
+------------
+The nearest neighbor interchange (NNI) distance is NP-hard to compute.
+It is approximated as in Li et al. (1996). Each edge that is in one
+tree but not the other must be moved by at least one NNI, which gives
+a lower bound. Edges shared by both trees divide each tree into regions
+of unmatched edges, which are reconciled separately, and the sum of
+their distances gives an upper bound. Distances of small regions are
+computed exactly by breadth-first search of NNI moves, and of larger
+regions by building the clusters of one tree in the other by moving
+subtrees along paths of NNI moves.
 
 References
 ----------
-- 
+- Bordewich, M. and Semple, C. (2005) "On the computational complexity
+  of the rooted subtree prune and regraft distance". Annals of
+  Combinatorics 8, 409-423.
+- Whidden, C., Beiko, R. G. and Zeh, N. (2013) "Fixed-parameter
+  algorithms for maximum agreement forests". SIAM Journal on Computing
+  42(4), 1431-1466.
+- Li, M., Tromp, J., and Zhang, L. (1996) "On the nearest neighbour
+  interchange distance between evolutionary trees". Journal of
+  Theoretical Biology 182(4), 463-467.
+- Robinson, D. F. (1971) "Comparison of labeled trees with valency
+  three". Journal of Combinatorial Theory, Series B, 11(2), 105-119.
 """
 
+from typing import Dict, List, Tuple, Optional, Iterator, Sequence, Union, TypeVar, Callable
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import time
+from loguru import logger
+import numpy as np
+from toytree.core import ToyTree
+from toytree.core.apis import TreeDistanceAPI, add_subpackage_method
+from toytree.utils import ToytreeError
+
+logger = logger.bind(name="toytree")
+MultiTree = TypeVar("MultiTree")
+
+# a tree or forest as ({node: parent}, {node: [children]}) where
+# leaves have int ids >= 0 and internal nodes have ids < 0.
+Forest = Tuple[Dict[int, Optional[int]], Dict[int, List[int]]]
+
+__all__ = [
+    "get_treedist_spr",
+    "get_treedist_spr_matrix",
+    "get_treedist_nni",
+    "get_treedist_nni_matrix",
+]
+
+
+class _TimeLimitExceeded(Exception):
+    """Raised internally when a time budget is exceeded."""
+
+
+def _check_time(deadline: Optional[float]) -> None:
+    if deadline is not None and time.time() > deadline:
+        raise _TimeLimitExceeded
+
+
+######################################################################
+# FOREST OPERATIONS
+######################################################################
+
+
+def _copy_forest(forest: Forest) -> Forest:
+    par, kids = forest
+    return dict(par), {i: list(j) for (i, j) in kids.items()}
+
+
+def _get_root(forest: Forest, node: int) -> int:
+    par = forest[0]
+    while par[node] is not None:
+        node = par[node]
+    return node
+
+
+def _suppress(forest: Forest, node: int) -> None:
+    """Remove an internal node with a single child."""
+    par, kids = forest
+    if len(kids[node]) == 1:
+        child = kids[node][0]
+        parent = par[node]
+        par[child] = parent
+        if parent is not None:
+            kids[parent][kids[parent].index(node)] = child
+        del par[node], kids[node]
+
+
+def _cut(forest: Forest, node: int) -> None:
+    """Cut the edge above node, making it the root of a component."""
+    par, kids = forest
+    parent = par[node]
+    par[node] = None
+    kids[parent].remove(node)
+    _suppress(forest, parent)
+
+
+def _remove_leaf(forest: Forest, leaf: int) -> None:
+    """Remove a leaf and suppress its parent."""
+    if forest[0][leaf] is not None:
+        _cut(forest, leaf)
+    del forest[0][leaf], forest[1][leaf]
+
+
+def _contract(forest: Forest, leaf0: int, leaf1: int, new: int) -> None:
+    """Replace two sibling leaves and their parent by a new leaf."""
+    par, kids = forest
+    parent = par[leaf0]
+    grandparent = par[parent]
+    for node in (leaf0, leaf1, parent):
+        del par[node], kids[node]
+    par[new] = grandparent
+    kids[new] = []
+    if grandparent is not None:
+        kids[grandparent][kids[grandparent].index(parent)] = new
+
+
+def _get_pendants(forest: Forest, leaf0: int, leaf1: int) -> List[int]:
+    """Return nodes pendant to the path between two leaves."""
+    par, kids = forest
+    path0 = [leaf0]
+    while par[path0[-1]] is not None:
+        path0.append(par[path0[-1]])
+    ancestors = set(path0)
+    path1 = [leaf1]
+    while path1[-1] not in ancestors:
+        path1.append(par[path1[-1]])
+    lca = path1.pop()
+    path0 = path0[:path0.index(lca)]
+    pendants = []
+    for node in path0[:-1] + path1[:-1]:
+        pendants.extend(i for i in kids[par[node]] if i != node)
+    return pendants
+
+
+######################################################################
+# rSPR DISTANCE
+######################################################################
+
+
+def _get_clade_masks(tree: ToyTree, bits: Dict[str, int]) -> List[int]:
+    """Return list of int bitmasks of the tips in each clade by idx."""
+    masks = [0] * tree.nnodes
+    for node in tree:
+        if node.is_leaf():
+            masks[node._idx] = bits[node.name]
+        else:
+            for child in node._children:
+                masks[node._idx] |= masks[child._idx]
+    return masks
 
-def tree_dist_nni():
+
+def _get_restricted_forest(node, masks: List[int], leaves: Dict[int, int], counter: Iterator[int]) -> Forest:
+    """Return the subtree below node with some clades as single leaves.
+
+    Clades whose masks are in `leaves` are represented by a leaf with
+    the int id in `leaves`.
+    """
+    par, kids = {}, {}
+    stack = [(node, None)]
+    while stack:
+        node, parent = stack.pop()
+        mask = masks[node._idx]
+        if mask in leaves and parent is not None:
+            nid = leaves[mask]
+        else:
+            nid = next(counter)
+            stack.extend((i, nid) for i in node._children)
+        par[nid] = parent
+        kids[nid] = []
+        if parent is not None:
+            kids[parent].append(nid)
+    return par, kids
+
+
+def _get_reduced_trees(tree1: ToyTree, tree2: ToyTree) -> Optional[Tuple[Forest, Forest, int]]:
+    """Return (tree1, tree2, nleaves) with common pendant subtrees reduced.
+
+    Each maximal clade that has the same topology in both trees (a
+    common pendant subtree) is replaced by a single leaf (subtree
+    reduction). Returns None if the trees are identical.
+    """
+    bits = {j: 1 << i for (i, j) in enumerate(tree1.get_tip_labels())}
+    masks1 = _get_clade_masks(tree1, bits)
+    masks2 = _get_clade_masks(tree2, bits)
+    common = set(masks1) & set(masks2)
+
+    # clades that are shared, and all clades within which are shared
+    pendant = [False] * tree1.nnodes
+    for node in tree1:
+        pendant[node._idx] = (
+            masks1[node._idx] in common
+            and all(pendant[i._idx] for i in node._children)
+        )
+    if pendant[tree1.treenode._idx]:
+        return None
+
+    # find the maximal common pendant subtrees
+    leaves = {}
+    stack = list(tree1.treenode._children)
+    while stack:
+        node = stack.pop()
+        if pendant[node._idx]:
+            leaves[masks1[node._idx]] = len(leaves)
+        else:
+            stack.extend(node._children)
+    counter = itertools.count(-1, -1)
+    forest1 = _get_restricted_forest(tree1.treenode, masks1, leaves, counter)
+    forest2 = _get_restricted_forest(tree2.treenode, masks2, leaves, counter)
+    return forest1, forest2, len(leaves)
+
+
+def _get_chain_parent(forest: Forest, leaf: int) -> Optional[int]:
+    """Return the leaf that is a sibling of the parent of leaf, or None."""
+    par, kids = forest
+    parent = par[leaf]
+    if parent is None or par[parent] is None:
+        return None
+    other = [i for i in kids[par[parent]] if i != parent][0]
+    return other if other >= 0 else None
+
+
+def _reduce_chains(forest1: Forest, forest2: Forest) -> None:
+    """Reduce common chains of pendant leaves to a length of 3.
+
+    A chain is a sequence of leaves (a1, a2, ..., at) in which the
+    parent of a(i) is a child of the parent of a(i+1) in both trees.
+    Leaves a4...at are removed from both trees.
     """
+    leaves = [i for i in forest1[0] if i >= 0]
+    chain = {}
+    for leaf in leaves:
+        nxt = _get_chain_parent(forest1, leaf)
+        if nxt is not None and nxt == _get_chain_parent(forest2, leaf):
+            chain[leaf] = nxt
+    starts = set(chain) - set(chain.values())
+    removed = set()
+    for leaf in sorted(starts):
+        path = [leaf]
+        while path[-1] in chain:
+            path.append(chain[path[-1]])
+        for node in path[3:]:
+            if node not in removed:
+                _remove_leaf(forest1, node)
+                _remove_leaf(forest2, node)
+                removed.add(node)
 
-    Use the approach of Li et al. (1996) to approximate the Nearest 
-    Neighbour Interchange distance (Robinson, 1971) between 
-    phylogenetic trees.
 
-    FROM TREEDIST:
-    https://cran.r-project.org/web/packages/TreeDist/TreeDist.pdf
+def _add_root_leaf(forest: Forest, rho: int, counter: Iterator[int]) -> None:
+    """Add a leaf rho as the sibling of the root of a tree."""
+    par, kids = forest
+    root = [i for (i, j) in par.items() if j is None][0]
+    new = next(counter)
+    par[new] = None
+    kids[new] = [root, rho]
+    par[root] = par[rho] = new
+    kids[rho] = []
 
-    In brief, this approximation algorithm works by identifying edges in one tree that do not match
-    edges in the second. Each of these edges must undergo at least one NNI operation in order to
-    reconcile the trees. Edges that match in both trees need never undergo an NNI operation, and divide
-    each tree into smaller regions. By ’cutting’ matched edges into two, a tree can be divided into a
-    number of regions that solely comprise unmatched edges.
-    These regions can be viewed as separate trees that need to be reconciled. One way to reconcile
-    these trees is to conduct a series of NNI operations that reduce a tree to a pectinate (caterpillar) tree,
-    then to conduct an analogue of the mergesort algorithm. This takes at most n log n + O(n) NNI
-    operations, and provides a loose upper bound on the NNI score. The maximum number of moves
-    for an n-leaf tree (OEIS A182136) can be calculated exactly for small trees (Fack et al. 2002); this
-    provides a tighter upper bound, but is unavailable for n > 12. NNIDiameter() reports the limits on
-    this bound.    
 
-    References
+def _has_agreement_forest(
+    tree1: Forest,
+    forest2: Forest,
+    ncuts: int,
+    labels: Iterator[int],
+    deadline: Optional[float],
+) -> bool:
+    """Return True if an agreement forest exists with <= ncuts cuts.
+
+    Following Whidden et al. (2013), leaves of tree1 that are isolated
+    in forest2 are removed from tree1, and sibling leaves (a, c) of
+    tree1 that are also siblings in forest2 are contracted. Otherwise,
+    an agreement forest must cut the edge above a, above c, or if a
+    and c are in the same component, all edges pendant to the path
+    between them, on which the search branches. If there is only one
+    pendant edge then it is safe to cut it without branching.
+    """
+    par1, kids1 = tree1
+    par2 = forest2[0]
+    while 1:
+        _check_time(deadline)
+        for leaf in [i for i in par1 if i >= 0]:
+            if par2[leaf] is None and len(par1) > 1:
+                _remove_leaf(tree1, leaf)
+        if len(par1) <= 1:
+            return True
+
+        # find a cherry in tree1 and contract if a cherry in forest2
+        leaf0, leaf1 = next(
+            j for (i, j) in kids1.items() if len(j) == 2 and j[0] >= 0 and j[1] >= 0)
+        if par2[leaf0] is not None and par2[leaf0] == par2[leaf1]:
+            new = next(labels)
+            _contract(tree1, leaf0, leaf1, new)
+            _contract(forest2, leaf0, leaf1, new)
+            continue
+        break
+
+    if not ncuts:
+        return False
+    branches = [[leaf0], [leaf1]]
+    if _get_root(forest2, leaf0) == _get_root(forest2, leaf1):
+        pendants = _get_pendants(forest2, leaf0, leaf1)
+        if len(pendants) == 1:
+            branches = [pendants]
+        else:
+            branches.append(pendants)
+    for cuts in branches:
+        if len(cuts) <= ncuts:
+            btree1 = _copy_forest(tree1)
+            bforest2 = _copy_forest(forest2)
+            for node in cuts:
+                _cut(bforest2, node)
+            if _has_agreement_forest(btree1, bforest2, ncuts - len(cuts), labels, deadline):
+                return True
+    return False
+
+
+def _get_rspr_distance(
+    forest1: Forest,
+    forest2: Forest,
+    nleaves: int,
+    max_dist: Optional[int],
+    deadline: Optional[float],
+) -> Optional[int]:
+    """Return the rSPR distance of reduced trees by iterative deepening.
+
+    Returns None if the distance is > max_dist.
+    """
+    _reduce_chains(forest1, forest2)
+    counter = itertools.count(min(min(forest1[0]), min(forest2[0])) - 1, -1)
+    for forest in (forest1, forest2):
+        _add_root_leaf(forest, nleaves, counter)
+    for ncuts in itertools.count():
+        if max_dist is not None and ncuts > max_dist:
+            return None
+        labels = itertools.count(nleaves + 1)
+        if _has_agreement_forest(_copy_forest(forest1), _copy_forest(forest2), ncuts, labels, deadline):
+            return ncuts
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_treedist_spr(
+    tree1: ToyTree,
+    tree2: ToyTree,
+    max_dist: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> float:
+    """Return the rooted SPR (rSPR) distance between two rooted trees.
+
+    The rSPR distance is the min number of subtree-prune-and-regraft
+    moves required to transform one rooted binary tree into another.
+    It is computed exactly as the size of a maximum agreement forest
+    minus one, by a fixed-parameter algorithm whose runtime grows
+    exponentially with the distance (but only linearly with the number
+    of tips), after reducing shared subtrees and chains. This is fast
+    for trees with many tips (100s) if they are separated by few
+    moves (e.g., < 15-20).
+
+    Parameters
     ----------
-    - Li et al. (1996)
-    - Fack V, Lievens S, Van der Jeugt J (2002). “On the diameter of 
-    the rotation graph of binary coupling trees.” Discrete Mathematics,
-    245(1-3), 1–18.
-    - Robinson DF (1971). “Comparison of labeled trees with valency 
-    three.” Journal of Combinatorial Theory, Series B, 11(2), 105–119.
+    tree1: ToyTree
+        A rooted binary tree.
+    tree2: ToyTree
+        A rooted binary tree with the same tip names as tree1.
+    max_dist: int or None
+        Stop and return nan if the distance is greater than max_dist.
+    timeout: float or None
+        Stop and return nan if the computation takes > timeout seconds.
+
+    Examples
+    --------
+    >>> tree1 = toytree.rtree.unittree(20, seed=123)
+    >>> tree2 = toytree.rtree.unittree(20, seed=321)
+    >>> toytree.distance.get_treedist_spr(tree1, tree2)
     """
+    if set(tree1.get_tip_labels()) != set(tree2.get_tip_labels()):
+        raise ToytreeError("Treedist methods require that trees share identical tip names.")
+    if not (tree1.is_bifurcating() and tree2.is_bifurcating()):
+        raise ToytreeError("rSPR distance requires rooted binary trees.")
+
+    reduced = _get_reduced_trees(tree1, tree2)
+    if reduced is None:
+        return 0
+    deadline = None if timeout is None else time.time() + timeout
+    try:
+        dist = _get_rspr_distance(*reduced, max_dist, deadline)
+    except _TimeLimitExceeded:
+        logger.warning(f"rSPR distance not found in timeout={timeout}s, returning nan.")
+        return np.nan
+    if dist is None:
+        logger.debug(f"rSPR distance > max_dist={max_dist}")
+        return np.nan
+    return dist
 
 
-def tree_dist_spr(tree1, tree2, max_dist: int=10) -> float:
-    """Heuristic search algorithm to count N SPR moves separating two trees.
-    
-    Starting from tree1 all SPR moves that decrease the distance 
-    ... continue until dist=0 or max_dist is exceeded.
+######################################################################
+# NNI DISTANCE
+######################################################################
+
+
+def _canonical(mask: int, full: int) -> int:
+    """Return the side of a split that excludes the first leaf."""
+    return full ^ mask if mask & 1 else mask
+
+
+def _get_nni_neighbors(splits: frozenset, full: int) -> Iterator[frozenset]:
+    """Yield split sets of all trees one NNI move from a binary tree.
+
+    For each internal edge X|Y, the two maximal clusters within X (A,
+    B) and within Y (C, D) are found, and the split is replaced by
+    AC|BD or AD|BC.
+    """
+    clusters = set(splits) | {full ^ i for i in splits}
+    clusters |= {1 << i for i in range(full.bit_length())}
+    for split in splits:
+        sides = []
+        for side in (split, full ^ split):
+            within = [i for i in clusters if i & side == i and i != side]
+            larger = max(within, key=lambda x: bin(x).count("1"))
+            sides.append((larger, side ^ larger))
+        (sa, sb), (sc, sd) = sides
+        others = splits - {split}
+        yield others | {_canonical(sa | sc, full)}
+        yield others | {_canonical(sa | sd, full)}
+
+
+def _get_nni_distance_exact(
+    splits1: frozenset,
+    splits2: frozenset,
+    full: int,
+    deadline: Optional[float],
+) -> int:
+    """Return NNI distance by breadth-first search of NNI moves."""
+    if splits1 == splits2:
+        return 0
+    seen = {splits1}
+    frontier = [splits1]
+    for dist in itertools.count(1):
+        nfrontier = []
+        for splits in frontier:
+            _check_time(deadline)
+            for neighbor in _get_nni_neighbors(splits, full):
+                if neighbor == splits2:
+                    return dist
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    nfrontier.append(neighbor)
+        frontier = nfrontier
+
+
+def _get_clusters(splits: frozenset, full: int) -> List[int]:
+    """Return clusters of a tree rooted on the first leaf by size."""
+    clusters = set(splits) | {1 << i for i in range(1, full.bit_length())}
+    clusters.add(full ^ 1)
+    return sorted(clusters, key=lambda x: bin(x).count("1"))
+
+
+def _get_nni_moves_constructive(
+    splits1: frozenset,
+    splits2: frozenset,
+    full: int,
+    deadline: Optional[float],
+) -> int:
+    """Return the number of NNI moves to build tree2 from tree1.
+
+    Both trees are rooted on the first leaf, and the clusters of tree2
+    are built from smallest to largest. If the two child clusters
+    (C1, C2) of a cluster of tree2 are not siblings in the current
+    tree then C2 is moved to be the sibling of C1 by a sequence of NNI
+    moves along the path between them, which is one less than the
+    number of internal nodes on the path. This does not break any
+    clusters that were already built.
+    """
+    # build current tree as a forest from its clusters
+    clusters = _get_clusters(splits1, full)
+    counter = itertools.count(-1, -1)
+    par, kids = {}, {}
+    nodes = {}
+    for cluster in clusters:
+        nid = cluster.bit_length() - 1 if not cluster & (cluster - 1) else next(counter)
+        nodes[cluster] = nid
+        par[nid] = None
+        kids[nid] = []
+    for idx, cluster in enumerate(clusters):
+        for other in clusters[idx + 1:]:
+            if cluster & other == cluster:
+                par[nodes[cluster]] = nodes[other]
+                kids[nodes[other]].append(nodes[cluster])
+                break
+    forest = (par, kids)
+
+    # build each cluster of tree2 by moving subtrees
+    nmoves = 0
+    targets = _get_clusters(splits2, full)
+    for idx, cluster in enumerate(targets):
+        if not cluster & (cluster - 1):
+            continue
+        _check_time(deadline)
+        child0 = next(i for i in reversed(targets[:idx]) if i & cluster == i)
+        node0, node1 = nodes[child0], nodes[cluster ^ child0]
+        if par[node0] != par[node1]:
+            path0 = [par[node0]]
+            while path0[-1] is not None:
+                path0.append(par[path0[-1]])
+            path1 = [par[node1]]
+            while path1[-1] not in path0:
+                path1.append(par[path1[-1]])
+            nmoves += path0.index(path1[-1]) + len(path1) - 1
+            _cut(forest, node1)
+            new = next(counter)
+            parent = par[node0]
+            kids[parent][kids[parent].index(node0)] = new
+            par[new], kids[new] = parent, [node0, node1]
+            par[node0] = par[node1] = new
+        nodes[cluster] = par[node0]
+    return nmoves
+
+
+def _get_nni_distance_upper(
+    splits1: frozenset,
+    splits2: frozenset,
+    full: int,
+    deadline: Optional[float],
+) -> int:
+    """Return an upper bound on NNI distance by a constructive search.
+
+    This is the min number of NNI moves to build tree2 from tree1, or
+    tree1 from tree2, by moving subtrees along paths.
+    """
+    return min(
+        _get_nni_moves_constructive(splits1, splits2, full, deadline),
+        _get_nni_moves_constructive(splits2, splits1, full, deadline),
+    )
+
+
+def _iter_nni_regions(tree1: ToyTree, tree2: ToyTree) -> Iterator[Tuple[frozenset, frozenset, int]]:
+    """Yield split sets of each region of unmatched edges in two trees.
+
+    Regions are connected sets of internal edges of tree1 that are not
+    in tree2. The m subtrees around each region (across shared edges)
+    are the leaves of the region, and the unmatched splits of each
+    tree are returned as canonical bitmasks of these m leaves.
+    """
+    utree = tree1.unroot()
+    bits = {j: 1 << i for (i, j) in enumerate(utree.get_tip_labels())}
+    full = (1 << utree.ntips) - 1
+    masks1 = _get_clade_masks(utree, bits)
+    masks2 = _get_clade_masks(tree2, bits)
+    splits2 = {_canonical(i, full) for i in masks2}
+
+    # group Nodes connected by unmatched edges into regions
+    groups = {i._idx: {i._idx} for i in utree}
+    for node in utree[utree.ntips:-1]:
+        if _canonical(masks1[node._idx], full) not in splits2:
+            merged = groups[node._idx] | groups[node._up._idx]
+            for nidx in merged:
+                groups[nidx] = merged
+    regions = {id(i): i for i in groups.values() if len(i) > 1}
+    unmatched2 = splits2 - {_canonical(i, full) for i in masks1}
+
+    for region in regions.values():
+        # clusters across shared edges (or tips) around the region
+        leaves = []
+        for nidx in region:
+            node = utree[nidx]
+            leaves.extend(masks1[i._idx] for i in node._children if i._idx not in region)
+            if node._up is not None and node._up._idx not in region:
+                leaves.append(full ^ masks1[nidx])
+
+        # express unmatched splits of each tree in region leaf bits
+        def convert(mask: int) -> Optional[int]:
+            bmask = sum(1 << i for (i, j) in enumerate(leaves) if j & mask == j)
+            union = sum(j for (i, j) in enumerate(leaves) if bmask & (1 << i))
+            return bmask if union == mask else None
+
+        rfull = (1 << len(leaves)) - 1
+        rsplits1 = frozenset(
+            _canonical(convert(masks1[i]), rfull) for i in region
+            if utree[i]._up is not None and utree[i]._up._idx in region)
+        rsplits2 = frozenset(
+            _canonical(j, rfull) for j in (convert(i) for i in unmatched2) if j is not None)
+        yield rsplits1, rsplits2, rfull
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_treedist_nni(
+    tree1: ToyTree,
+    tree2: ToyTree,
+    max_exact: int = 8,
+    timeout: Optional[float] = None,
+    return_bounds: bool = False,
+) -> Union[float, Tuple[float, float]]:
+    """Return an approximate NNI distance between two unrooted trees.
+
+    The nearest neighbor interchange (NNI) distance is the min number
+    of NNI moves required to transform one unrooted binary tree into
+    another, which is NP-hard to compute. This returns an upper bound
+    following the approach of Li et al. (1996): edges shared by both
+    trees divide them into regions of unmatched edges, which are
+    reconciled separately. Regions with <= max_exact leaves (the
+    subtrees around them) are solved exactly by breadth-first search,
+    and larger regions by a constructive search. A lower bound is the
+    number of edges in one tree that are not in the other (RF / 2),
+    since each must be moved by at least one NNI.
+
+    Parameters
+    ----------
+    tree1: ToyTree
+        A binary tree (rooting is ignored).
+    tree2: ToyTree
+        A binary tree with the same tip names as tree1.
+    max_exact: int
+        Max number of leaves of a region to solve by exhaustive search.
+        The search space grows as (2m - 5)!!, thus values > 9 are slow.
+    timeout: float or None
+        Stop and return nan if the computation takes > timeout seconds.
+    return_bounds: bool
+        If True then (lower, upper) bounds are returned.
+
+    Examples
+    --------
+    >>> tree1 = toytree.rtree.unittree(20, seed=123)
+    >>> tree2 = toytree.rtree.unittree(20, seed=321)
+    >>> toytree.distance.get_treedist_nni(tree1, tree2, return_bounds=True)
+    """
+    if set(tree1.get_tip_labels()) != set(tree2.get_tip_labels()):
+        raise ToytreeError("Treedist methods require that trees share identical tip names.")
+    if not (tree1.is_bifurcating(include_root=False) and tree2.is_bifurcating(include_root=False)):
+        raise ToytreeError("NNI distance requires binary trees.")
+
+    deadline = None if timeout is None else time.time() + timeout
+    lower = upper = 0
+    try:
+        for splits1, splits2, full in _iter_nni_regions(tree1, tree2):
+            lower += len(splits1)
+            if len(splits1) == 1:
+                upper += 1
+            elif full.bit_length() <= max_exact:
+                upper += _get_nni_distance_exact(splits1, splits2, full, deadline)
+            else:
+                upper += _get_nni_distance_upper(splits1, splits2, full, deadline)
+    except _TimeLimitExceeded:
+        logger.warning(f"NNI distance not found in timeout={timeout}s, returning nan.")
+        lower = upper = np.nan
+    if return_bounds:
+        return lower, upper
+    return upper
+
+
+######################################################################
+# BATCH EVALUATION
+######################################################################
+
+
+def _get_pairwise_distances(
+    func: Callable,
+    trees: Sequence[ToyTree],
+    pairs: Sequence[Tuple[int, int]],
+    **kwargs,
+) -> List[float]:
+    """Return distances for pairs of trees."""
+    return [func(trees[i], trees[j], **kwargs) for (i, j) in pairs]
+
+
+def _get_pairwise_matrix(
+    func: Callable,
+    trees: Union[MultiTree, Sequence[ToyTree]],
+    njobs: int,
+    **kwargs,
+) -> np.ndarray:
+    """Return symmetric matrix of distances between all pairs of trees.
+
+    Pairs are distributed among `njobs` processes.
     """
+    trees = list(trees)
+    pairs = list(itertools.combinations(range(len(trees)), 2))
+    njobs = max(1, min(int(njobs), len(pairs)))
+    if njobs == 1:
+        dists = _get_pairwise_distances(func, trees, pairs, **kwargs)
+    else:
+        with ProcessPoolExecutor(njobs) as pool:
+            futures = [
+                pool.submit(_get_pairwise_distances, func, trees, pairs[i::njobs], **kwargs)
+                for i in range(njobs)
+            ]
+            results = [i.result() for i in futures]
+        dists = [results[i % njobs][i // njobs] for i in range(len(pairs))]
+
+    arr = np.zeros((len(trees), len(trees)))
+    if pairs:
+        idxs = np.array(pairs)
+        arr[idxs[:, 0], idxs[:, 1]] = arr[idxs[:, 1], idxs[:, 0]] = dists
+    return arr
+
+
+def get_treedist_spr_matrix(
+    trees: Union[MultiTree, Sequence[ToyTree]],
+    max_dist: Optional[int] = None,
+    timeout: Optional[float] = None,
+    njobs: int = 1,
+) -> np.ndarray:
+    """Return matrix of rSPR distances between all pairs of trees.
+
+    Parameters
+    ----------
+    trees: MultiTree or Sequence[ToyTree]
+        A collection of rooted binary trees with the same tip names.
+    max_dist: int or None
+        Max distance computed for each pair (larger are nan).
+    timeout: float or None
+        Time budget in seconds for each pair (if exceeded are nan).
+    njobs: int
+        Distribute pairs of trees over N processes.
+
+    See Also
+    --------
+    `get_treedist_spr`
+    """
+    return _get_pairwise_matrix(
+        get_treedist_spr, trees, njobs, max_dist=max_dist, timeout=timeout)
+
+
+def get_treedist_nni_matrix(
+    trees: Union[MultiTree, Sequence[ToyTree]],
+    max_exact: int = 8,
+    timeout: Optional[float] = None,
+    njobs: int = 1,
+) -> np.ndarray:
+    """Return matrix of approximate NNI distances between all pairs.
+
+    Parameters
+    ----------
+    trees: MultiTree or Sequence[ToyTree]
+        A collection of binary trees with the same tip names.
+    max_exact: int
+        Max number of leaves of a region to solve exactly.
+    timeout: float or None
+        Time budget in seconds for each pair (if exceeded are nan).
+    njobs: int
+        Distribute pairs of trees over N processes.
+
+    See Also
+    --------
+    `get_treedist_nni`
+    """
+    return _get_pairwise_matrix(
+        get_treedist_nni, trees, njobs, max_exact=max_exact, timeout=timeout)
 
 
 if __name__ == "__main__":
-    pass
+
+    import toytree
+    TREES = [toytree.rtree.unittree(50, seed=i) for i in range(4)]
+    print(get_treedist_spr(TREES[0], TREES[1], timeout=10))
+    print(get_treedist_nni(TREES[0], TREES[1], return_bounds=True))
+    print(get_treedist_nni_matrix(TREES))
@@ -47,27 +47,34 @@ References
   https://doi.org/10.1016/j.jmva.2006.11.013).
 """
 
-from typing import Set, Callable, Union, Iterator, Tuple, Optional
+from typing import Set, Callable, Union, Optional, Tuple, Dict, Sequence, TypeVar, Iterator
+from concurrent.futures import ProcessPoolExecutor
 
 from loguru import logger
+from scipy.optimize import linear_sum_assignment
+from scipy import sparse
 import numpy as np
 import pandas as pd
 from toytree.distance._src.treedist_utils import (
     _get_split_phylo_info,
+    _get_split_table,
+    _get_split_overlaps_from_tables,
+    _get_split_info_matrix,
+    _get_split_spi_matrix,
+    _get_split_mci_matrix,
+    _get_log2_n_rooted_trees_table,
     get_trees_nye_dist,
     get_trees_matching_split_dist,
     get_trees_matching_split_info_dist,
     get_trees_shared_phylo_info_dist,
     get_trees_mutual_clust_info_dist,
-    get_trees_shared_phylo_info_dist_from_biparts,
-    get_trees_mutual_clust_info_dist_from_biparts,
 )
 from toytree import ToyTree
 from toytree.core.apis import TreeDistanceAPI, add_subpackage_method
 from toytree.utils import ToytreeError
 
 logger = logger.bind(name="toytree")
-
+MultiTree = TypeVar("MultiTree")
 
 TIPS_IDENTICAL = "Treedist methods require that trees share identical tip names."
 
@@ -81,6 +88,10 @@ __all__ = [
     "get_treedist_rfg_spi",
     "get_treedist_rfg_mci",
     "get_treedist_rfg_jac",
+    "get_treedist_kf_branch_score",
+    "get_treedist_kf_branch_score_matrix",
+    "get_treedist_wrf",
+    "get_treedist_wrf_matrix",
 ]
 
 
@@ -118,6 +129,102 @@ def _get_rf_distance(
     return score
 
 
+def _get_rf_clusters(
+    tree: ToyTree,
+    qpos: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (min, max, size) of tip positions for each split.
+
+    Each non-trivial split of the unrooted tree is represented by its
+    side that excludes a reference tip (the tip at position ntips - 1)
+    as in Day (1985). For Nodes on the path from the reference tip to
+    the root this is the complement of the clade. Positions are taken
+    from `qpos`, an array of the position of each tip by idx label.
+    Min, max and size are computed in a single pass in idx order, and
+    a second pass from the root to the reference tip.
+    """
+    ntips = tree.ntips
+    nnodes = tree.nnodes
+    mins = qpos.tolist() + [0] * (nnodes - ntips)
+    maxs = qpos.tolist() + [0] * (nnodes - ntips)
+    sizes = [1] * ntips + [0] * (nnodes - ntips)
+    for node in tree[ntips:]:
+        cidxs = [i._idx for i in node._children]
+        mins[node._idx] = min(mins[i] for i in cidxs)
+        maxs[node._idx] = max(maxs[i] for i in cidxs)
+        sizes[node._idx] = sum(sizes[i] for i in cidxs)
+
+    # nodes on path to reference tip use complements of their clades
+    path = [tree[int(np.argmax(qpos))]]
+    path.extend(path[0].iter_ancestors())
+    path = path[::-1]
+    cmin, cmax, csize = ntips, -1, 0
+    for parent, child in zip(path[:-1], path[1:]):
+        for sib in parent._children:
+            if sib is not child:
+                cmin = min(cmin, mins[sib._idx])
+                cmax = max(cmax, maxs[sib._idx])
+                csize += sizes[sib._idx]
+        mins[child._idx], maxs[child._idx], sizes[child._idx] = cmin, cmax, csize
+
+    # skip root, and a root child if its split is the same as its sibling
+    keep = np.ones(nnodes, dtype=bool)
+    keep[-1] = False
+    if len(tree.treenode._children) == 2:
+        keep[path[1]._idx] = False
+    mins, maxs, sizes = (np.array(i)[keep] for i in (mins, maxs, sizes))
+
+    # exclude trivial splits
+    mask = (sizes > 1) & (sizes < ntips - 1)
+    return mins[mask], maxs[mask], sizes[mask]
+
+
+def _get_rf_distance_day(
+    tree1: ToyTree, tree2: ToyTree, normalize: bool = True,
+) -> float:
+    """Return RF distance between two trees using Day's algorithm.
+
+    Tips are numbered by their idx labels in tree1, such that every
+    split of tree1 (on the side excluding the last tip) is an interval
+    of tip positions [min, max], which are stored in a cluster table
+    with O(1) lookup. A split of tree2 is then shared if its positions
+    are contiguous (max - min + 1 == size) and the interval is in the
+    table. The total runtime is O(n).
+
+    References
+    ----------
+    - Day, W.H.E. (1985) "Optimal algorithms for comparing trees with
+      labeled leaves". Journal of Classification 2, 7–28.
+    """
+    ntips = tree1.ntips
+    names1 = tree1.get_tip_labels()
+    positions = dict(zip(names1, range(ntips)))
+    qpos2 = np.array([positions[i] for i in tree2.get_tip_labels()])
+    min1, max1, _ = _get_rf_clusters(tree1, np.arange(ntips))
+    min2, max2, size2 = _get_rf_clusters(tree2, qpos2)
+
+    # cluster table: intervals of tree1 are laminar, so the largest
+    # interval ending at each max is stored by max, and all others
+    # are stored by min, without collisions.
+    by_max = np.full(ntips, ntips)
+    np.minimum.at(by_max, max1, min1)
+    by_min = np.full(ntips, -1)
+    inner = by_max[max1] != min1
+    by_min[min1[inner]] = max1[inner]
+
+    # splits of tree2 that are intervals in the cluster table
+    contiguous = (max2 - min2 + 1) == size2
+    found = (by_max[max2] == min2) | (by_min[min2] == max2)
+    shared = int(np.count_nonzero(contiguous & found))
+
+    # symmetric difference, optionally normalized by total splits
+    total = min1.size + min2.size
+    score = total - 2 * shared
+    if normalize:
+        return score / total
+    return score
+
+
 def _get_rf_distance_information_corrected(
     set1: Set, set2: Set, normalize: bool = True,
 ) -> float:
@@ -185,6 +292,9 @@ def get_treedist_rf(
     by the total number of (internal) bipartitions in both sets.
     Larger values indicate that two trees are more different.
 
+    This is computed in linear time using the algorithm of Day (1985),
+    or by comparing sets of bipartitions if tip names are not unique.
+
     Parameters:
         tree1: ToyTree
             An input ToyTree to compare to tree2.
@@ -207,7 +317,14 @@ def get_treedist_rf(
         trees". Mathematical Biosciences. 53 (1–2): 131–147.
         doi:10.1016/0025-5564(81)90043-2.
     """
-    assert set(tree1.get_tip_labels()) == set(tree2.get_tip_labels()), TIPS_IDENTICAL
+    names = tree1.get_tip_labels()
+    assert set(names) == set(tree2.get_tip_labels()), TIPS_IDENTICAL
+
+    # linear time algorithm requires unique tip names
+    if len(set(names)) == len(names) == tree2.ntips:
+        return _get_rf_distance_day(tree1, tree2, normalize=normalize)
+
+    # fallback to compare sets of bipartitions
     set1 = set(tree1.iter_bipartitions(type=frozenset, sort=True))
     set2 = set(tree2.iter_bipartitions(type=frozenset, sort=True))
     return _get_rf_distance(set1, set2, normalize=normalize)
@@ -424,17 +541,75 @@ def get_treedist_rfg_jac(
     raise NotImplementedError("TODO")
 
 
-def get_treedist_kf_branch_score(
-    tree1: ToyTree,
-    tree2: ToyTree,
-) -> float:
-    """Return the Kune-Felsenstein metric...
+def _get_split_lengths(tree: ToyTree, bits: Dict[str, int]) -> Dict[int, float]:
+    """Return a dict mapping unrooted splits to their edge lengths.
+
+    Splits are int bitmasks of tips (`bits`) oriented such that the
+    first tip is never included, and include trivial splits (edges
+    to tips). The two edges from a bifurcating root are one split,
+    and its length is the sum of their lengths.
+    """
+    full = sum(bits.values())
+    masks = [0] * tree.nnodes
+    lengths = {}
+    try:
+        for node in tree[:tree.ntips]:
+            masks[node._idx] = bits[node.name]
+    except KeyError as exc:
+        raise ToytreeError(TIPS_IDENTICAL) from exc
+    for node in tree[:-1]:
+        mask = masks[node._idx]
+        masks[node._up._idx] |= mask
+        split = full ^ mask if mask & 1 else mask
+        lengths[split] = lengths.get(split, 0.) + node._dist
+    return lengths
+
+
+def _get_split_length_matrix(trees: Sequence[ToyTree]) -> sparse.csr_matrix:
+    """Return a sparse (ntrees, nsplits) matrix of split edge lengths.
+
+    Columns are the unique splits (including trivial splits) in any
+    tree, such that each row has the lengths of splits in one tree
+    and zeros for splits that are not in the tree.
+    """
+    names = sorted(trees[0].get_tip_labels())
+    bits = {j: 1 << i for (i, j) in enumerate(names)}
+    columns = {}
+    indptr, indices, data = [0], [], []
+    for tree in trees:
+        if tree.ntips != len(names):
+            raise ToytreeError(TIPS_IDENTICAL)
+        for split, length in _get_split_lengths(tree, bits).items():
+            indices.append(columns.setdefault(split, len(columns)))
+            data.append(length)
+        indptr.append(len(indices))
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(trees), len(columns)))
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_treedist_kf_branch_score(tree1: ToyTree, tree2: ToyTree) -> float:
+    """Return the Kuhner-Felsenstein branch score distance.
 
     The Branch Score Distance of Kuhner and Felsenstein (1994) compares
     two trees using information of their branch lengths. It finds all
     bipartitions in the tree, and their branch lengths, as well as all
     possible alternative bipartitions that are not in the tree, which
-    are assigned branch lenghts of zero.
+    are assigned branch lengths of zero. The distance is the square
+    root of the sum of squared differences in the lengths of each
+    bipartition in the two trees. Trees are compared as unrooted.
+
+    Parameters
+    ----------
+    tree1: ToyTree
+        An input ToyTree to compare to tree2.
+    tree2: ToyTree
+        An input ToyTree to compare to tree1.
+
+    Examples
+    --------
+    >>> t0 = toytree.rtree.bdtree(ntips=10, seed=123)
+    >>> t1 = toytree.rtree.bdtree(ntips=10, seed=321)
+    >>> t0.distance.get_treedist_kf_branch_score(t1)
 
     Reference
     ---------
@@ -442,12 +617,130 @@ def get_treedist_kf_branch_score(
       phylogeny algorithms under equal and unequal evolutionary rates.
       Molecular Biology and Evolution, 11, 459–468.
     """
-    utree = tree.unroot()
-    iter_biparts = tree.iter_bipartitions(include_singleton_partitions=True)
-    for node, bipart in zip(tree, iter_biparts):
-        if node._up.is_root():
-            "add dist to ..."
-        print((node, node.up), node._dist, bipart)
+    return get_treedist_kf_branch_score_matrix([tree1, tree2])[0, 1]
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_treedist_wrf(tree1: ToyTree, tree2: ToyTree) -> float:
+    """Return the weighted Robinson-Foulds (wRF) distance.
+
+    The weighted RF distance of Robinson and Foulds (1979) is the sum
+    of absolute differences in the lengths of each bipartition in
+    the two trees, where bipartitions not in a tree have a length of
+    zero. Trees are compared as unrooted.
+
+    Parameters
+    ----------
+    tree1: ToyTree
+        An input ToyTree to compare to tree2.
+    tree2: ToyTree
+        An input ToyTree to compare to tree1.
+
+    Reference
+    ---------
+    - Robinson, D. F. and Foulds, L. R. (1979) Comparison of weighted
+      labelled trees. Combinatorial Mathematics VI. Lecture Notes in
+      Mathematics, 748, 119-126.
+    """
+    return get_treedist_wrf_matrix([tree1, tree2])[0, 1]
+
+
+def _iter_split_length_differences(
+    arr: sparse.csr_matrix,
+    max_size: int,
+) -> Iterator[Tuple[int, int, sparse.csr_matrix]]:
+    """Yield (start, stop, diffs) for chunks of rows of split lengths.
+
+    diffs is a sparse ((stop - start) * (ntrees - start), nsplits)
+    matrix of the differences between each row in the chunk and each
+    row from start to the end (row-major over pairs), computed by
+    direct subtraction such that identical trees have differences of
+    exactly zero. Chunks are selected such that the number of stored
+    values is at most about max_size (or a single row).
+    """
+    ntrees = arr.shape[0]
+    nvals = 2 * ntrees * max(1, int(np.diff(arr.indptr).max(initial=1)))
+    nrows = max(1, max_size // nvals)
+    for start in range(0, ntrees, nrows):
+        stop = min(start + nrows, ntrees)
+        rows = np.repeat(np.arange(start, stop), ntrees - start)
+        others = np.tile(np.arange(start, ntrees), stop - start)
+        yield start, stop, arr[rows] - arr[others]
+
+
+def _get_row_sums(arr: sparse.csr_matrix, values: np.ndarray) -> np.ndarray:
+    """Return sums of values (e.g., transformed arr.data) in each row of arr."""
+    rows = np.repeat(np.arange(arr.shape[0]), np.diff(arr.indptr))
+    return np.bincount(rows, weights=values, minlength=arr.shape[0])
+
+
+def get_treedist_kf_branch_score_matrix(
+    trees: Union[MultiTree, Sequence[ToyTree]],
+    max_size: int = 2**22,
+) -> np.ndarray:
+    """Return matrix of KF branch score distances among all trees.
+
+    A sparse (ntrees x unique splits) matrix X of split lengths is
+    built once, and the differences between rows of X are computed
+    sparsely for chunks of rows at a time, such that the number of
+    values in intermediate arrays is at most about max_size. The
+    squared differences are summed directly (rather than expanded
+    as |x|^2 + |y|^2 - 2 x.y) so that identical trees have a distance
+    of exactly zero.
+
+    Parameters
+    ----------
+    trees: MultiTree or Sequence[ToyTree]
+        A collection of trees with the same tip names.
+    max_size: int
+        Max number of values compared at a time, which limits the
+        size of intermediate arrays.
+
+    See Also
+    --------
+    `get_treedist_kf_branch_score`
+    """
+    arr = _get_split_length_matrix(list(trees))
+    ntrees = arr.shape[0]
+    dists = np.zeros((ntrees, ntrees))
+    for start, stop, diffs in _iter_split_length_differences(arr, max_size):
+        sums = _get_row_sums(diffs, diffs.data ** 2)
+        dists[start:stop, start:] = sums.reshape(stop - start, ntrees - start)
+    dists = np.triu(dists) + np.triu(dists, 1).T
+    return np.sqrt(dists)
+
+
+def get_treedist_wrf_matrix(
+    trees: Union[MultiTree, Sequence[ToyTree]],
+    max_size: int = 2**22,
+) -> np.ndarray:
+    """Return matrix of weighted RF distances among all trees.
+
+    A sparse (ntrees x unique splits) matrix X of split lengths is
+    built once, and the absolute differences between rows of X are
+    computed sparsely and summed for chunks of rows at a time, such
+    that the number of values in intermediate arrays is at most about
+    max_size, and identical trees have a distance of exactly zero.
+
+    Parameters
+    ----------
+    trees: MultiTree or Sequence[ToyTree]
+        A collection of trees with the same tip names.
+    max_size: int
+        Max number of values compared at a time, which limits the
+        size of intermediate arrays.
+
+    See Also
+    --------
+    `get_treedist_wrf`
+    """
+    arr = _get_split_length_matrix(list(trees))
+    ntrees = arr.shape[0]
+    dists = np.zeros((ntrees, ntrees))
+    for start, stop, diffs in _iter_split_length_differences(arr, max_size):
+        sums = _get_row_sums(diffs, np.abs(diffs.data))
+        dists[start:stop, start:] = sums.reshape(stop - start, ntrees - start)
+    return np.triu(dists) + np.triu(dists, 1).T
 
 
 def get_treedist_matrix(
@@ -486,7 +779,8 @@ def _expected_variation(
     nsamples: int = 1e+4,
     normalize: bool = False,
     seed: Optional[int] = None,
-    **kwargs,
+    batch_size: Optional[int] = None,
+    njobs: int = 1,
 ):
     """Return expected treedist metric between N random trees.
 
@@ -497,53 +791,76 @@ def _expected_variation(
     Therefore, you can instead generate a null upper bound for the
     expected distance between random trees to use as a normalizer.
 
+    Random trees are sampled by permuting the tip labels of tree2.
+    This is vectorized by permuting the columns of a binary split
+    table of tree2 for a batch of replicates at once, and computing
+    the metric for all replicates in a batch with array operations
+    (only the split matching of 'rfg' metrics is solved separately
+    for each replicate). Replicates can be further distributed over
+    `njobs` processes, each with an independent random stream spawned
+    from `seed`.
+
     Parameters
     ----------
-    ...
+    tree1: ToyTree
+        A tree to compare to random relabelings of tree2.
+    tree2: ToyTree
+        A tree whose tip labels are randomly permuted.
+    metric: str
+        One of "rf", "rfi", "rfg_spi", or "rfg_mcl".
+    nsamples: int
+        Number of random replicates.
+    normalize: bool
+        Return normalized distances.
+    seed: int or None
+        Random seed.
+    batch_size: int or None
+        Number of replicates computed per array operation. Default is
+        None, which selects a size based on the number of splits.
+    njobs: int
+        Distribute replicates over N processes.
 
     Examples
     --------
     >>> # get expected RFI distance between two N-tip trees.
     >>> tree1 = toytree.rtree.unittree(ntips=10, seed=123)
     >>> tree2 = toytree.rtree.unittree(ntips=10, seed=321)
-    >>> expect = expected_variation(tree1, tree2, metric="rfg_spi")
+    >>> expect = _expected_variation(tree1, tree2, metric="rfg_spi")
     >>> print(expect)
 
     >>> # get Z-score to test if observation deviates from expectation
-    >>> dist = tree1.distance.get_distance_rfi(tree2)
-    >>> print(dist, (dist - expect.mean) / expect.std))
+    >>> dist = tree1.distance.get_treedist_rfi(tree2)
+    >>> print(dist, (dist - expect.estimate) / expect.stdev)
     """
     nsamples = int(nsamples)
+    njobs = max(1, min(int(njobs), nsamples))
     data = pd.Series(
         index=["estimate", "stdev", "stderr", "nsamples"],
         name=f"{metric}_distance",
         dtype=float,
     )
-
-    # select function that takes bipart sets as input
-    if metric == "rf":
-        metric = _get_rf_distance
-    elif metric == "rfi":
-        metric = _get_rf_distance_information_corrected
-    elif metric == "rfg_spi":
-        metric = get_trees_shared_phylo_info_dist_from_biparts
-    elif metric == "rfg_mcl":
-        metric = get_trees_mutual_clust_info_dist_from_biparts
-    else:
+    if metric not in ("rf", "rfi", "rfg_spi", "rfg_mcl"):
         raise ToytreeError("metric not recognized")
+    assert set(tree1.get_tip_labels()) == set(tree2.get_tip_labels()), TIPS_IDENTICAL
 
-    # get bipartition table as ndarray, and array names
-    biparts1 = set(tree1.iter_bipartitions())
-    btable = tree2._get_bipartitions_table(include_singleton_partitions=False).values
-    names = np.array(tree2.get_tip_labels())
-
-    # for each sample assign randomized names to tree2 topology
-    reps = np.zeros(shape=nsamples)
-    rng = np.random.default_rng(seed)
-    for idx in range(nsamples):
-        # get splits when names are randomized
-        biparts2 = set(_iter_random_biparts(btable, names, rng))
-        reps[idx] = metric(biparts1, biparts2, normalize=normalize, **kwargs)
+    # get bipartition tables with columns in sorted name order
+    names = {j: i for (i, j) in enumerate(sorted(tree1.get_tip_labels()))}
+    table1 = _get_split_table(tree1.iter_bipartitions(), names)
+    table2 = _get_split_table(tree2.iter_bipartitions(), names)
+
+    # independent random streams for each job
+    seeds = np.random.SeedSequence(seed).spawn(njobs)
+    sizes = np.diff(np.linspace(0, nsamples, njobs + 1).astype(int))
+    args = (table1, table2, metric, normalize, batch_size)
+    if njobs == 1:
+        reps = _sample_null_distances(*args, nsamples, seeds[0])
+    else:
+        with ProcessPoolExecutor(njobs) as pool:
+            futures = [
+                pool.submit(_sample_null_distances, *args, size, sseq)
+                for (size, sseq) in zip(sizes, seeds)
+            ]
+            reps = np.concatenate([i.result() for i in futures])
 
     data['estimate'] = reps.mean()
     data['stdev'] = reps.std()
@@ -552,23 +869,87 @@ def _expected_variation(
     return data
 
 
-def _iter_random_biparts(
-    btable,
-    names,
-    rng: Optional[np.random.Generator] = None,
-) -> Iterator[Tuple[Tuple[str], Tuple[str]]]:
-    """Return bipartitions for a topology w/ names randomized.
-
-    This is used to calculate the expected variation in treedists for
-    metrics that do not have an expected saturating distance, and so
-    it is useful to ask how different two random trees are expected
-    to be for a given ntips size.
+def _sample_null_distances(
+    table1: np.ndarray,
+    table2: np.ndarray,
+    metric: str,
+    normalize: bool,
+    batch_size: Optional[int],
+    nsamples: int,
+    seed: Union[int, np.random.SeedSequence, None] = None,
+) -> np.ndarray:
+    """Return array of distances between table1 and table2 w/ permuted
+    tip labels, computed in batches of replicates.
+    """
+    rng = np.random.default_rng(seed)
+    nb1, ntips = table1.shape
+    nb2 = table2.shape[0]
+    if batch_size is None:
+        if metric in ("rf", "rfi"):
+            batch_size = max(1, 2 ** 22 // max(1, nb2 * ntips))
+        else:
+            batch_size = max(1, 2 ** 20 // max(1, nb1 * nb2))
+
+    # per-split info is invariant to label permutations
+    if metric in ("rf", "rfi"):
+        keys1 = _get_split_keys(table1)
+        ptable = table2.astype(bool)
+    else:
+        ptable = table2
+    if metric in ("rfi", "rfg_spi"):
+        log2_table = _get_log2_n_rooted_trees_table(ntips)
+        size1 = table1.sum(axis=1).astype(int)
+        size2 = table2.sum(axis=1).astype(int)
+        info1 = _get_split_info_matrix(size1, ntips - size1, log2_table)
+        info2 = _get_split_info_matrix(size2, ntips - size2, log2_table)
+    if metric == "rfg_mcl":
+        info1 = _get_split_mci_matrix(_get_split_overlaps_from_tables(table1, table1)).diagonal()
+        info2 = _get_split_mci_matrix(_get_split_overlaps_from_tables(table2, table2)).diagonal()
+
+    reps = np.zeros(nsamples)
+    for start in range(0, nsamples, batch_size):
+        nreps = min(batch_size, nsamples - start)
+
+        # (nreps, nb2, ntips) tables of tree2 with permuted labels
+        perms = rng.permuted(np.tile(np.arange(ntips), (nreps, 1)), axis=1)
+        tables = ptable[:, perms].transpose(1, 0, 2)
+
+        # rf: count shared splits by exact matching of split keys
+        if metric == "rf":
+            shared = np.isin(_get_split_keys(tables), keys1)
+            dists = nb1 + nb2 - 2 * shared.sum(axis=1)
+            total = nb1 + nb2
+
+        # rfi: sum info of shared splits
+        elif metric == "rfi":
+            shared = np.isin(_get_split_keys(tables), keys1)
+            total = info1.sum() + info2.sum()
+            dists = total - 2 * (shared * info2).sum(axis=1)
+
+        # rfg: solve split matching for each replicate
+        else:
+            ovs = _get_split_overlaps_from_tables(table1, tables)
+            if metric == "rfg_spi":
+                arrs = _get_split_spi_matrix(ovs)
+            else:
+                arrs = _get_split_mci_matrix(ovs)
+            total = info1.sum() + info2.sum()
+            scores = np.array([i[linear_sum_assignment(i, maximize=True)].sum() for i in arrs])
+            dists = total - 2 * scores
+
+        reps[start:start + nreps] = (dists / total) if normalize else dists
+    return reps
+
+
+def _get_split_keys(tables: np.ndarray) -> np.ndarray:
+    """Return hashable byte-string keys of splits in a (..., nb, ntips)
+    table, oriented such that the first tip is never in the first
+    subset, for exact matching of unrooted splits.
     """
-    np.random.shuffle(names)
-    for idx in range(btable.shape[0]):
-        mask0 = btable[idx].astype(bool)
-        mask1 = np.invert(mask0)
-        yield (tuple(names[mask0]), tuple(names[mask1]))
+    tables = tables.astype(bool, copy=False)
+    tables = tables ^ tables[..., :1]
+    packed = np.ascontiguousarray(np.packbits(tables, axis=-1))
+    return packed.view(f"S{packed.shape[-1]}")[..., 0]
 
 
 ##############################################################
@@ -673,7 +1054,7 @@ if __name__ == "__main__":
     t4 = toytree.tree("(1, (2, (3, 4, 5, (6, (7, 8)))));")
 
     tree = toytree.tree("(((A:0.1,D:0.25):0.05,C:0.01):0.2,(B:0.3,E:0.8):0.2);")
-    # get_treedist_kf_branch_score(tree)
+    # print(get_treedist_kf_branch_score(tree, tree.mod.edges_scale_to_root_height(1.)))
 
     # print("\n t1-2")
     # print(_validate(t1, t2))
@@ -7,7 +7,7 @@ References
 - https://ms609.github.io/TreeDist/reference/TreeDistance.html
 """
 
-from typing import Tuple, Sequence, Set
+from typing import Tuple, Sequence, Set, Dict
 
 # FIXME: support backup method old Python does not support
 # from functools import cache
@@ -33,12 +33,25 @@ logger = logger.bind(name="toytree")
 
 def _get_n_unrooted_trees(size: int) -> int:
     """Return the number of possible unrooted trees for ntips=size."""
-    return int(factorial2(2 * size - 5))
+    return int(factorial2(max(1, 2 * size - 5)))
 
 
 def _get_n_rooted_trees(size: int) -> int:
     """Return the number of possible rooted trees for ntips=size."""
-    return int(factorial2(2 * size - 3))
+    return int(factorial2(max(1, 2 * size - 3)))
+
+
+def _get_log2_n_rooted_trees_table(size: int) -> np.ndarray:
+    """Return array of log2 number of rooted trees for ntips=0-size.
+
+    The number of rooted trees of k tips is the double factorial
+    (2k - 3)!! = 1 x 3 x 5 ... x (2k - 3), which overflows floats for
+    k > ~150, and so it is computed in log space. The number of
+    unrooted trees of k tips is table[k - 1].
+    """
+    table = np.zeros(max(2, size + 1))
+    table[2:] = np.cumsum(np.log2(2 * np.arange(2, table.size) - 3))
+    return table
 
 
 def _get_n_trees_matching_split(size_a: int, size_b: int) -> int:
@@ -352,6 +365,151 @@ def _get_two_splits_entropy_info_dist(
 # i.e., shared phylo info (spi) or mutual clustering info (msi)
 ####################################################################
 
+def _get_split_table(
+    biparts: Sequence[Tuple[Tuple, Tuple]],
+    names: Dict[str, int],
+) -> np.ndarray:
+    """Return a binary (nsplits, ntips) table of first subset membership.
+
+    Columns are ordered by the int values in the names dict.
+    """
+    biparts = list(biparts)
+    table = np.zeros((len(biparts), len(names)))
+    for bidx, bip in enumerate(biparts):
+        table[bidx, [names[i] for i in bip[0]]] = 1
+    return table
+
+
+def _get_split_overlaps(
+    biparts1: Sequence[Tuple[Tuple, Tuple]],
+    biparts2: Sequence[Tuple[Tuple, Tuple]],
+) -> Dict[str, np.ndarray]:
+    """Return the sizes of all intersections of subsets of two split sets.
+
+    See `_get_split_overlaps_from_tables`.
+    """
+    biparts1 = list(biparts1)
+    biparts2 = list(biparts2)
+    names = {}
+    for bip in biparts1[:1] + biparts2[:1]:
+        for name in itertools.chain(*bip):
+            names.setdefault(name, len(names))
+    return _get_split_overlaps_from_tables(
+        _get_split_table(biparts1, names),
+        _get_split_table(biparts2, names),
+    )
+
+
+def _get_split_overlaps_from_tables(
+    table1: np.ndarray,
+    table2: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Return the sizes of all intersections of subsets of two split sets.
+
+    Splits are encoded as binary membership tables of their first
+    subset, and the sizes of the intersections of all subsets of every
+    pair of splits (A1&A2, A1&B2, B1&A2, B1&B2) are computed from a
+    single matrix product of these tables (i.e., popcounts of the
+    AND of split bitsets). Arrays are shaped (nb1, nb2), or (nb1, 1)
+    and (1, nb2) for the subset sizes of each split set. A stack of
+    tables (..., nb2, ntips) can be used as table2 to compare many
+    split sets in one operation.
+    """
+    ntips = table1.shape[1]
+    a1 = table1.sum(axis=-1, dtype=int)[:, None]
+    a2 = table2.sum(axis=-1, dtype=int)[..., None, :]
+    aa = np.rint(table1 @ np.swapaxes(table2, -1, -2)).astype(int)
+    return dict(
+        ntips=ntips, a1=a1, b1=ntips - a1, a2=a2, b2=ntips - a2,
+        aa=aa, ab=a1 - aa, ba=a2 - aa, bb=ntips - a1 - a2 + aa,
+    )
+
+
+def _get_split_info_matrix(
+    size_a: np.ndarray, size_b: np.ndarray, table: np.ndarray,
+) -> np.ndarray:
+    """Return phylo info (bits) of splits of sizes A|B. Vectorized
+    version of `_get_phylo_info` using a log2 table of tree counts.
+    """
+    info = table[np.maximum(size_a + size_b - 1, 0)] - table[size_a] - table[size_b]
+    return np.where((size_a < 2) | (size_b < 2), 0., info)
+
+
+def _get_split_spi_matrix(ov: Dict[str, np.ndarray]) -> np.ndarray:
+    """Return matrix of shared phylo info. Vectorized version of
+    `_get_two_splits_shared_phylo_info`.
+    """
+    ntips = ov["ntips"]
+    table = _get_log2_n_rooted_trees_table(ntips)
+    hs1 = _get_split_info_matrix(ov["a1"], ov["b1"], table)
+    hs2 = _get_split_info_matrix(ov["a2"], ov["b2"], table)
+
+    # find (subset, superset) sizes for compatible splits, in the same
+    # order that they are searched by `_get_subset_superset`.
+    conds = [
+        ov["aa"] == ov["a1"], ov["ab"] == ov["a1"],
+        ov["ba"] == ov["b1"], ov["bb"] == ov["b1"],
+    ]
+    shape = ov["aa"].shape
+    small = np.select(conds, [np.broadcast_to(i, shape) for i in (
+        ov["a1"], ov["a1"], ov["b1"], ov["b1"])], default=1)
+    large = np.select(conds, [np.broadcast_to(i, shape) for i in (
+        ov["a2"], ov["b2"], ov["a2"], ov["b2"])], default=1)
+
+    # info of the two splits together
+    hs12 = table[ntips - 1] - (
+        table[large - small + 1] + table[small] + table[ntips - large])
+    return np.where(np.any(conds, axis=0), hs1 + hs2 - hs12, 0.)
+
+
+def _xlog2x(values: np.ndarray) -> np.ndarray:
+    """Return p * log2(p) with 0 for p=0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(values > 0, values * np.log2(values), 0.)
+
+
+def _get_split_mci_matrix(ov: Dict[str, np.ndarray]) -> np.ndarray:
+    """Return matrix of mutual clustering info. Vectorized version of
+    `_get_two_splits_entropy_info`.
+    """
+    ntips = ov["ntips"]
+    h_1 = -(_xlog2x(ov["a1"] / ntips) + _xlog2x(ov["b1"] / ntips))
+    h_2 = -(_xlog2x(ov["a2"] / ntips) + _xlog2x(ov["b2"] / ntips))
+    h_joint = -sum(_xlog2x(ov[i] / ntips) for i in ("aa", "ab", "ba", "bb"))
+    return h_1 + h_2 - h_joint
+
+
+def _get_split_ms_matrix(ov: Dict[str, np.ndarray]) -> np.ndarray:
+    """Return matrix of matching split distances. Vectorized version
+    of `_get_two_splits_matching_split_dist`.
+    """
+    return (ov["ntips"] - np.maximum(ov["aa"] + ov["bb"], ov["ab"] + ov["ba"])).astype(float)
+
+
+def _get_split_msi_matrix(ov: Dict[str, np.ndarray]) -> np.ndarray:
+    """Return matrix of matching split info. Vectorized version of
+    `_get_two_splits_matching_split_phylo_info`.
+    """
+    table = _get_log2_n_rooted_trees_table(ov["ntips"])
+    return np.maximum(
+        _get_split_info_matrix(ov["aa"], ov["bb"], table),
+        _get_split_info_matrix(ov["ab"], ov["ba"], table),
+    )
+
+
+def _get_split_nye_matrix(ov: Dict[str, np.ndarray]) -> np.ndarray:
+    """Return matrix of Nye similarity. Vectorized version of
+    `_get_two_splits_nye_similarity`.
+    """
+    def score(inter, size1, size2):
+        return inter / (size1 + size2 - inter)
+    ali1 = np.minimum(
+        score(ov["aa"], ov["a1"], ov["a2"]), score(ov["bb"], ov["b1"], ov["b2"]))
+    ali2 = np.minimum(
+        score(ov["ab"], ov["a1"], ov["b2"]), score(ov["ba"], ov["b1"], ov["a2"]))
+    return np.maximum(ali1, ali2)
+
+
 def _get_split_matching(
     biparts1: Sequence[Tuple[Tuple, Tuple]],
     biparts2: Sequence[Tuple[Tuple, Tuple]],
@@ -364,7 +522,10 @@ def _get_split_matching(
     **linear sum assignment problem**. Similarity scores are measured
     by the *shared phylogenetic info* algorithm of Martin Smith, and
     the linear assignment is performed by scipy using the Hungarian
-    algorithm.
+    algorithm. The similarity matrix is computed in whole-matrix
+    array operations from the sizes of subset intersections (see
+    `_get_split_overlaps`) rather than by comparing each pair of
+    splits.
 
     Parameters
     ----------
@@ -380,34 +541,27 @@ def _get_split_matching(
     """
     # split similarity function
     if split_similarity_metric == "mci":
-        _get_split_similarity = _get_two_splits_entropy_info
+        _get_split_similarity = _get_split_mci_matrix
         maximize = True
     elif split_similarity_metric == "spi":
-        _get_split_similarity = _get_two_splits_shared_phylo_info
+        _get_split_similarity = _get_split_spi_matrix
         maximize = True
     elif split_similarity_metric == "ms":
-        _get_split_similarity = _get_two_splits_matching_split_dist
+        _get_split_similarity = _get_split_ms_matrix
         maximize = False
     elif split_similarity_metric == "msi":
-        _get_split_similarity = _get_two_splits_matching_split_phylo_info
+        _get_split_similarity = _get_split_msi_matrix
         maximize = True
     elif split_similarity_metric == "nye":
-        _get_split_similarity = _get_two_splits_nye_similarity
+        _get_split_similarity = _get_split_nye_matrix
         maximize = True
     else:
         raise ToytreeError(
             "split similarity metric must be in "
             "('mci', 'spi', 'ms', 'msi', 'nye')")
 
-    # get partitions in their input order.
-    nb1 = len(biparts1)
-    nb2 = len(biparts2)
-
-    # get matric of split similarity measures
-    arr = np.zeros(shape=(nb1, nb2))
-    for idx, bip1 in enumerate(biparts1):
-        for jdx, bip2 in enumerate(biparts2):
-            arr[idx, jdx] = _get_split_similarity(bip1, bip2)
+    # get matrix of split similarity measures for all pairs at once
+    arr = _get_split_similarity(_get_split_overlaps(biparts1, biparts2))
 
     # get linear solution pairing splits
     indices = linear_sum_assignment(arr, maximize=maximize)
@@ -652,8 +806,8 @@ def get_trees_mutual_clust_info_dist_from_biparts(
     info2 = sum(_get_split_entropy(b) for b in biparts2)
     ind_info = info1 + info2
     if normalize:
-        return mci / (ind_info / 2)
-    return mci
+        return (ind_info - (2 * mci)) / ind_info
+    return ind_info - (2 * mci)
 
 
 if __name__ == "__main__":
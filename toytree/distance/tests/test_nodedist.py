@@ -4,7 +4,10 @@
 
 """
 
+import tempfile
 import unittest
+import itertools
+from pathlib import Path
 import numpy as np
 import toytree
 
@@ -43,6 +46,63 @@ class TestRoot(unittest.TestCase):
                     print(idx1, idx2, dist, arr[idx1, idx2])
                     self.assertAlmostEqual(dist, arr[idx1, idx2])
 
+    def test_get_tip_distance_matrix(self):
+        for tree in self.trees:
+            for topology_only in (False, True):
+                full = tree.distance.get_node_distance_matrix(topology_only=topology_only)
+                tips = tree.distance.get_tip_distance_matrix(topology_only=topology_only)
+                self.assertTrue(np.allclose(full[:tree.ntips, :tree.ntips], tips))
+
+                # float32 and condensed (scipy pdist) layout
+                cond = tree.distance.get_tip_distance_matrix(
+                    topology_only=topology_only, dtype=np.float32, condensed=True)
+                self.assertEqual(cond.dtype, np.float32)
+                self.assertTrue(np.allclose(cond, tips[np.triu_indices(tree.ntips, 1)]))
+
+    def test_tip_distance_blocks(self):
+        for tree in self.trees:
+            tips = tree.distance.get_tip_distance_matrix()
+            blocks = list(tree.distance.iter_tip_distance_blocks(block_size=3))
+            self.assertEqual([i[0] for i in blocks], list(range(0, tree.ntips, 3)))
+            self.assertTrue(np.allclose(np.vstack([i[1] for i in blocks]), tips))
+
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "dists.npy"
+                arr = tree.distance.write_tip_distance_matrix(path, block_size=4)
+                self.assertTrue(np.allclose(arr, tips))
+                self.assertTrue(np.allclose(np.load(path, mmap_mode="r"), tips))
+                del arr
+
+    def test_eccentricities(self):
+        for tree in self.trees:
+            for topology_only in (False, True):
+                full = tree.distance.get_node_distance_matrix(topology_only=topology_only)
+                ecc = tree.distance.get_node_eccentricities(topology_only=topology_only, df=True)
+                self.assertTrue(np.allclose(ecc.eccentricity, full.max(axis=1)))
+                self.assertTrue(np.allclose(full[np.arange(tree.nnodes), ecc.farthest], ecc.eccentricity))
+                dist, node0, node1 = tree.distance.get_tree_diameter(topology_only, return_nodes=True)
+                self.assertAlmostEqual(dist, full.max())
+                self.assertAlmostEqual(full[node0.idx, node1.idx], dist)
+
+    def test_batch_node_paths(self):
+        for tree in self.trees:
+            idxs0, idxs1 = np.meshgrid(np.arange(tree.nnodes), np.arange(tree.nnodes), indexing="ij")
+            lcas = tree.distance.get_node_lcas(idxs0, idxs1)
+            dists = tree.distance.get_node_path_lengths(idxs0, idxs1)
+            self.assertTrue(np.allclose(dists, tree.distance.get_node_distance_matrix()))
+            member = tree.distance.get_node_path_membership(idxs0, idxs1, tree.ntips)
+            for idx0, idx1 in itertools.combinations(range(tree.nnodes), 2):
+                path = [i.idx for i in tree.distance.get_node_path(idx0, idx1)]
+                self.assertEqual(lcas[idx0, idx1], tree.get_mrca_node(idx0, idx1).idx)
+                self.assertEqual(member[idx0, idx1], tree.ntips in path)
+
+    def test_edge_path_counts(self):
+        for tree in self.trees:
+            pairs = np.array(list(itertools.combinations(range(tree.ntips), 2)))
+            counts = tree.distance.get_edge_path_counts()
+            self.assertTrue(np.array_equal(counts, tree.distance.get_edge_path_counts(pairs[:, 0], pairs[:, 1])))
+            nedges = tree.distance.get_node_path_lengths(pairs[:, 0], pairs[:, 1], topology_only=True)
+            self.assertEqual(counts.sum(), nedges.sum())
 
 
 if __name__ == "__main__":
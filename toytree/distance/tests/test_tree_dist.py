@@ -8,3 +8,358 @@ used to generate new results in R:::TreeDist for comparison.
 """
 
 # TODO...
+
+import unittest
+import itertools
+import numpy as np
+import toytree
+from toytree.distance._src import treedist, treedist_utils, quartet_dist
+
+
+def _to_nested(node):
+    """Return a rooted tree as nested frozensets of tip names."""
+    if node.is_leaf():
+        return node.name
+    return frozenset(_to_nested(i) for i in node.children)
+
+
+def _iter_spr_neighbors(tree):
+    """Yield nested trees one rSPR move from a nested tree."""
+    def iter_subtrees(node):
+        yield node
+        if isinstance(node, frozenset):
+            for child in node:
+                yield from iter_subtrees(child)
+
+    def remove(node, sub):
+        if sub in node:
+            return next(i for i in node if i != sub)
+        return frozenset(remove(i, sub) if isinstance(i, frozenset) else i for i in node)
+
+    def iter_grafts(node, sub):
+        yield frozenset((node, sub))
+        if isinstance(node, frozenset):
+            child0, child1 = node
+            for new in iter_grafts(child0, sub):
+                yield frozenset((new, child1))
+            for new in iter_grafts(child1, sub):
+                yield frozenset((child0, new))
+
+    for sub in iter_subtrees(tree):
+        if sub != tree:
+            yield from iter_grafts(remove(tree, sub), sub)
+
+
+def _get_spr_distance_bfs(tree1, tree2):
+    """Return rSPR distance by bidirectional breadth-first search."""
+    seen = [{_to_nested(tree1.treenode): 0}, {_to_nested(tree2.treenode): 0}]
+    frontiers = [list(seen[0]), list(seen[1])]
+    while not seen[0].keys() & seen[1].keys():
+        side = int(len(frontiers[0]) > len(frontiers[1]))
+        nfrontier = []
+        for tree in frontiers[side]:
+            for new in _iter_spr_neighbors(tree):
+                if new not in seen[side]:
+                    seen[side][new] = seen[side][tree] + 1
+                    nfrontier.append(new)
+        frontiers[side] = nfrontier
+    return min(seen[0][i] + seen[1][i] for i in seen[0].keys() & seen[1].keys())
+
+
+class TestSplitMatching(unittest.TestCase):
+    def setUp(self):
+        # trees from ?TreeDist::SharedPhylogeneticInfo
+        self.t1 = toytree.tree('((((a, b), c), d), (e, (f, (g, h))));')
+        self.t2 = toytree.tree('(((a, b), (c, d)), ((e, f), (g, h)));')
+
+    def test_against_treedist_r(self):
+        self.assertAlmostEqual(treedist_utils.get_trees_shared_phylo_info(self.t1, self.t2), 13.75, 2)
+        self.assertAlmostEqual(treedist_utils.get_trees_shared_phylo_info_dist(self.t1, self.t2), 14.40, 2)
+        self.assertAlmostEqual(treedist_utils.get_trees_mutual_clust_info(self.t1, self.t2), 3.03, 2)
+        self.assertAlmostEqual(treedist_utils.get_trees_matching_split_dist(self.t1, self.t2), 6)
+        self.assertAlmostEqual(treedist_utils.get_trees_matching_split_info(self.t1, self.t2), 17.09, 2)
+        self.assertAlmostEqual(treedist_utils.get_trees_nye_similarity(self.t1, self.t2), 3.8)
+
+    def test_vectorized_matches_pairwise(self):
+        funcs = {
+            "spi": treedist_utils._get_two_splits_shared_phylo_info,
+            "mci": treedist_utils._get_two_splits_entropy_info,
+            "ms": treedist_utils._get_two_splits_matching_split_dist,
+            "msi": treedist_utils._get_two_splits_matching_split_phylo_info,
+            "nye": treedist_utils._get_two_splits_nye_similarity,
+        }
+        tree1 = toytree.rtree.unittree(12, seed=123)
+        tree2 = toytree.rtree.unittree(12, seed=321).mod.collapse_nodes(14, 15)
+        biparts1 = list(tree1.iter_bipartitions())
+        biparts2 = list(tree2.iter_bipartitions())
+        for metric, func in funcs.items():
+            arr, _ = treedist_utils._get_split_matching(biparts1, biparts2, metric)
+            expect = [[func(i, j) for j in biparts2] for i in biparts1]
+            self.assertTrue(np.allclose(arr, expect))
+
+
+class TestRobinsonFoulds(unittest.TestCase):
+    def test_day_matches_bipartition_sets(self):
+        for seed in range(20):
+            tree1 = toytree.rtree.unittree(12, seed=seed)
+            tree2 = toytree.rtree.unittree(12, seed=seed + 100)
+            trees = [
+                tree2, tree2.unroot(), tree2.mod.ladderize(),
+                tree1.mod.root("r3"), tree1.mod.collapse_nodes(13, 14),
+            ]
+            for tree in trees:
+                set1 = set(tree1.iter_bipartitions(type=frozenset, sort=True))
+                set2 = set(tree.iter_bipartitions(type=frozenset, sort=True))
+                for normalize in (False, True):
+                    expect = treedist._get_rf_distance(set1, set2, normalize)
+                    result = toytree.distance.get_treedist_rf(tree1, tree, normalize)
+                    self.assertAlmostEqual(expect, result)
+
+
+class TestExpectedVariation(unittest.TestCase):
+    def setUp(self):
+        self.tree1 = toytree.rtree.unittree(10, seed=123)
+        self.tree2 = toytree.rtree.unittree(10, seed=321)
+
+    def test_batched_matches_single_replicates(self):
+        names = {j: i for (i, j) in enumerate(sorted(self.tree1.get_tip_labels()))}
+        labels = np.array(sorted(names))
+        table1 = treedist_utils._get_split_table(self.tree1.iter_bipartitions(), names)
+        table2 = treedist_utils._get_split_table(self.tree2.iter_bipartitions(), names)
+
+        for metric in ("rf", "rfg_spi"):
+            reps = treedist._sample_null_distances(table1, table2, metric, False, 4, 10, 123)
+
+            # re-draw the same permutations and compute one at a time
+            rng = np.random.default_rng(123)
+            expect = []
+            for start in range(0, 10, 4):
+                nreps = min(4, 10 - start)
+                perms = rng.permuted(np.tile(np.arange(10), (nreps, 1)), axis=1)
+                for perm in perms:
+                    biparts1 = [(tuple(labels[i == 1]), tuple(labels[i == 0])) for i in table1]
+                    biparts2 = [(tuple(labels[i == 1]), tuple(labels[i == 0])) for i in table2[:, perm]]
+                    if metric == "rf":
+                        set1 = {frozenset(map(frozenset, i)) for i in biparts1}
+                        set2 = {frozenset(map(frozenset, i)) for i in biparts2}
+                        expect.append(treedist._get_rf_distance(set1, set2, False))
+                    else:
+                        expect.append(treedist_utils.get_trees_shared_phylo_info_dist_from_biparts(
+                            biparts1, biparts2))
+            self.assertTrue(np.allclose(reps, expect))
+
+    def test_expected_variation_njobs(self):
+        data = treedist._expected_variation(
+            self.tree1, self.tree2, "rf", nsamples=100, normalize=True, seed=123, njobs=2)
+        self.assertEqual(data.nsamples, 100)
+        self.assertTrue(0.5 < data.estimate <= 1.0)
+
+
+class TestQuartetCounting(unittest.TestCase):
+    def test_counting_matches_enumeration(self):
+        for seed in range(8):
+            tree1 = toytree.rtree.rtree(9, seed=seed)
+            tree2 = toytree.rtree.rtree(9, seed=seed + 100)
+            trees = [
+                (tree1, tree2),
+                (tree1, tree1.unroot()),
+                (tree1.mod.collapse_nodes(9, 10, 11), tree2),
+                (tree1.mod.collapse_nodes(9, 10, 11, 12, 13), tree2.mod.collapse_nodes(10, 11)),
+            ]
+            for (itree1, itree2) in trees:
+                expect = quartet_dist.get_quartet_comparison(itree1, itree2, method="enumerate")
+                result = quartet_dist.get_quartet_comparison(itree1, itree2, method="count")
+                self.assertEqual({i: int(j) for (i, j) in expect.items()}, result)
+
+
+class TestQuartetSampling(unittest.TestCase):
+    def setUp(self):
+        self.tree1 = toytree.rtree.rtree(30, seed=123)
+        self.tree2 = toytree.rtree.rtree(30, seed=321).mod.collapse_nodes(*range(35, 42))
+
+    def test_four_point_matches_resolutions_table(self):
+        names = sorted(self.tree2.get_tip_labels())
+        rdict = {
+            frozenset(i): i for i in
+            self.tree2.enum.iter_quartets(collapse=True, type=tuple, sort=True)
+        }
+        expect = []
+        for qrt in itertools.combinations(names, 4):
+            resolved = rdict.get(frozenset(qrt))
+            expect.append(qrt.index(resolved[1]) if resolved else 0)
+        result = quartet_dist.get_quartet_resolutions_table(self.tree2)
+        self.assertTrue(np.array_equal(result, expect))
+
+    def test_iter_quartet_resolutions(self):
+        full = quartet_dist.get_quartet_resolutions_table(self.tree2)
+        chunks = list(quartet_dist.iter_quartet_resolutions(self.tree2, chunk_size=1000))
+        qrts = np.concatenate([i[0] for i in chunks])
+        self.assertTrue(np.array_equal(qrts, list(itertools.combinations(range(30), 4))))
+        self.assertTrue(np.array_equal(np.concatenate([i[1] for i in chunks]), full))
+
+        # sampled quartets match the full table after re-ordering tips
+        ranks = {j: i for (i, j) in enumerate(itertools.combinations(range(30), 4))}
+        for qrts, res in quartet_dist.iter_quartet_resolutions(self.tree2, nsamples=500, seed=1):
+            for row, code in zip(qrts.tolist(), res):
+                srow = sorted(row)
+                scode = full[ranks[tuple(srow)]]
+                if not scode:
+                    self.assertEqual(code, 0)
+                    continue
+                pair = {srow[0], srow[scode]}
+                pair = pair if row[0] in pair else set(row) - pair
+                self.assertEqual({row[0], row[code]}, pair)
+
+    def test_sampled_chunks_are_full(self):
+        tree = toytree.rtree.rtree(4, seed=123)
+        chunks = list(quartet_dist.iter_quartet_resolutions(tree, nsamples=3, seed=1))
+        self.assertEqual([i[0].shape for i in chunks], [(3, 4)])
+        chunks = list(quartet_dist.iter_quartet_resolutions(self.tree2, nsamples=2500, seed=1, chunk_size=1000))
+        self.assertEqual([i[0].shape[0] for i in chunks], [1000, 1000, 500])
+        for qrts, _ in chunks:
+            self.assertTrue((np.diff(np.sort(qrts, axis=1), axis=1) > 0).all())
+
+    def test_duplicate_names_raise(self):
+        tree = toytree.tree("((a,b),((a,c),(d,e)));")
+        with self.assertRaises(ValueError):
+            quartet_dist.get_quartet_resolutions_table(tree)
+        with self.assertRaises(ValueError):
+            next(quartet_dist.iter_quartet_resolutions(tree))
+        with self.assertRaises(ValueError):
+            quartet_dist.get_quartet_resolutions(tree, [[0, 1, 2, 3]], names=tree.get_tip_labels())
+
+    def test_approx_interval_contains_exact(self):
+        exact = quartet_dist.get_treedist_quartets(self.tree1, self.tree2)
+        approx = quartet_dist.get_treedist_quartets(self.tree1, self.tree2, approx=True, seed=123)
+        for metric in quartet_dist.QUARTET_METRICS:
+            self.assertLessEqual(approx.loc[metric, "low"], exact[metric])
+            self.assertGreaterEqual(approx.loc[metric, "high"], exact[metric])
+
+    def test_approx_stops_at_precision(self):
+        kwargs = dict(metric="explicitly_agree", approx=True, seed=123)
+        _, low, high = quartet_dist.get_quartet_metric(self.tree1, self.tree2, precision=0.02, **kwargs)
+        self.assertLessEqual((high - low) / 2, 0.02)
+        data = quartet_dist.get_quartet_metric(self.tree1, self.tree2, approx=True, max_samples=5000, seed=1)
+        self.assertAlmostEqual(data["S"] + data["D"] + data["U"] + data["R1"] + data["R2"], data["Q"])
+
+
+class TestSplitIndex(unittest.TestCase):
+    def setUp(self):
+        self.trees = [toytree.rtree.rtree(12, seed=i) for i in range(50)]
+        self.trees.append(self.trees[0].mod.collapse_nodes(13, 14))
+        self.index = toytree.distance.SplitIndex(toytree.mtree(self.trees))
+
+    def test_shared_counts_match_rf(self):
+        query = self.trees[1].unroot()
+        nquery = len(set(query.iter_bipartitions(type=frozenset, sort=True)))
+        shared = self.index.get_shared_split_counts(query)
+        for tidx, tree in enumerate(self.trees):
+            dist = toytree.distance.get_treedist_rf(query, tree)
+            self.assertEqual(nquery + self.index.nsplits[tidx] - 2 * shared[tidx], dist)
+
+    def test_query_top_k(self):
+        query = self.trees[0]
+        dists = sorted(toytree.distance.get_treedist_rf(query, i) for i in self.trees)
+        result = self.index.query(query, k=5)
+        self.assertEqual(result.rf.tolist(), dists[:5])
+        self.assertEqual(result.tree[0], 0)
+        result = self.index.query(query, k=5, metric="jaccard")
+        self.assertTrue(np.all(np.diff(result.jaccard) >= 0))
+        with self.assertRaises(ValueError):
+            self.index.query(query, k=0)
+
+
+class TestSplitSketch(unittest.TestCase):
+    def setUp(self):
+        self.trees = [toytree.rtree.rtree(30, seed=i) for i in range(20)]
+        self.trees.append(self.trees[0].unroot().mod.collapse_nodes(35, 36))
+
+    def test_batch_matches_single(self):
+        sketches, nsplits = toytree.distance.sketch_splits(self.trees, k=64, return_nsplits=True, chunk_size=7)
+        for tidx, tree in enumerate(self.trees):
+            sketch = toytree.distance.sketch_splits(tree, k=64)
+            self.assertTrue(np.array_equal(sketches[tidx], sketch))
+        self.assertEqual(nsplits[-1], 25)
+
+    def test_rf_estimates(self):
+        sketches, nsplits = toytree.distance.sketch_splits(self.trees, k=512, seed=1, return_nsplits=True)
+        approx = toytree.distance.get_treedist_rf_sketch_matrix(sketches, nsplits1=nsplits, normalize=False)
+        exact = np.array([[toytree.distance.get_treedist_rf(i, j) for j in self.trees] for i in self.trees])
+        self.assertTrue(np.allclose(np.diag(approx), 0))
+        self.assertLess(np.abs(approx - exact).mean(), 2.)
+
+
+class TestTreeMoveDists(unittest.TestCase):
+    def setUp(self):
+        self.tree1 = toytree.tree("((((a,b),c),d),(((e,f),g),h));")
+        self.tree2 = toytree.tree("((((a,c),b),d),(((e,g),f),h));")
+        self.tree3 = toytree.tree("(((a,c),(b,d)),(((e,f),g),h));")
+
+    def test_spr_known(self):
+        self.assertEqual(toytree.distance.get_treedist_spr(self.tree1, self.tree1), 0)
+        self.assertEqual(toytree.distance.get_treedist_spr(self.tree1, self.tree2), 2)
+        self.assertEqual(toytree.distance.get_treedist_spr(self.tree1, self.tree3), 1)
+        self.assertTrue(np.isnan(toytree.distance.get_treedist_spr(self.tree1, self.tree2, max_dist=1)))
+
+    def test_spr_matches_brute_force(self):
+        # a move across a shared clade, which a sum over clades overcounts
+        tree1 = toytree.tree("((r0,r1),((r2,r3),(r4,(r5,r6))));")
+        tree2 = toytree.tree("(r0,(r1,((((r2,r3),r4),r5),r6)));")
+        self.assertEqual(toytree.distance.get_treedist_spr(tree1, tree2), 2)
+        for ntips in (6, 7, 8):
+            for seed in range(5):
+                tree1 = toytree.rtree.rtree(ntips, seed=seed)
+                tree2 = toytree.rtree.rtree(ntips, seed=seed + 100)
+                dist = toytree.distance.get_treedist_spr(tree1, tree2)
+                self.assertEqual(dist, _get_spr_distance_bfs(tree1, tree2))
+
+    def test_nni_bounds(self):
+        self.assertEqual(toytree.distance.get_treedist_nni(self.tree1, self.tree2, return_bounds=True), (2, 2))
+        for seed in range(5):
+            tree1 = toytree.rtree.unittree(12, seed=seed)
+            tree2 = toytree.rtree.unittree(12, seed=seed + 100)
+            lower, upper = toytree.distance.get_treedist_nni(tree1, tree2, return_bounds=True)
+            approx = toytree.distance.get_treedist_nni(tree1, tree2, max_exact=4)
+            self.assertTrue(lower <= upper <= approx)
+
+    def test_matrix(self):
+        trees = [self.tree1, self.tree2, self.tree3]
+        dists = toytree.distance.get_treedist_spr_matrix(toytree.mtree(trees))
+        self.assertTrue(np.array_equal(dists, [[0, 2, 1], [2, 0, 2], [1, 2, 0]]))
+
+
+class TestBranchScoreMatrix(unittest.TestCase):
+    def setUp(self):
+        self.tree1 = toytree.tree("(((a:1,b:1):1,c:2):1,(d:1,e:1):2);")
+        self.tree2 = toytree.tree("(((a:1,c:1):1,b:2):1,(d:1,e:1):2);")
+        self.trees = [toytree.rtree.bdtree(12, seed=i) for i in range(10)]
+
+    def test_known(self):
+        # splits ab|cde (1) and ac|bde (1) differ, and c (2 vs 1), b (1 vs 2)
+        self.assertAlmostEqual(toytree.distance.get_treedist_kf_branch_score(self.tree1, self.tree2), 2.)
+        self.assertAlmostEqual(toytree.distance.get_treedist_wrf(self.tree1, self.tree2), 4.)
+        self.assertAlmostEqual(toytree.distance.get_treedist_wrf(self.tree1, self.tree1.unroot()), 0.)
+
+    def test_identical_trees_are_exactly_zero(self):
+        for tree in self.trees:
+            self.assertEqual(toytree.distance.get_treedist_kf_branch_score(tree, tree.copy()), 0.)
+            self.assertEqual(toytree.distance.get_treedist_wrf(tree, tree.copy()), 0.)
+        trees = self.trees + [i.copy() for i in self.trees]
+        kf = toytree.distance.get_treedist_kf_branch_score_matrix(trees, max_size=50)
+        wrf = toytree.distance.get_treedist_wrf_matrix(trees)
+        for idx in range(len(self.trees)):
+            self.assertEqual(kf[idx, idx + len(self.trees)], 0.)
+            self.assertEqual(wrf[idx + len(self.trees), idx], 0.)
+
+    def test_chunks_match_pairs(self):
+        kf = toytree.distance.get_treedist_kf_branch_score_matrix(self.trees, max_size=50)
+        wrf = toytree.distance.get_treedist_wrf_matrix(toytree.mtree(self.trees), max_size=50)
+        for i, j in itertools.combinations(range(len(self.trees)), 2):
+            self.assertAlmostEqual(kf[i, j], toytree.distance.get_treedist_kf_branch_score(self.trees[i], self.trees[j]))
+            self.assertAlmostEqual(wrf[i, j], toytree.distance.get_treedist_wrf(self.trees[i], self.trees[j]))
+        self.assertTrue(np.allclose(wrf, wrf.T))
+
+
+if __name__ == "__main__":
+
+    unittest.main()
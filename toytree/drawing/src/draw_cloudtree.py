@@ -1,112 +1,263 @@
 #!/usr/bin/env python
 
-"""In development...
+"""Parse user args to `draw_cloud_tree` and return a CloudTreeMark.
 
-A CloudTreeMark is a Mark containing many overlapping trees. To reduce
-the html+css size we use a custom render function?
+The Node coordinates of all trees are computed in a single vectorized
+pass over Node idx labels (see `get_cloud_tree_coords`), rather than
+building a TreeStyle and Layout for each tree, and all trees are
+drawn in a single CloudTreeMark. The consensus tip order used when
+`fixed_order` is not provided is cached on the MultiTree so that it
+is not re-computed on every draw.
 """
 
-from typing import Sequence, TypeVar
+from typing import Sequence, TypeVar, Tuple, List, Dict, Any, Optional
 from loguru import logger
-# from toytree import MultiTree
-from toytree.drawing import ToyTreeMark
-# from toytree.core import Canvas, Cartesian
-from toytree.style import tree_style_to_css_dict
-from toytree.drawing.src.draw_toytree import (
-    get_layout, parse_draw_args_to_tree_style)
-# from toytree.drawing.src.mark_cloudtree import CloudTreeMark
-
-Mark = TypeVar("Mark")
+import numpy as np
+from toytree.color import ToyColor
+from toytree.utils import ToytreeError
+from toytree.style import TreeStyle, tree_style_to_css_dict
+from toytree.drawing.src.draw_toytree import parse_draw_args_to_tree_style
+from toytree.drawing.src.mark_cloudtree import CloudTreeMark
+
+ToyTree = TypeVar("ToyTree")
 MultiTree = TypeVar("MultiTree")
 logger = logger.bind(name="toytree")
 
 
-def draw_cloudtree(mtree: MultiTree, **kwargs) -> Sequence[Mark]:
-    """Parse arguments to draw_cloudtree and return drawing objects.
+def get_consensus_tip_order(mtree: MultiTree, treelist: Sequence[ToyTree]) -> List[str]:
+    """Return tip labels of a consensus of treelist in ladderized order.
+
+    The result is cached on the MultiTree for the topologies of the
+    trees in treelist (tip names and parent idx labels, which change
+    if a tree is modified), such that repeated drawings of the same
+    trees do not re-compute it.
+    """
+    key = tuple(
+        (tuple(i.get_tip_labels()), tuple(j._up._idx for j in i[:-1]))
+        for i in treelist
+    )
+    cache = mtree._consensus_tip_order
+    if (cache is None) or (cache[0] != key):
+        ctree = type(mtree)(list(treelist)).get_consensus_tree()
+        mtree._consensus_tip_order = (key, ctree.get_tip_labels())
+    return mtree._consensus_tip_order[1]
+
+
+def get_cloud_tree_coords(
+    treelist: Sequence[ToyTree],
+    fixed_order: Sequence[str],
+    fixed_position: Optional[Sequence[float]] = None,
+    interior_algorithm: int = 1,
+    use_edge_lengths: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return Node coordinates and edges of all trees as 3D arrays.
+
+    Coordinates are returned as (position, height) in the 'd' layout
+    orientation with shape (ntrees, nnodes, 2), and edges as (child,
+    parent) idx labels with shape (ntrees, nnodes - 1, 2). Trees with
+    fewer Nodes than the largest tree are padded with nan and -1.
+
+    Tip positions are set by `fixed_order`, and internal Nodes are
+    placed in the middle of their children (interior_algorithm=0) or
+    in the middle of their descendant tips (interior_algorithm=1).
+    This is computed by visiting Node idx labels in order (children
+    always precede parents) and updating all trees at once.
+    """
+    ntrees = len(treelist)
+    ntips = treelist[0].ntips
+    nnodes = max(i.nnodes for i in treelist)
+
+    # get user fixed-positions or use the default range of 0-Ntips
+    if fixed_position is None:
+        positions = np.arange(ntips, dtype=float)
+    else:
+        positions = np.array(fixed_position, dtype=float)
+        if positions.size != ntips:
+            raise ToytreeError("fixed_position arg must be same len as ntips.")
+    if len(fixed_order) != ntips:
+        raise ToytreeError(
+            f"fixed_order arg (len={len(fixed_order)}) must be the same "
+            f"length as ntips (len={ntips}).")
+    name_to_pos = dict(zip(fixed_order, positions))
+
+    # fill arrays of tip positions, heights, and parent idxs
+    xpos = np.full((ntrees, nnodes), np.nan)
+    heights = np.full((ntrees, nnodes), np.nan)
+    parents = np.full((ntrees, nnodes), -1, dtype=int)
+    for tidx, tree in enumerate(treelist):
+        if tree.ntips != ntips:
+            raise ToytreeError("All trees must have the same number of tips.")
+        try:
+            xpos[tidx, :ntips] = [name_to_pos[tree[i].name] for i in range(ntips)]
+        except KeyError as exc:
+            raise ToytreeError(f"name {exc} not in fixed_order.") from exc
+        heights[tidx, :tree.nnodes] = [i._height for i in tree]
+        parents[tidx, :tree.nnodes - 1] = [i._up._idx for i in tree[:-1]]
+
+    # min and max of child positions (algorithm 0) or tip positions (1)
+    lower = np.full((ntrees, nnodes), np.inf)
+    upper = np.full((ntrees, nnodes), -np.inf)
+    lower[:, :ntips] = upper[:, :ntips] = xpos[:, :ntips]
+    depths = np.zeros((ntrees, nnodes))
+
+    # visit Nodes in idx order to propagate values to parents, where
+    # internal Nodes are placed only in trees that contain idx nidx.
+    present = ~np.isnan(heights)
+    for nidx in range(nnodes):
+        if nidx >= ntips:
+            tidxs = np.nonzero(present[:, nidx])[0]
+            xpos[tidxs, nidx] = (lower[tidxs, nidx] + upper[tidxs, nidx]) / 2.
+        tidxs = np.nonzero(parents[:, nidx] >= 0)[0]
+        pidxs = parents[tidxs, nidx]
+        if interior_algorithm:
+            lower[tidxs, pidxs] = np.minimum(lower[tidxs, pidxs], lower[tidxs, nidx])
+            upper[tidxs, pidxs] = np.maximum(upper[tidxs, pidxs], upper[tidxs, nidx])
+        else:
+            lower[tidxs, pidxs] = np.minimum(lower[tidxs, pidxs], xpos[tidxs, nidx])
+            upper[tidxs, pidxs] = np.maximum(upper[tidxs, pidxs], xpos[tidxs, nidx])
+        depths[tidxs, pidxs] = np.maximum(depths[tidxs, pidxs], depths[tidxs, nidx] + 1)
+
+    # unit length edges: internal heights are max number of edges to a tip
+    if not use_edge_lengths:
+        heights = np.where(np.isnan(heights), np.nan, depths)
+        heights[:, :ntips] = 0
+
+    # edges as (child, parent) padded with -1
+    etables = np.full((ntrees, nnodes - 1, 2), -1, dtype=int)
+    mask = parents[:, :-1] >= 0
+    etables[:, :, 0] = np.where(mask, np.arange(nnodes - 1), -1)
+    etables[:, :, 1] = parents[:, :-1]
+    return np.dstack([xpos, heights]), etables
+
+
+def get_edge_style_groups(
+    treelist: Sequence[ToyTree],
+    style: TreeStyle,
+    use_tree_styles: bool,
+    user_edge_style: Optional[Dict[str, Any]],
+) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """Return the edge style group of each tree and the group styles.
+
+    Each tree's `.style.edge_style` stroke, stroke-width and stroke-
+    opacity are used unless overridden by user args, or unless a new
+    base tree_style was selected (use_tree_styles=False). Trees with
+    identical values share a group, and are drawn as one SVG path.
+    """
+    user = {i.replace("-", "_"): j for (i, j) in (user_edge_style or {}).items()}
+    default_opacity = min(1., 3 / len(treelist))
+    groups = np.zeros(len(treelist), dtype=int)
+    keys = {}
+    styles = []
+    for tidx, tree in enumerate(treelist):
+        estyle = tree.style.edge_style if use_tree_styles else style.edge_style
+        stroke = user.get("stroke", estyle.stroke)
+        width = user.get("stroke_width", estyle.stroke_width)
+        opacity = user.get("stroke_opacity", estyle.stroke_opacity)
+        opacity = default_opacity if opacity is None else opacity
+        key = (str(stroke), width, opacity)
+        if key not in keys:
+            keys[key] = len(styles)
+            styles.append({
+                "stroke": ToyColor(stroke),
+                "stroke-width": width,
+                "stroke-opacity": opacity,
+            })
+        groups[tidx] = keys[key]
+    return groups, styles
+
+
+def draw_cloudtree(mtree: MultiTree, **kwargs) -> CloudTreeMark:
+    """Parse arguments to draw_cloudtree and return a CloudTreeMark.
 
     CloudTree is a Mark similar to a ToyTree but with many overlapping
-    sets of edges, where each set can be individually styled. Only one
-    set of tip labels is plotted.
+    sets of edges, where sets of trees with different edge styles are
+    each drawn as a single path. Only one set of tip labels is plotted.
     """
     # which trees to plot
-    idxs = kwargs.get("idxs")
-    if idxs:
-        mtree = mtree.copy()
-        mtree.treelist = mtree.treelist[idxs]
+    idxs = kwargs.pop("idxs", None)
+    if idxs is None:
+        treelist = mtree.treelist
+    else:
+        treelist = [mtree.treelist[i] for i in idxs]
 
-    # ... todo...
-    jitter = kwargs.get("jitter", 0.)
+    # args that are not tree styles
+    jitter = kwargs.pop("jitter", 0.)
+    density = kwargs.pop("density", False)
+    fixed_position = kwargs.pop("fixed_position", None)
+    interior_algorithm = kwargs.pop("interior_algorithm", 1)
 
     # get fixed order of tips from consensus tree if not provided.
-    fixed_order = kwargs.get("fixed_order", None)
+    fixed_order = kwargs.pop("fixed_order", None)
     if fixed_order in [True, False, None]:
-        fixed_order = (
-            mtree
-            .get_consensus_tree()
-            .get_tip_labels()
-        )
-
-    # iterate over trees and for each, allow the trees individual style
-    # to override any styles not fixed or from kwargs.
-    marks = []
-    for tidx, tree in enumerate(mtree):
-
-        # only show tips for the first tree
-        if tidx:
-            kwargs["tip_labels"] = False
-
-        # hard-coded to disallow some styles
-        kwargs["scale_bar"] = False
-
-        # get the tree's style
-        style = parse_draw_args_to_tree_style(tree, **kwargs)
-
-        # override styles not set by user
-        style.edge_type = kwargs.get("edge_type", 'c')
-        if style.edge_style.stroke_opacity is None:
-            style.edge_style.stroke_opacity = 1 / len(mtree) * 3
-
-        # get coordinate layout of this tree
-        layout = get_layout(
-            tree=tree,
-            style=style,
-            fixed_order=fixed_order,
-            fixed_position=kwargs.get("fixed_position", None),
-            interior_algorithm=kwargs.get("interior_algorithm", 1),
-        )
-
-        if style.tip_labels_angles is None:
-            style.tip_labels_angles = layout.angles
-
-        mark = ToyTreeMark(
-            ntable=layout.coords,
-            ttable=layout.tcoords,
-            etable=tree.get_edges('idx'),
-            **tree_style_to_css_dict(style),
-        )
-        marks.append(mark)
-
-    # get a Layout with coordinates projected based on the first tree
-    return marks
+        fixed_order = get_consensus_tip_order(mtree, treelist)
+
+    # get a single style for the first tree. Hard-coded to disallow
+    # some styles. Node markers and labels are not drawn.
+    kwargs["scale_bar"] = False
+    use_tree_styles = not kwargs.get("tree_style")
+    style = parse_draw_args_to_tree_style(treelist[0], **kwargs)
+    style.edge_type = kwargs.get("edge_type", 'c')
+    if style.layout not in ("r", "l", "u", "d"):
+        raise ToytreeError(
+            "draw_cloud_tree only supports linear layouts ('r', 'l', 'u', 'd').")
+
+    # get coordinates of all trees in 'd' orientation (position, height)
+    ntables, etables = get_cloud_tree_coords(
+        treelist, fixed_order, fixed_position,
+        interior_algorithm, style.use_edge_lengths,
+    )
+
+    # optional random shift of the position of each tree
+    if jitter:
+        ntables[:, :, 0] += np.random.uniform(-jitter, jitter, (ntables.shape[0], 1))
+
+    # re-orient for layout direction (see LinearLayout)
+    if style.layout in "ud":
+        angles = np.repeat(-90, treelist[0].ntips)
+        if style.layout == "u":
+            ntables[:, :, 1] *= -1
+    else:
+        angles = np.zeros(treelist[0].ntips)
+        ntables = ntables[:, :, [1, 0]]
+        if style.layout == "r":
+            ntables[:, :, 0] *= -1
+    ntables[:, :, 0] += style.xbaseline
+    ntables[:, :, 1] += style.ybaseline
+
+    # tip label coordinates from the first tree
+    ntable = ntables[0, :treelist[0].nnodes]
+    ttable = ntable[:treelist[0].ntips].copy()
+    if style.tip_labels_align:
+        if style.layout in "ud":
+            ttable[:, 1] = style.ybaseline
+        else:
+            ttable[:, 0] = style.xbaseline
+    if style.tip_labels_angles is None:
+        style.tip_labels_angles = angles
+
+    # group trees by edge styles
+    groups, gstyles = get_edge_style_groups(
+        treelist, style, use_tree_styles, kwargs.get("edge_style"))
+
+    return CloudTreeMark(
+        ntables=ntables,
+        etables=etables,
+        edge_groups=groups,
+        edge_group_styles=gstyles,
+        density=density,
+        ntable=ntable,
+        ttable=ttable,
+        etable=etables[0, :treelist[0].nnodes - 1],
+        **tree_style_to_css_dict(style),
+    )
 
 
 if __name__ == "__main__":
 
     import toytree
-    import toyplot
     trees = [toytree.rtree.coaltree(k=6, seed=i) for i in range(100)]
     mtree = toytree.mtree(trees)
-
-    canvas = toyplot.Canvas()
-    axes = canvas.cartesian()
-    kwargs = dict(
-        tree_style=None, axes=axes, kwargs={}, edge_widths=3,
-        fixed_position=None,
-        # fixed_order=["r1", "r0", "r3", "r4", "r5", "r2"],
-    )
-
     mtree[10].style.edge_style.stroke = "red"
     mtree[10].style.edge_style.stroke_opacity = 1
-    marks = draw_cloudtree(mtree, **kwargs)
-    if marks:
-        toytree.utils.show([canvas])
+    canvas, axes, mark = mtree.draw_cloud_tree(edge_widths=3)
+    toytree.utils.show(canvas)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+
+"""A custom toyplot Mark for drawing many overlapping trees.
+
+A CloudTreeMark stores the Node coordinates of many trees in a single
+array and renders all of their edges as one merged SVG <path> element
+per unique edge style, rather than one <path> per edge per tree.
+This greatly reduces the size of the html/svg for cloud tree drawings
+of thousands of trees. Alternatively, edges can be rendered as a
+single density raster image.
+
+The Mark inherits from ToyTreeMark, with the .ntable, .ttable and
+.etable of the first tree used to place tip labels and compute the
+Mark extents.
+"""
+
+from typing import List, Dict, Any
+import functools
+import xml.etree.ElementTree as xml
+from multipledispatch import dispatch
+import numpy as np
+import toyplot
+import toyplot.bitmap
+from toytree.color import ToyColor
+from toytree.color.src.concat import concat_style_fix_color
+from toytree.drawing.src.mark_toytree import ToyTreeMark
+from toytree.drawing.src.render_tree import RenderToytree
+
+
+class CloudTreeMark(ToyTreeMark):
+    """Mark for many overlapping trees sharing one set of tip labels.
+
+    Parameters
+    ----------
+    ntables: np.ndarray
+        Array of shape (ntrees, nnodes, 2) with Node coordinates of
+        each tree. Trees with fewer Nodes (polytomies) are nan padded.
+    etables: np.ndarray
+        Array of shape (ntrees, nnodes - 1, 2) with (child, parent)
+        idx labels of each edge, padded with -1.
+    edge_groups: np.ndarray
+        Array of len ntrees with the index of each tree's edge style
+        in `edge_group_styles`.
+    edge_group_styles: List[Dict]
+        Unique edge style dicts (stroke, stroke-width, stroke-opacity).
+    density: bool
+        If True edges are rendered as a density raster image.
+    **kwargs:
+        Validated style args passed to ToyTreeMark.
+    """
+    def __init__(
+        self,
+        ntables: np.ndarray,
+        etables: np.ndarray,
+        edge_groups: np.ndarray,
+        edge_group_styles: List[Dict[str, Any]],
+        density: bool = False,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.ntables: np.ndarray = ntables
+        """: coordinates of the Nodes of every tree."""
+        self.etables: np.ndarray = etables
+        """: 3D array of edge idx labels of every tree."""
+        self.edge_groups: np.ndarray = edge_groups
+        """: index of the edge style group of each tree."""
+        self.edge_group_styles: List[Dict[str, Any]] = edge_group_styles
+        """: unique edge style dicts."""
+        self.density: bool = density
+        """: render edges as a density raster."""
+
+    @property
+    def ntrees(self) -> int:
+        """The number of trees in the Mark."""
+        return self.ntables.shape[0]
+
+    def domain(self, axis: str) -> np.ndarray:
+        """The Nodes of all trees define the domain of the data."""
+        index = self._coordinate_axes.index(axis)
+        return toyplot.data.minimax([self.ntables[:, :, index]])
+
+
+# ---------------------------------------------------------------------
+# Register multipledispatch to use the toyplot.html namespace
+dispatch = functools.partial(dispatch, namespace=toyplot.html._namespace)
+
+
+# register a _render function for CloudTreeMark objects
+@dispatch(toyplot.coordinates.Cartesian, CloudTreeMark, toyplot.html.RenderContext)
+def _render(axes, mark, context):
+    RenderCloudTree(axes, mark, context)
+# ---------------------------------------------------------------------
+
+
+class RenderCloudTree(RenderToytree):
+    """Class with functions to add a CloudTreeMark to the HTML DOM.
+
+    Edges of all trees are rendered as merged paths (one per unique
+    edge style), or as a density raster, followed by the tip labels
+    of the first tree. Node markers and labels are not drawn.
+    """
+    def project_coordinates(self):
+        """Store node coordinates of all trees projected to px units."""
+        self.nodes_x = self.axes.project('x', self.mark.ntable[:, 0])
+        self.nodes_y = self.axes.project('y', self.mark.ntable[:, 1])
+        self.tips_x = self.axes.project('x', self.mark.ttable[:, 0])
+        self.tips_y = self.axes.project('y', self.mark.ttable[:, 1])
+        self.trees_x = self.axes.project('x', self.mark.ntables[:, :, 0])
+        self.trees_y = self.axes.project('y', self.mark.ntables[:, :, 1])
+
+    def build_dom(self):
+        """Creates DOM of xml.SubElements in self.context."""
+        self.edges_xml = xml.SubElement(
+            self.mark_xml, "g",
+            attrib={"class": "toytree-Edges"},
+            style=concat_style_fix_color(
+                {i: j for (i, j) in self.mark.edge_style.items() if i != "fill"},
+                "fill:none",
+            ),
+        )
+        if self.mark.density:
+            self.mark_edges_density()
+        else:
+            self.mark_edges()
+        self.mark_tip_labels()
+
+    def get_segments(self, tidxs: np.ndarray) -> np.ndarray:
+        """Return array of (px, py, cx, cy) for all edges of trees.
+
+        Edges of type 'p' are returned as two line segments.
+        """
+        etables = self.mark.etables[tidxs]
+        tree, edge = np.nonzero(etables[:, :, 0] >= 0)
+        cidx = etables[tree, edge, 0]
+        pidx = etables[tree, edge, 1]
+        tree = tidxs[tree]
+        cx = self.trees_x[tree, cidx]
+        cy = self.trees_y[tree, cidx]
+        px = self.trees_x[tree, pidx]
+        py = self.trees_y[tree, pidx]
+
+        # phylo |_| edges: parent -> elbow -> child
+        if self.mark.edge_type == "p":
+            if self.mark.layout in "ud":
+                ex, ey = cx, py
+            else:
+                ex, ey = px, cy
+            return np.concatenate([
+                np.column_stack([px, py, ex, ey]),
+                np.column_stack([ex, ey, cx, cy]),
+            ])
+        return np.column_stack([px, py, cx, cy])
+
+    def get_path(self, tidxs: np.ndarray) -> str:
+        """Return a single SVG path string for all edges of trees."""
+        segments = self.get_segments(tidxs)
+
+        # bezier edges cannot be split into segments
+        if self.mark.edge_type == "b":
+            fmt = "M %.1f %.1f C %.1f %.1f, %.1f %.1f, %.1f %.1f"
+            if self.mark.layout in "ud":
+                order = [0, 1, 2, 1, 2, 1, 2, 3]
+            else:
+                order = [0, 1, 0, 3, 0, 3, 2, 3]
+            segments = segments[:, order]
+        else:
+            fmt = "M %.1f %.1f L %.1f %.1f"
+        return " ".join(fmt % tuple(i) for i in segments.tolist())
+
+    def mark_edges(self) -> None:
+        """Create one SVG path for all edges of each edge style group."""
+        for gidx, gstyle in enumerate(self.mark.edge_group_styles):
+            tidxs = np.nonzero(self.mark.edge_groups == gidx)[0]
+            xml.SubElement(
+                self.edges_xml, "path",
+                d=self.get_path(tidxs),
+                attrib={"class": f"toytree-CloudEdges-{gidx}"},
+                style=concat_style_fix_color(gstyle),
+            )
+
+    def mark_edges_density(self, chunksize: int = 500) -> None:
+        """Create a raster image of the density of edges in px space.
+
+        Line segments are sampled at ~1px intervals and counted on a
+        grid covering the data range, in chunks of trees to limit
+        memory. The grid is rendered as an image colored by the stroke
+        of the first edge group with alpha proportional to density.
+        """
+        xmin, xmax = np.nanmin(self.trees_x), np.nanmax(self.trees_x)
+        ymin, ymax = np.nanmin(self.trees_y), np.nanmax(self.trees_y)
+        width = int(np.ceil(xmax - xmin)) + 1
+        height = int(np.ceil(ymax - ymin)) + 1
+        grid = np.zeros(width * height)
+
+        for start in range(0, self.mark.ntrees, chunksize):
+            tidxs = np.arange(start, min(start + chunksize, self.mark.ntrees))
+            segs = self.get_segments(tidxs)
+            nsamp = np.ceil(np.maximum(
+                np.abs(segs[:, 2] - segs[:, 0]),
+                np.abs(segs[:, 3] - segs[:, 1]))).astype(int) + 1
+            sidx = np.repeat(np.arange(segs.shape[0]), nsamp)
+            frac = np.arange(sidx.size) - np.repeat(np.cumsum(nsamp) - nsamp, nsamp)
+            frac = frac / np.maximum(nsamp[sidx] - 1, 1)
+            xpos = segs[sidx, 0] + frac * (segs[sidx, 2] - segs[sidx, 0])
+            ypos = segs[sidx, 1] + frac * (segs[sidx, 3] - segs[sidx, 1])
+            cols = np.round(xpos - xmin).astype(int)
+            rows = np.round(ypos - ymin).astype(int)
+            grid += np.bincount(rows * width + cols, minlength=grid.size)
+
+        # rgba image with alpha scaled by density
+        grid = grid.reshape((height, width))
+        color = ToyColor(self.mark.edge_group_styles[0]["stroke"])
+        image = np.zeros((height, width, 4))
+        image[:, :, :3] = color.rgb
+        image[:, :, 3] = np.sqrt(grid / grid.max()) if grid.max() else 0
+        xml.SubElement(
+            self.edges_xml, "image",
+            x=f"{xmin:.1f}",
+            y=f"{ymin:.1f}",
+            width=str(width),
+            height=str(height),
+            attrib={
+                "class": "toytree-CloudEdges-density",
+                "xlink:href": toyplot.bitmap.to_png_data_uri(image),
+            },
+        )
+
+
+if __name__ == "__main__":
+
+    import toytree
+    trees = [toytree.rtree.coaltree(k=6, seed=i) for i in range(100)]
+    mtree = toytree.mtree(trees)
+    canvas, axes, mark = mtree.draw_cloud_tree()
+    toytree.utils.show(canvas)
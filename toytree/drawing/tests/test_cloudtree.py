@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+"""Test drawing MultiTrees as cloud trees.
+
+"""
+
+import unittest
+import warnings
+import numpy as np
+import toyplot
+import toytree
+from toytree.utils import ToytreeError
+from toytree.drawing.src.draw_cloudtree import get_cloud_tree_coords
+
+
+class TestCloudTree(unittest.TestCase):
+    def setUp(self):
+        trees = [toytree.rtree.unittree(8, seed=i) for i in range(10)]
+        self.mtree = toytree.mtree(trees)
+        # trees with unequal nnodes (polytomies)
+        ptrees = list(trees)
+        ptrees[1] = ptrees[1].mod.collapse_nodes(8, 9)
+        ptrees[3] = ptrees[3].mod.collapse_nodes(10)
+        self.ptree = toytree.mtree(ptrees)
+
+    def test_render_linear_layouts(self):
+        for mtree in (self.mtree, self.ptree):
+            for layout in ("r", "l", "u", "d"):
+                for density in (False, True):
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("error", RuntimeWarning)
+                        canvas, _, mark = mtree.draw_cloud_tree(layout=layout, density=density)
+                        html = toyplot.html.render(canvas)
+                    self.assertEqual(mark.ntables.shape[0], len(mtree))
+                    self.assertFalse(np.isnan(mark.ntable).any())
+                    images = html.findall(".//{*}image") + html.findall(".//image")
+                    self.assertEqual(bool(images), density)
+
+    def test_padded_coords(self):
+        nnodes = [i.nnodes for i in self.ptree]
+        order = self.ptree[0].get_tip_labels()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            ntables, etables = get_cloud_tree_coords(self.ptree.treelist, order)
+        for tidx, tree in enumerate(self.ptree):
+            self.assertFalse(np.isnan(ntables[tidx, :nnodes[tidx]]).any())
+            self.assertTrue(np.isnan(ntables[tidx, nnodes[tidx]:]).all())
+            self.assertTrue((etables[tidx, nnodes[tidx] - 1:] == -1).all())
+            # internal Nodes are centered over their descendant tips
+            for node in tree[tree.ntips:]:
+                pos = [order.index(i) for i in node.get_leaf_names()]
+                self.assertAlmostEqual(ntables[tidx, node.idx, 0], (min(pos) + max(pos)) / 2)
+
+    def test_fixed_order_and_idxs(self):
+        order = list(reversed(self.mtree[0].get_tip_labels()))
+        _, _, mark = self.mtree.draw_cloud_tree(fixed_order=order, idxs=[2, 4, 6], layout="d")
+        self.assertEqual(mark.ntables.shape[0], 3)
+        tips = {self.mtree[2][i].name: mark.ntable[i, 0] for i in range(8)}
+        self.assertEqual(sorted(tips, key=tips.get), order)
+        with self.assertRaises(ToytreeError):
+            self.mtree.draw_cloud_tree(fixed_order=order[:-1])
+
+    def test_consensus_order_cache(self):
+        mtree = toytree.mtree([i.copy() for i in self.mtree])
+        mtree.draw_cloud_tree()
+        key, order = mtree._consensus_tip_order
+        mtree.draw_cloud_tree()
+        self.assertIs(mtree._consensus_tip_order[1], order)
+
+        # an in-place edit or a replaced tree invalidates the cache
+        mtree[0].mod.collapse_nodes(8, inplace=True)
+        mtree.draw_cloud_tree()
+        self.assertNotEqual(mtree._consensus_tip_order[0], key)
+        key = mtree._consensus_tip_order[0]
+        mtree.treelist[1] = toytree.rtree.unittree(8, seed=100)
+        mtree.draw_cloud_tree()
+        self.assertNotEqual(mtree._consensus_tip_order[0], key)
+
+    def test_non_linear_layout_raises(self):
+        for layout in ("c", "unrooted"):
+            with self.assertRaises(ToytreeError):
+                self.mtree.draw_cloud_tree(layout=layout)
+
+
+if __name__ == "__main__":
+
+    unittest.main()
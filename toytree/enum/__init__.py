@@ -10,3 +10,4 @@ from toytree.enum.src.bipartitions import *
 from toytree.enum.src.quadripartitions import *
 from toytree.enum.src.quartets import *
 from toytree.enum.src.counting import *
+from toytree.enum.src.topologies import *
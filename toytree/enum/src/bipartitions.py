@@ -5,11 +5,18 @@
 Methods
 -------
 iter_bipartitions
+get_bipartitions_array
 
+Bipartitions are computed in a single pass over Nodes in idx order
+as packed bitsets, where bit i of a row is set if the Node with idx
+label i is below an edge. Each row is the bitwise OR of the rows of
+its children, and the other side of each split is its complement.
+Sets or tuples of Nodes or features are unpacked lazily from rows.
 """
 
-from typing import TypeVar, Iterator, Tuple, Optional, Set, Callable, Sequence
+from typing import TypeVar, Iterator, Tuple, Optional, Set, Callable, Sequence, Union
 from loguru import logger
+import numpy as np
 from toytree import Node, ToyTree
 from toytree.core.apis import TreeEnumAPI, add_subpackage_method, add_toytree_method
 
@@ -18,10 +25,125 @@ Query = TypeVar("Query")
 
 __all__ = [
     "iter_bipartitions",
+    "get_bipartitions_array",
     "_iter_bipartition_sets",
 ]
 
 
+def _get_node_bits(tree: ToyTree, nbits: int) -> np.ndarray:
+    """Return (nnodes, nwords) packed uint64 rows of Nodes in each clade.
+
+    The first nbits Nodes in idx order (tips, or all Nodes) have their
+    own bit set, and each row is the OR of the rows of its children.
+    """
+    nwords = max(1, (nbits + 63) // 64)
+    bits = np.zeros((tree.nnodes, nwords), dtype=np.uint64)
+    idxs = np.arange(nbits)
+    bits[idxs, idxs >> 6] = np.uint64(1) << (idxs & 63).astype(np.uint64)
+    for node in tree[tree.ntips:]:
+        for child in node._children:
+            bits[node._idx] |= bits[child._idx]
+    return bits
+
+
+def _get_bipartition_bits(
+    tree: ToyTree,
+    include_singleton_partitions: bool = False,
+    include_internal_nodes: bool = False,
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Return packed uint64 rows of Nodes below each edge, and a mask.
+
+    Rows are returned for edges in the order they are yielded by
+    `_iter_bipartition_sets`. Bits are for tip Nodes only, or for all
+    Nodes if include_internal_nodes, in idx order. The mask has bits
+    set for every Node that can be on either side of a split, such
+    that the other side of a split is `mask & ~row`.
+    """
+    nbits = tree.nnodes if include_internal_nodes else tree.ntips
+    bits = _get_node_bits(tree, nbits)
+
+    # exclude the root, and one edge of a bifurcating root if rooted
+    mask = bits[tree.treenode._idx].copy()
+    topnode = tree.nnodes - 1
+    if tree.is_rooted():
+        topnode -= 1
+        if include_internal_nodes:
+            ridx = tree.treenode._idx
+            mask[ridx >> 6] &= ~(np.uint64(1) << np.uint64(ridx & 63))
+    start = 0 if include_singleton_partitions else tree.ntips
+    return bits[start:topnode], mask, nbits
+
+
+def _unpack_bits(row: np.ndarray, nbits: int) -> np.ndarray:
+    """Return array of the positions of set bits in a packed row."""
+    row = row.astype("<u8", copy=False).view(np.uint8)
+    return np.flatnonzero(np.unpackbits(row, bitorder="little")[:nbits])
+
+
+def _get_popcounts(bits: np.ndarray) -> np.ndarray:
+    """Return the number of set bits in each row of a packed array."""
+    bits = bits.astype("<u8", copy=False).view(np.uint8)
+    return np.unpackbits(bits, axis=1).sum(axis=1)
+
+
+def _get_sorted_bits(tree: ToyTree, bits: np.ndarray, mask: np.ndarray, nbits: int) -> np.ndarray:
+    """Return rows flipped to the side of each split sorted first.
+
+    Sides are ordered as in `_format_bipartition` by the number of
+    Nodes, and then by the lowest Node name (see
+    `_build_node_names_for_sorting`), which must be on one side.
+    """
+    other = mask & ~bits
+    bsize = _get_popcounts(bits)
+    osize = _get_popcounts(other)
+    keys = {i: _build_node_names_for_sorting(tree[i]) for i in _unpack_bits(mask, nbits)}
+    kmin = min(keys, key=keys.get)
+    in_other = (other[:, kmin >> 6] >> np.uint64(kmin & 63)) & np.uint64(1)
+    flip = (osize < bsize) | ((osize == bsize) & in_other.astype(bool))
+    return np.where(flip[:, None], other, bits)
+
+
+@add_subpackage_method(TreeEnumAPI)
+def get_bipartitions_array(
+    tree: ToyTree,
+    include_singleton_partitions: bool = False,
+    include_internal_nodes: bool = False,
+    sort: bool = False,
+) -> np.ndarray:
+    """Return bipartitions as an array of packed uint64 bitsets.
+
+    Each row represents one side of a bipartition as ceil(nbits / 64)
+    uint64 words, in which bit i (bit i % 64 of word i // 64) is set
+    if the Node with idx label i is on that side, where nbits is the
+    number of tips, or Nodes if include_internal_nodes=True. Rows are
+    in the same order as the bipartitions of `iter_bipartitions`. The
+    other side of each split is the complement of a row among the
+    Nodes in the split (see `iter_bipartitions(type="bits")`).
+
+    Parameters
+    ----------
+    include_singleton_partitions: bool
+        If True then singleton splits (e.g., (A | B,C,D)) are included.
+    include_internal_nodes: bool
+        If True then bits represent all Nodes, not only tip Nodes.
+    sort: bool
+        If False, rows represent the Nodes below each edge (child
+        side). If True, rows represent the side that is first when
+        sorted by size and then lowest name, as in `iter_bipartitions`.
+
+    Examples
+    --------
+    >>> tree = toytree.tree("(a,b,((c,d)CD,(e,f)EF)X)AB;")
+    >>> tree.enum.get_bipartitions_array()
+    >>> # array([[12], [48], [60]], dtype=uint64)
+    """
+    bits, mask, nbits = _get_bipartition_bits(
+        tree, include_singleton_partitions, include_internal_nodes)
+    if sort and bits.size:
+        return _get_sorted_bits(tree, bits, mask, nbits)
+    return bits
+
+
 @add_subpackage_method(TreeEnumAPI)
 def _iter_bipartition_sets(
     tree: ToyTree,
@@ -74,39 +196,16 @@ def _iter_bipartition_sets(
     >>> #  ({4, 5, 7}, {0, 1, 2, 3, 6, 8, 9}),
     >>> #  ({2, 3, 4, 5, 6, 7, 8}, {0, 1, 9})]
     """
-    # store cache of desc below each node to reduce traversals
-    cache = {}
-
-    # nodes set to iterate over. Do not include the root.
-    node_set = set(tree)
-    topnode = tree.nnodes - 1
-
-    # do not include root node in node_set if tree is rooted.
-    if tree.is_rooted():
-        node_set -= {tree.treenode}
-        topnode -= 1
-
-    # iterate over all nodes in idx order building cache as it goes.
-    for node in tree[:topnode]:
-        if node.is_leaf():
-            below = cache[node] = {node}
-            if not include_singleton_partitions:
-                continue
-        else:
-            below = set.union(*([{node}] + [cache[i] for i in node.children]))
-            cache[node] = below
-
-        # get all nodes not under this split
-        other = node_set - cache[node]
-
-        # if excluding internal Nodes
-        if not include_internal_nodes:
-            below = set(i for i in below if i._idx < tree.ntips)
-            other = set(i for i in other if i._idx < tree.ntips)
-
-        # yield biparts except at root in unrooted trees: ({}, {all})
+    bits, mask, nbits = _get_bipartition_bits(
+        tree, include_singleton_partitions, include_internal_nodes)
+    nodes = [tree[i] for i in range(nbits)]
+
+    # unpack each split from its bits and the complement of its bits
+    for row in bits:
+        below = (nodes[i] for i in _unpack_bits(row, nbits))
+        other = (nodes[i] for i in _unpack_bits(mask & ~row, nbits))
         if feature is None:
-            yield below, other
+            yield set(below), set(other)
         else:
             yield (
                 set(getattr(i, feature) for i in below),
@@ -121,7 +220,7 @@ def iter_bipartitions(
     feature: Optional[str] = "name",
     include_singleton_partitions: bool = False,
     include_internal_nodes: bool = False,
-    type: Callable = set,
+    type: Union[Callable, str] = set,
     sort: bool = False,
 ) -> Iterator[Tuple[Sequence, Sequence]]:
     """Generator of bipartitions (Nodes on either side of edges).
@@ -162,7 +261,10 @@ def iter_bipartitions(
         The type of collection used to represent a partition. Default
         is `set` to return a tuple of sets, but another useful option
         is `tuple`, which returns a tuple of tuples. The latter
-        collection can be converted into a set of bipartitions.
+        collection can be converted into a set of bipartitions. If
+        type="bits" each partition is a packed uint64 array in which
+        bit i is set for the Node with idx label i, in which case the
+        feature arg is ignored (see `get_bipartitions_array`).
     sort: bool
         If False, bipartitions are returned as (child, parent) order
         given the topology and rooting in Node idx order traversal. If
@@ -208,6 +310,12 @@ def iter_bipartitions(
     >>> x = set(tree.root('a').iter_bipartitions(type=tuple, sort=True))
     >>> y = set(tree.root('e').iter_bipartitions(type=tuple, sort=True))
     >>> assert x == y
+
+    >>> # biparts as packed bitsets of tip idx labels
+    >>> list(tree.iter_bipartitions(type="bits"))
+    >>> # [(array([12], dtype=uint64), array([51], dtype=uint64)),
+    >>> #  (array([48], dtype=uint64), array([15], dtype=uint64)),
+    >>> #  (array([60], dtype=uint64), array([3], dtype=uint64))]
     """
     kwargs = dict(
         tree=tree,
@@ -216,6 +324,18 @@ def iter_bipartitions(
         include_internal_nodes=include_internal_nodes,
     )
 
+    # packed bitsets of idx labels, and their complements
+    if isinstance(type, str):
+        if type != "bits":
+            raise ValueError(f"type must be a Callable or 'bits', not {type!r}")
+        bits, mask, nbits = _get_bipartition_bits(
+            tree, include_singleton_partitions, include_internal_nodes)
+        if sort and bits.size:
+            bits = _get_sorted_bits(tree, bits, mask, nbits)
+        for row in bits:
+            yield row, mask & ~row
+        return
+
     # fastest approach returns bipart consistently as (child, parent)
     # and get feature from _iter_bipartition_sets if requested.
     # yield ({part1}, {part2})
@@ -152,15 +152,15 @@ def get_num_bifurcating_trees(ntips: int, rooted: bool = True) -> int:
     """
     # rooted case
     if rooted:
-        ntrees = int(
+        ntrees = (
             factorial(2 * ntips - 3)
-            / (2 ** (ntips - 2) * factorial(ntips - 2))
+            // (2 ** (ntips - 2) * factorial(ntips - 2))
         )
     # unrooted case
     else:
-        ntrees = int(
+        ntrees = (
             factorial(2 * (ntips - 1) - 3)
-            / (2 ** (ntips - 3) * factorial(ntips - 3))
+            // (2 ** (ntips - 3) * factorial(ntips - 3))
         )
     return ntrees
 
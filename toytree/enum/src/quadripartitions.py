@@ -15,13 +15,23 @@ Get tuples of Nodes for each quartet induced by quadripartitions in a tree.
 Get tuples of Nodes for each quartet induced by quadripartitions in a tree.
 >>> tree.iter_quadripartitions('idx', sort=True, collapse=True)
 # ({'c'}, {'d'}, {'a', 'b'}, {'e', 'f'})
+
+Get the four clades of each quadripartition as tip bitsets or sizes.
+>>> tree.enum.get_quadripartitions_array(sizes=True)
+# array([[1, 1, 2, 2], ...])
+
+Get the number of quartets induced by each internal edge.
+>>> tree.enum.get_edge_quartet_counts()
 """
 
-from typing import TypeVar, Iterator, Tuple, Optional, Set, Callable, Sequence
+from typing import TypeVar, Iterator, Tuple, Optional, Set, Callable, Sequence, List
 import itertools
 from loguru import logger
+import numpy as np
+import pandas as pd
 from toytree import Node, ToyTree
 from toytree.core.apis import TreeEnumAPI, add_subpackage_method, add_toytree_method
+from toytree.enum.src.bipartitions import _get_node_bits
 # from toytree.utils import ToytreeError
 
 logger = logger.bind(name="toytree")
@@ -31,6 +41,8 @@ Query = TypeVar("Query")
 __all__ = [
     "_iter_quadripartition_sets",
     "iter_quadripartitions",
+    "get_quadripartitions_array",
+    "get_edge_quartet_counts",
     # "iter_quartets",
     # "iter_edge_quadripartition_sets",
 ]
@@ -340,6 +352,133 @@ def iter_quadripartitions(
                 yield ((p1, p2), (p3, p4))
 
 
+def _iter_edge_directions(tree: ToyTree) -> Iterator[Tuple[Node, List[int], List[Tuple[int, int]]]]:
+    """Yield (Node, below, above) directions around each internal edge.
+
+    Directions are (Node idx, complement) pairs representing the tips
+    in the clade of a Node, or not in it if complement=1. Below are
+    the children of the edge's Node and above are its sisters and the
+    'up' direction, or the directions below the root on the other side
+    of the edge if its parent is the root. Edges are in the same order
+    as in `_iter_quadripartition_sets`.
+    """
+    topnode = tree.nnodes - 2 if tree.is_rooted() else tree.nnodes - 1
+    for node in tree[tree.ntips: topnode]:
+        below = [(i._idx, 0) for i in node._children]
+        sisters = node.get_sisters()
+        if node._up.is_root():
+            if len(sisters) > 1:
+                above = [(i._idx, 0) for i in sisters]
+            else:
+                above = [(i._idx, 0) for i in sisters[0]._children]
+        else:
+            above = [(i._idx, 0) for i in sisters] + [(node._up._idx, 1)]
+        yield node, below, above
+
+
+def _get_quadripartition_directions(tree: ToyTree) -> np.ndarray:
+    """Return (nquads, 4, 2) array of directions of each quadripartition.
+
+    Quadripartitions are in the same order as `_iter_quadripartition_sets`,
+    including all combinations of pairs of directions around polytomies.
+    """
+    quads = []
+    for node, below, above in _iter_edge_directions(tree):
+        if node._up.is_root():
+            pairs = itertools.combinations(above, 2)
+        else:
+            pairs = itertools.product(above[:-1], above[-1:])
+        quads.extend(
+            [b0, b1, a0, a1] for ((b0, b1), (a0, a1))
+            in itertools.product(itertools.combinations(below, 2), list(pairs))
+        )
+    return np.array(quads, dtype=np.int64).reshape(-1, 4, 2)
+
+
+@add_subpackage_method(TreeEnumAPI)
+def get_quadripartitions_array(tree: ToyTree, sizes: bool = False) -> np.ndarray:
+    """Return the four clades of each quadripartition as tip bitsets.
+
+    Clades are returned for each quadripartition in the same order as
+    `iter_quadripartitions(collapse=True)`, (child-left, child-right,
+    sister, up), as packed uint64 bitsets in which bit i (bit i % 64
+    of word i // 64) is set if the tip with idx label i is in the
+    clade. The bitsets of all clades are computed in a single pass
+    over Nodes, and the 'up' clade is the complement of a clade.
+    Optionally only the number of tips in each clade is returned.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A tree to extract quadripartitions from.
+    sizes: bool
+        If True an int array of the number of tips in each clade is
+        returned, with shape (nquads, 4), else a uint64 array of shape
+        (nquads, 4, ceil(ntips / 64)).
+
+    Examples
+    --------
+    >>> tree = toytree.tree("(a,b,((c,d)CD,(e,f)EF)X)AB;")
+    >>> tree.enum.get_quadripartitions_array(sizes=True)
+    >>> # array([[1, 1, 2, 2],
+    >>> #        [1, 1, 2, 2],
+    >>> #        [2, 2, 1, 1]])
+    """
+    dirs = _get_quadripartition_directions(tree)
+    didxs, comps = dirs[..., 0], dirs[..., 1].astype(bool)
+    if sizes:
+        nsizes = np.zeros(tree.nnodes, dtype=np.int64)
+        nsizes[:tree.ntips] = 1
+        for node in tree[tree.ntips:]:
+            nsizes[node._idx] = sum(nsizes[i._idx] for i in node._children)
+        return np.where(comps, tree.ntips - nsizes[didxs], nsizes[didxs])
+    bits = _get_node_bits(tree, tree.ntips)
+    mask = bits[tree.treenode._idx]
+    return np.where(comps[..., None], mask & ~bits[didxs], bits[didxs])
+
+
+@add_subpackage_method(TreeEnumAPI)
+def get_edge_quartet_counts(tree: ToyTree) -> pd.Series:
+    """Return the number of quartets induced by each internal edge.
+
+    An edge induces every quartet ab|cd in which a and b are from
+    different clades below the edge and c and d are from different
+    clades above it, i.e., quartets for which it is the only edge
+    separating the two pairs. For clade sizes x on a side this is the
+    number of pairs (sum(x)^2 - sum(x^2)) / 2, such that counts for
+    all edges are found in O(n) from the sizes of clades, rather than
+    by enumerating quadripartitions. Values are useful, for example,
+    as the denominators of quartet concordance factors of edges. Note
+    that if the parent of an edge is a polytomy, quartets with c and
+    d from two of its sister clades are counted, whereas
+    `iter_quadripartitions` only pairs each sister with the up clade.
+
+    Returns
+    -------
+    A pd.Series of counts indexed by Node idx, for the edges above
+    each internal Node in the order of `iter_quadripartitions`.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.rtree(10, seed=123)
+    >>> tree.enum.get_edge_quartet_counts()
+    """
+    nsizes = [1] * tree.ntips + [0] * (tree.nnodes - tree.ntips)
+    for node in tree[tree.ntips:]:
+        nsizes[node._idx] = sum(nsizes[i._idx] for i in node._children)
+
+    idxs = []
+    counts = []
+    for node, below, above in _iter_edge_directions(tree):
+        pairs = []
+        for dirs in (below, above):
+            xsizes = [tree.ntips - nsizes[i] if comp else nsizes[i] for (i, comp) in dirs]
+            pairs.append((sum(xsizes) ** 2 - sum(i ** 2 for i in xsizes)) // 2)
+        idxs.append(node._idx)
+        counts.append(pairs[0] * pairs[1])
+    return pd.Series(counts, index=idxs, dtype=np.int64)
+
+
 def _build_node_names_for_sorting(node: Node) -> str:
     """Returns node name to use while sorting tip and internal nodes."""
     if node.is_leaf():
@@ -3,6 +3,18 @@
 """Enum submodule for finding or iterating over topologies from
 a defined tree space.
 
+Labeled bifurcating topologies are indexed by stepwise addition: a
+rooted tree of n tips is built from a tree of tips (0, 1) by adding
+tip k onto one of the 2k - 1 edges (including the root edge) of the
+tree of tips 0..k-1, for k in 2..n-1. Every tree has a unique code
+of edge choices, and the code read as a mixed-radix number is its
+rank in [0, get_num_bifurcating_trees(n)). Edges are numbered by
+sorting the clades below them by (lowest tip, size), which depends
+only on the tree, such that codes (and ranks) can be recovered from
+a tree by removing tips in reverse order. Unrooted trees of n tips
+are indexed as rooted trees of the other n - 1 tips, rooted on the
+(alphanumerically) first tip.
+
 IN DEVELOPMENT
 
 TODO
@@ -12,8 +24,318 @@ TODO
 
 """
 
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 import numpy as np
-from toytree.core import ToyTree
+from toytree.core import ToyTree, Node
+from toytree.core.apis import TreeEnumAPI, add_subpackage_method
+from toytree.enum.src.counting import get_num_bifurcating_trees
+
+__all__ = [
+    "get_topology_rank",
+    "get_topology_from_rank",
+    "iter_topologies",
+    "sample_topologies",
+]
+
+
+def _get_popcount(clade: int) -> int:
+    """Return the number of tips in a clade int bitmask."""
+    return bin(clade).count("1")
+
+
+def _get_sorted_clades(clades: Sequence[int]) -> List[int]:
+    """Return clades sorted by (lowest tip, size) to number edges."""
+    return sorted(clades, key=lambda x: (x & -x, _get_popcount(x)))
+
+
+def _get_names(ntips: Union[int, Sequence[str]], rooted: bool) -> List[str]:
+    """Return sorted tip names, or names r0...rn if ntips is an int."""
+    if isinstance(ntips, int):
+        names = [f"r{i}" for i in range(ntips)]
+    else:
+        names = list(ntips)
+    if len(set(names)) != len(names):
+        raise ValueError("tip names must be unique.")
+    if len(names) < (2 if rooted else 3):
+        raise ValueError("rooted trees require >=2 tips and unrooted trees >=3 tips.")
+    return sorted(names)
+
+
+def _get_radices(ntips: int, rooted: bool) -> List[int]:
+    """Return the number of edges each tip can be added to."""
+    nadd = ntips if rooted else ntips - 1
+    return [2 * k - 1 for k in range(2, nadd)]
+
+
+def _get_codes_from_rank(rank: int, radices: Sequence[int]) -> List[int]:
+    """Return the mixed-radix digits of a rank (first is most significant)."""
+    codes = []
+    for radix in reversed(radices):
+        rank, code = divmod(rank, radix)
+        codes.append(code)
+    return codes[::-1]
+
+
+def _get_rank_from_codes(codes: Sequence[int], radices: Sequence[int]) -> int:
+    """Return the rank of a sequence of mixed-radix digits."""
+    rank = 0
+    for code, radix in zip(codes, radices):
+        rank = rank * radix + code
+    return rank
+
+
+def _get_children_from_codes(codes: Sequence[int]) -> Tuple[int, Dict[int, List[int]]]:
+    """Return root and {node: [children]} of a tree built by stepwise addition.
+
+    Tips are ids 0..n-1 and internal nodes are ids >= n. Edges (the nodes below them) are
+    kept in (lowest tip, size) order, which is unchanged by adding a
+    tip: a new parent of the target is next after the target and a new
+    tip is last, such that edge numbers do not require sorting.
+    """
+    ntips = len(codes) + 2
+    parents = {0: ntips, 1: ntips, ntips: None}
+    children = {ntips: [0, 1]}
+    order = [0, ntips, 1]
+    for tip, code in enumerate(codes, start=2):
+        target = order[code]
+        new = ntips + tip - 1
+        parent = parents[target]
+        if parent is not None:
+            kids = children[parent]
+            kids[kids.index(target)] = new
+        parents[new] = parent
+        parents[target] = parents[tip] = new
+        children[new] = [target, tip]
+        order.insert(code + 1, new)
+        order.append(tip)
+    root = next(i for (i, j) in parents.items() if j is None)
+    return root, children
+
+
+def _get_codes_from_clades(clades: Sequence[int], ntips: int) -> List[int]:
+    """Return stepwise addition codes of a rooted tree by removing tips.
+
+    The parent of the last tip is next after its sibling in the order
+    of edges, and the last tip is last, such that both are removed and
+    the tip's bit is cleared from the remaining clades at each step.
+    """
+    order = _get_sorted_clades(clades)
+    codes = []
+    for tip in range(ntips - 1, 1, -1):
+        bit = 1 << tip
+        order.pop()
+        pos = min(
+            (i for (i, j) in enumerate(order) if j & bit),
+            key=lambda x: _get_popcount(order[x]),
+        )
+        del order[pos]
+        order = [i & ~bit for i in order]
+        codes.append(pos - 1)
+    return codes[::-1]
+
+
+def _get_tree_from_codes(codes: Sequence[int], names: Sequence[str], rooted: bool) -> ToyTree:
+    """Return a ToyTree from stepwise addition codes.
+
+    If unrooted, the codes are for a rooted tree of names[1:], and
+    names[0] is added as a child of the root.
+    """
+    if not rooted:
+        outgroup, names = names[0], names[1:]
+    ridx, children = _get_children_from_codes(codes)
+    ntips = len(names)
+    root = Node(dist=1.)
+    stack = [(ridx, root)]
+    while stack:
+        nidx, node = stack.pop()
+        for cidx in children[nidx]:
+            if cidx < ntips:
+                node._add_child(Node(name=names[cidx], dist=1.))
+            else:
+                child = Node(dist=1.)
+                node._add_child(child)
+                stack.append((cidx, child))
+    if not rooted:
+        root._add_child(Node(name=outgroup, dist=1.))
+    return ToyTree(root)
+
+
+@add_subpackage_method(TreeEnumAPI)
+def get_topology_rank(
+    tree: ToyTree,
+    rooted: Optional[bool] = None,
+    names: Optional[Sequence[str]] = None,
+) -> int:
+    """Return the rank of a labeled bifurcating topology.
+
+    The rank is an int in [0, get_num_bifurcating_trees(ntips, rooted))
+    that uniquely indexes the topology among all labeled rooted (or
+    unrooted) bifurcating trees with the same tip names, such that
+    `get_topology_from_rank(rank, names, rooted)` returns the same
+    topology. Branch lengths and the order of children are ignored.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A bifurcating tree (rooted, or unrooted with a basal trifurcation
+        if rooted=False).
+    rooted: bool or None
+        Rank among rooted or unrooted topologies. Default is to use
+        rooted if the tree is rooted.
+    names: Sequence[str] or None
+        The tip names in the tree space. Ranks only depend on the set
+        of names, which are sorted alphanumerically to label tips.
+        Default is the tip names of the tree.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.rtree(10, seed=123)
+    >>> rank = tree.enum.get_topology_rank()
+    >>> toytree.enum.get_topology_from_rank(rank, 10).distance.get_treedist_rf(tree)
+    >>> # 0
+    """
+    rooted = tree.is_rooted() if rooted is None else rooted
+    names = _get_names(tree.get_tip_labels() if names is None else names, rooted)
+    if sorted(tree.get_tip_labels()) != names:
+        raise ValueError("tree tip names do not match names.")
+    if rooted and not tree.is_rooted():
+        raise ValueError("tree must be rooted to rank among rooted topologies.")
+
+    # get clades as bitmasks of tips in names order
+    bits = {j: 1 << i for (i, j) in enumerate(names)}
+    clades = [0] * tree.nnodes
+    for node in tree:
+        if node.is_leaf():
+            clades[node._idx] = bits[node.name]
+        else:
+            clades[node._idx] = sum(clades[i._idx] for i in node._children)
+
+    # unrooted: orient clades away from the first tip and drop its bit
+    nadd = len(names) if rooted else len(names) - 1
+    if rooted:
+        clades = set(clades)
+    else:
+        full = clades[-1]
+        clades = {(full ^ i if i & 1 else i) >> 1 for i in clades[:-1]}
+
+    # a bifurcating tree of n tips has 2n - 1 unique clades
+    if len(clades) != 2 * nadd - 1:
+        raise ValueError("tree must be bifurcating.")
+    codes = _get_codes_from_clades(clades, nadd)
+    return _get_rank_from_codes(codes, _get_radices(len(names), rooted))
+
+
+def get_topology_from_rank(
+    rank: int,
+    ntips: Union[int, Sequence[str]],
+    rooted: bool = True,
+) -> ToyTree:
+    """Return the labeled bifurcating topology with a given rank.
+
+    Parameters
+    ----------
+    rank: int
+        An int in [0, get_num_bifurcating_trees(ntips, rooted)).
+    ntips: int or Sequence[str]
+        The number of tips, named r0...rn, or a list of unique tip
+        names. Names are sorted alphanumerically to label tips.
+    rooted: bool
+        Return a rooted topology, else an unrooted topology with a
+        basal trifurcation.
+
+    Examples
+    --------
+    >>> tree = toytree.enum.get_topology_from_rank(100, ntips=6)
+    """
+    names = _get_names(ntips, rooted)
+    ntrees = get_num_bifurcating_trees(len(names), rooted)
+    if not 0 <= rank < ntrees:
+        raise ValueError(f"rank must be in [0, {ntrees}).")
+    codes = _get_codes_from_rank(int(rank), _get_radices(len(names), rooted))
+    return _get_tree_from_codes(codes, names, rooted)
+
+
+def iter_topologies(
+    ntips: Union[int, Sequence[str]],
+    rooted: bool = True,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> Iterator[ToyTree]:
+    """Generator of labeled bifurcating topologies in order of rank.
+
+    Topologies are generated lazily from ranks in [start, stop), by
+    incrementing stepwise addition codes, such that small tree spaces
+    can be exhaustively evaluated, or large tree spaces in slices.
+
+    Parameters
+    ----------
+    ntips: int or Sequence[str]
+        The number of tips, named r0...rn, or a list of unique tip names.
+    rooted: bool
+        Generate rooted or unrooted topologies.
+    start: int
+        The rank of the first topology.
+    stop: int or None
+        The rank after the last topology. Default is the number of
+        topologies, get_num_bifurcating_trees(ntips, rooted).
+
+    Examples
+    --------
+    >>> for tree in toytree.enum.iter_topologies(5, rooted=False):
+    >>>     print(tree.write(dist_formatter=None))
+    """
+    names = _get_names(ntips, rooted)
+    ntrees = get_num_bifurcating_trees(len(names), rooted)
+    stop = ntrees if stop is None else min(stop, ntrees)
+    if not 0 <= start <= ntrees:
+        raise ValueError(f"start must be in [0, {ntrees}].")
+    radices = _get_radices(len(names), rooted)
+    codes = _get_codes_from_rank(start, radices)
+    for _ in range(start, stop):
+        yield _get_tree_from_codes(codes, names, rooted)
+
+        # increment the last digit, carrying to the left
+        for pos in range(len(codes) - 1, -1, -1):
+            codes[pos] += 1
+            if codes[pos] < radices[pos]:
+                break
+            codes[pos] = 0
+
+
+def sample_topologies(
+    ntips: Union[int, Sequence[str]],
+    nsamples: int = 1,
+    rooted: bool = True,
+    seed: Optional[int] = None,
+) -> List[ToyTree]:
+    """Return topologies sampled uniformly from labeled tree space.
+
+    Each tree is generated from a uniformly random rank, by sampling
+    each digit of its stepwise addition code uniformly, such that all
+    labeled bifurcating topologies are equally likely, without
+    rejection and without computing ranks of arbitrary size.
+
+    Parameters
+    ----------
+    ntips: int or Sequence[str]
+        The number of tips, named r0...rn, or a list of unique tip names.
+    nsamples: int
+        The number of trees to sample (with replacement).
+    rooted: bool
+        Sample rooted or unrooted topologies.
+    seed: int or None
+        Seed for the numpy random number generator.
+
+    Examples
+    --------
+    >>> trees = toytree.enum.sample_topologies(20, nsamples=100, seed=123)
+    >>> mtree = toytree.mtree(trees)
+    """
+    names = _get_names(ntips, rooted)
+    radices = np.array(_get_radices(len(names), rooted), dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    codes = (rng.random((nsamples, radices.size)) * radices).astype(np.int64)
+    return [_get_tree_from_codes(i.tolist(), names, rooted) for i in codes]
 
 
 def get_unlabeled_trees(ntips: int) -> int:
@@ -6,7 +6,9 @@
 - iter_quartets
 """
 
+import itertools
 import unittest
+import numpy as np
 import toytree
 from toytree.enum import iter_bipartitions
 
@@ -134,6 +136,25 @@ class TestBipartitions(unittest.TestCase):
         self.assertEqual(b1, b2)
         self.assertEqual(b2, b3)
 
+    def test_iter_bipartitions_bits(self):
+        """Packed bitsets of idx labels match sets of idx labels."""
+        tree = toytree.rtree.rtree(80, seed=123).mod.collapse_nodes(85, 90)
+        for sort, internal in itertools.product([False, True], repeat=2):
+            kwargs = dict(include_internal_nodes=internal, include_singleton_partitions=True, sort=sort)
+            nbits = tree.nnodes if internal else tree.ntips
+            expect = list(tree.iter_bipartitions(feature="idx", type=tuple, **kwargs))
+            result = [
+                tuple(tuple(np.flatnonzero(np.unpackbits(i.view(np.uint8), bitorder="little")[:nbits])) for i in bipart)
+                for bipart in tree.iter_bipartitions(type="bits", **kwargs)
+            ]
+            self.assertEqual([tuple(map(set, i)) for i in expect], [tuple(map(set, i)) for i in result])
+            arr = tree.enum.get_bipartitions_array(**kwargs)
+            self.assertTrue(np.array_equal(arr, [i[0] for i in tree.iter_bipartitions(type="bits", **kwargs)]))
+
+        # bitsets of tip idxs
+        arr = self.tree1.enum.get_bipartitions_array()
+        self.assertEqual(arr.ravel().tolist(), [0b001100, 0b110000, 0b111100])
+
 
 if __name__ == "__main__":
 
@@ -5,6 +5,7 @@
 """
 
 import unittest
+import numpy as np
 import toytree
 # from toytree.utils import ToytreeError
 from toytree.enum import iter_quadripartitions, _iter_quadripartition_sets
@@ -116,6 +117,34 @@ class TestQuadripartitions(unittest.TestCase):
             ]
             self.assertEqual(parts, PARTS)
 
+    def test_quadripartitions_array(self):
+        """Array of tip bitsets and sizes matches sets of tip idxs."""
+        tree = toytree.rtree.rtree(70, seed=123).mod.collapse_nodes(75, 80, 85)
+        for itree in (tree, tree.unroot()):
+            expect = [
+                [set(j) for i in qpart for j in i]
+                for qpart in _iter_quadripartition_sets(itree, feature="idx")
+            ]
+            arr = itree.enum.get_quadripartitions_array()
+            result = [
+                [set(np.flatnonzero(np.unpackbits(j.view(np.uint8), bitorder="little")[:itree.ntips])) for j in i]
+                for i in arr
+            ]
+            self.assertEqual(expect, result)
+            sizes = itree.enum.get_quadripartitions_array(sizes=True)
+            self.assertEqual(sizes.tolist(), [[len(j) for j in i] for i in expect])
+
+    def test_edge_quartet_counts(self):
+        """Counts are products of the four clade sizes around edges."""
+        for tree in self.trees:
+            counts = tree.enum.get_edge_quartet_counts()
+            self.assertEqual(counts.tolist(), [4, 4, 4])
+        tree = toytree.rtree.rtree(50, seed=123)
+        counts = tree.enum.get_edge_quartet_counts()
+        sizes = tree.enum.get_quadripartitions_array(sizes=True)
+        self.assertEqual(counts.tolist(), sizes.prod(axis=1).tolist())
+        self.assertEqual(counts.sum(), tree.unroot().enum.get_edge_quartet_counts().sum())
+
 
 if __name__ == "__main__":
 
@@ -38,6 +38,8 @@ test_list
 """
 
 import unittest
+import itertools
+import numpy as np
 import toytree
 from toytree.enum import _iter_unresolved_quartet_sets, _iter_quartet_sets, iter_quartets
 
@@ -288,6 +290,21 @@ class TestQuartets(unittest.TestCase):
         self.assertEqual(parts, PARTS)
 
 
+    def test_quartet_blocks(self):
+        """Test iter_quartet_blocks yields each induced quartet once."""
+        for tree in self.trees + [toytree.rtree.rtree(12, seed=1).mod.collapse_nodes(13)]:
+            blocks = list(toytree.enum.iter_quartet_blocks(tree, chunk_size=5))
+            self.assertTrue(all(i.shape[0] <= 5 for i in blocks))
+            qrts = [frozenset([frozenset(i[:2]), frozenset(i[2:])]) for i in np.concatenate(blocks).tolist()]
+            expected = set()
+            for below, above in tree.iter_bipartitions(feature="idx", type=set):
+                for pair0 in itertools.combinations(below, 2):
+                    for pair1 in itertools.combinations(above, 2):
+                        expected.add(frozenset([frozenset(pair0), frozenset(pair1)]))
+            self.assertEqual(len(qrts), len(set(qrts)))
+            self.assertEqual(set(qrts), expected)
+
+
 if __name__ == "__main__":
 
     unittest.main()
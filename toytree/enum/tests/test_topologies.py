@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+"""Test ranking and unranking of labeled topologies.
+
+- get_topology_rank
+- get_topology_from_rank
+- iter_topologies
+- sample_topologies
+"""
+
+import unittest
+import toytree
+from toytree.enum import (
+    get_num_bifurcating_trees,
+    get_topology_rank,
+    get_topology_from_rank,
+    iter_topologies,
+    sample_topologies,
+)
+
+
+def _get_clades(tree):
+    return frozenset(frozenset(i.get_leaf_names()) for i in tree)
+
+
+class TestTopologies(unittest.TestCase):
+
+    def test_iter_topologies_bijection(self):
+        """All topologies are unique and ranks invert unranking."""
+        for rooted in (True, False):
+            for ntips in range(3, 8):
+                trees = list(iter_topologies(ntips, rooted=rooted))
+                self.assertEqual(len(trees), get_num_bifurcating_trees(ntips, rooted))
+                ranks = [get_topology_rank(i, rooted=rooted) for i in trees]
+                self.assertEqual(ranks, list(range(len(trees))))
+                if rooted:
+                    self.assertEqual(len(set(_get_clades(i) for i in trees)), len(trees))
+                else:
+                    splits = set(frozenset(i.iter_bipartitions(type=tuple, sort=True)) for i in trees)
+                    self.assertEqual(len(splits), len(trees))
+
+    def test_rank_round_trip(self):
+        """Random trees are recovered from their ranks."""
+        for seed in range(10):
+            tree = toytree.rtree.rtree(30, seed=seed)
+            rank = tree.enum.get_topology_rank()
+            other = get_topology_from_rank(rank, tree.get_tip_labels())
+            self.assertEqual(_get_clades(tree), _get_clades(other))
+
+            # unrooted rank is the same for any rooting
+            rank = get_topology_rank(tree, rooted=False)
+            other = get_topology_from_rank(rank, 30, rooted=False)
+            self.assertEqual(get_topology_rank(tree.unroot(), rooted=False), rank)
+            self.assertEqual(toytree.distance.get_treedist_rf(tree, other), 0)
+
+    def test_sample_topologies(self):
+        """Samples are uniform over ranks."""
+        trees = sample_topologies(4, nsamples=1500, seed=123)
+        counts = [0] * 15
+        for tree in trees:
+            counts[get_topology_rank(tree)] += 1
+        self.assertGreater(min(counts), 50)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            get_topology_from_rank(15, 4)
+        with self.assertRaises(ValueError):
+            get_topology_rank(toytree.rtree.rtree(6, seed=1).mod.collapse_nodes(8))
+
+
+if __name__ == "__main__":
+
+    unittest.main()
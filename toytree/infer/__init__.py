@@ -5,8 +5,12 @@
 
 """
 
-from toytree.infer.src.upgma import infer_upgma_tree
+from toytree.infer.src.upgma import infer_upgma_tree, get_upgma_linkage
 from toytree.infer.src.neighbor_joining import infer_neighbor_joining_tree
+from toytree.infer.src.consensus_stream import consensus_from_file
+from toytree.infer.src.consensus_mcc import mcc_from_file
+from toytree.infer.src.parsimony import get_parsimony_score, Parsimony
+from toytree.infer.src.parsimony_search import infer_parsimony_tree
 
 # requires sympy which is not yet in conda recipe, so for now
 # you need to call the following to access the likelihood code:
@@ -8,13 +8,16 @@ Reducing to only unique topologies costs as much time as just
 visiting and computing on them, and would not allow getting dist
 values. So this visits all trees.
 
+See `consensus_stream.py` for a streaming version that does not
+require all trees to be loaded in memory.
+
 TODO
 ----
 Support getting mean, etc, of any feature on trees. This is a bit
 of work, needs to check all for int,float type. Not done.
 """
 
-from typing import TypeVar, Dict, Optional, Tuple, Iterator
+from typing import TypeVar, Dict, Optional, Tuple, Iterator, Union, FrozenSet
 from loguru import logger
 import numpy as np
 from toytree.core.node import Node
@@ -25,6 +28,88 @@ logger = logger.bind(name="toytree")
 MultiTree = TypeVar("MultiTree")
 
 
+class RunningStats:
+    """Online summary statistics of a stream of values.
+
+    Stores the count, mean, min and max of a stream of values, and
+    the sum of squared differences from the mean using Welford's
+    algorithm, such that the variance can be computed in a single
+    pass without storing the values.
+    """
+    __slots__ = ("count", "mean", "m2", "min", "max", "min_positive")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+        self.min = np.inf
+        self.max = -np.inf
+        self.min_positive = np.inf
+
+    def update(self, value: float) -> None:
+        """Add a value to the running statistics."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value > 0:
+            self.min_positive = min(self.min_positive, value)
+
+    @property
+    def std(self) -> float:
+        """Return the population standard deviation (ddof=0)."""
+        if not self.count:
+            return 0.
+        return np.sqrt(self.m2 / self.count)
+
+
+def _get_summary_stats(values: Union[list, RunningStats]) -> Dict[str, float]:
+    """Return a dict of summary statistics for a clade feature.
+
+    Values can be a list of all observed values, or a RunningStats
+    object. The latter cannot compute a median, which is excluded.
+    The min is computed as the min of values > 0, or 0 if none are.
+    """
+    if isinstance(values, RunningStats):
+        return {
+            "min": 0 if np.isinf(values.min_positive) else values.min_positive,
+            "max": values.max,
+            "mean": values.mean,
+            "std": values.std,
+        }
+    values = np.array(values)
+    return {
+        "min": values[values > 0].min() if (values > 0).sum() else 0,
+        "max": values.max(),
+        "mean": values.mean(),
+        "median": np.median(values),
+        "std": values.std(),
+    }
+
+
+def _iter_tree_clades(tree: ToyTree) -> Iterator[Tuple[FrozenSet[str], float, float]]:
+    """Yield (clade, dist, height) for each bipartition in a tree.
+
+    Clades are represented by the frozenset of tip names below each
+    Node. For the children of a bifurcating root the dist is recorded
+    as the summed length of the root edge in its unrooted form.
+    """
+    for nidx, bipart in enumerate(tree.iter_bipartitions("name", True, False)):
+        node = tree[nidx]
+
+        # if a root child then store the edge length in unrooted form
+        # store the root position on the branch in the case that it
+        # is again inferred as the root.
+        dist = node.dist
+        if node.up and node.up.is_root():
+            children = node.up.children
+            if len(children) == 2:
+                dist = sum(i.dist for i in children)
+        yield frozenset(bipart[0]), dist, node.height
+
+
 class ConsensusTree:
     """An extended majority rule consensus class.
 
@@ -195,19 +280,12 @@ class ConsensusTree:
         root = self._build_all_tree(fclade_freqs)
         return ToyTree(root)
 
-    def _build_all_tree(self, fclade_freqs: Dict[Tuple, int]) -> Node:
+    def _build_all_tree(self, fclade_freqs: Dict[FrozenSet, Tuple]) -> Node:
         """Build majority-rule consensus tree from clades"""
-
-        # root node
-        all_tips = frozenset(self.mtree.get_tip_labels())
-        # root = Node(name="")
-        # cset = fclade_freqs[all_tips]
-        # for feat in ['dist_min', 'dist_max', 'dist_median', 'dist_std']:
-        #     setattr(root, feat, 0.)
-        # for feat in ['height_min', 'height_max', 'height_median', 'height_std']:
+        # the root clade contains all tips
+        all_tips = max(fclade_freqs, key=len)
 
         # dict with {tip-set: Node} in order they are added (Py3)
-        # sets_to_nodes = {all_tips: root}
         sets_to_nodes = {}
 
         # visit filtered clades from LARGEST to SMALLEST
@@ -218,30 +296,20 @@ class ConsensusTree:
                 continue
 
             # create Node to represent this clade
-            dists = np.array(fclade_freqs[cset][1])
-            heights = np.array(fclade_freqs[cset][2])
-
-            # ...
+            support, dists, heights = fclade_freqs[cset]
+            dstats = _get_summary_stats(dists)
+            hstats = _get_summary_stats(heights)
             node = Node(
                 name=str(*cset) if len(cset) == 1 else "",
-                support=fclade_freqs[cset][0],
-                dist=dists.mean(),
+                support=support,
+                dist=dstats["mean"],
             )
 
-            # ...
-            dmin = dists[dists > 0].min() if (dists > 0).sum() else 0
-            setattr(node, "dist_min", dmin)
-            setattr(node, "dist_max", dists.max())
-            setattr(node, "dist_mean", np.mean(dists))
-            setattr(node, "dist_median", np.median(dists))
-            setattr(node, "dist_std", dists.std())
-
-            hmin = 0 if not (heights > 0).sum() else min(heights[heights > 0])
-            setattr(node, "height_min", hmin)
-            setattr(node, "height_max", heights.max())
-            setattr(node, "height_mean", np.mean(heights))
-            setattr(node, "height_median", np.median(heights))
-            setattr(node, "height_std", heights.std())
+            # store summary stats of dist and height as features
+            for key, value in dstats.items():
+                setattr(node, f"dist_{key}", value)
+            for key, value in hstats.items():
+                setattr(node, f"height_{key}", value)
 
             # visit existing nodes from SMALLEST to LARGEST
             # children iteratively if node is not an descendant.
@@ -311,39 +379,17 @@ class ConsensusTree:
         ntrees = self.mtree.ntrees
         increment = 1 / ntrees
 
-        # iterate over all unique tree topologies
+        # iterate over all trees
         for utree in self.mtree:
 
-            # iterate over ubipartitions in tree: [[['a'], ['b', 'c']], [...]]
-            for nidx, bipart in enumerate(utree.iter_bipartitions("name", True, False)):
-                # skip tip-only Nodes
-                node = utree[nidx]
-                # store the smaller half
-                clade = tuple(bipart[0])
-
-                # if a root child then store the edge length in unrooted form
-                # store the root position on the branch in the case that it
-                # is again inferred as the root.
-                if node.up:
-                    if node.up.is_root():
-                        children = node.up.children
-                        if len(children) == 2:
-                            dist = sum(i.dist for i in children)
-                            logger.debug([node, node.dist, dist])
-                        else:
-                            dist = node.dist
-                    else:
-                        dist = node.dist
-                else:
-                    dist = node.dist
-
-                # store dist and height
+            # iterate over clades, dists and heights in tree
+            for clade, dist, height in _iter_tree_clades(utree):
                 if clade in clades:
                     clades[clade][0] += increment
                     clades[clade][1].append(dist)
-                    clades[clade][2].append(node.height)
+                    clades[clade][2].append(height)
                 else:
-                    clades[clade] = [increment, [node.dist], [node.height]]
+                    clades[clade] = [increment, [dist], [height]]
 
         # return in sorted order and w/ counts as proportions
         sort_clades = sorted(
@@ -352,7 +398,7 @@ class ConsensusTree:
         )
 
         # add the full (all samples) clade to get stats for it.
-        all_tips = tuple(self.mtree[0].get_tip_labels())
+        all_tips = frozenset(self.mtree[0].get_tip_labels())
         sort_clades = [all_tips] + sort_clades
         clades[all_tips] = (
             1.0,
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+
+"""Maximum clade credibility (MCC) tree from a file of trees.
+
+The MCC tree is the sampled tree that maximizes the product (or sum)
+of the credibilities (posterior frequencies) of its clades. This is
+found by streaming over trees in multiple passes, such that only the
+clade counts and the current best tree are stored in memory:
+
+1. count the occurrence of each rooted clade across trees.
+2. score each tree by its clade credibilities and keep the best.
+3. (optional) collect node heights for clades in the MCC tree to
+annotate it with mean, median and HPD interval node heights, as
+in TreeAnnotator.
+
+Clades are represented as int bitmasks of tip indices (in sorted
+tip name order) which are built in a single postorder pass on each
+tree, and used as keys for hashed lookups of clade counts.
+"""
+
+from typing import Dict, Optional, Iterator, Union, Tuple
+from pathlib import Path
+import numpy as np
+from loguru import logger
+from toytree.core.tree import ToyTree
+from toytree.infer.src.consensus_stream import ConsensusTreeStream
+
+logger = logger.bind(name="toytree")
+
+__all__ = ["MaximumCladeCredibilityTree", "mcc_from_file"]
+
+
+def _get_hpd_interval(values: np.ndarray, prob: float = 0.95) -> Tuple[float, float]:
+    """Return the highest posterior density interval of values.
+
+    This is the shortest interval containing `prob` proportion of
+    the sorted values.
+    """
+    values = np.sort(values)
+    nvals = values.size
+    nkeep = max(1, int(np.ceil(prob * nvals)))
+    widths = values[nkeep - 1:] - values[:nvals - nkeep + 1]
+    start = int(np.argmin(widths))
+    return values[start], values[start + nkeep - 1]
+
+
+class MaximumCladeCredibilityTree(ConsensusTreeStream):
+    """Maximum clade credibility tree built from a tree file.
+
+    Trees are parsed and visited one at a time from a newick or NEXUS
+    file in two passes to count clades and then to score each tree by
+    its clade credibilities. A third pass collects node heights for
+    only the clades in the MCC tree if `node_heights` is not None.
+    Rooted clades are compared, thus all trees should be rooted on
+    the same set of tips.
+
+    Parameters
+    ----------
+    path: str or Path
+        A file containing newick or NEXUS trees.
+    burnin: int or float
+        Number of trees to skip from the start of the file. If a float
+        < 1 then this proportion of trees is skipped.
+    score: str
+        "product" scores trees by the product of clade credibilities
+        (computed as a sum of logs), and "sum" by their sum.
+    node_heights: str or None
+        "median" or "mean" sets the height of each internal Node in
+        the MCC tree to the median or mean of its clade's heights across
+        trees. None keeps the heights of the sampled MCC tree.
+    hpd: float
+        Proportion of values in the highest posterior density interval
+        of node heights.
+    **kwargs:
+        Additional args passed to the newick parser.
+    """
+    def __init__(
+        self,
+        path: Union[str, Path],
+        burnin: Union[int, float] = 0,
+        score: str = "product",
+        node_heights: Optional[str] = "median",
+        hpd: float = 0.95,
+        **kwargs,
+    ):
+        super().__init__(path=path, burnin=burnin, **kwargs)
+        self.score = score
+        self.node_heights = node_heights
+        self.hpd = hpd
+        self.bits: Dict[str, int] = {}
+        """Map of tip names to bit positions in clade bitmasks."""
+        self.clade_counts: Dict[int, int] = {}
+        """Map of clade bitmasks to their counts across trees."""
+        self.mcc_index: Optional[int] = None
+        """Index of the MCC tree in the file (after burnin)."""
+        self.mcc_score: Optional[float] = None
+        """Clade credibility score of the MCC tree."""
+
+        if score not in ("product", "sum"):
+            raise ValueError("score must be 'product' or 'sum'.")
+        if node_heights not in (None, "median", "mean"):
+            raise ValueError("node_heights must be 'median', 'mean' or None.")
+
+    def _iter_tree_clade_bits(self, tree: ToyTree) -> Iterator[Tuple[int, int]]:
+        """Yield (Node idx, clade bitmask) for all internal Nodes.
+
+        Bitmasks are built in a single pass in Node idx order, in which
+        children are always visited before their parents.
+        """
+        if not self.bits:
+            self.bits = {j: 1 << i for i, j in enumerate(sorted(tree.get_tip_labels()))}
+        cache = [0] * tree.nnodes
+        for node in tree:
+            if node._idx < tree.ntips:
+                try:
+                    cache[node._idx] = self.bits[node.name]
+                except KeyError as exc:
+                    raise ValueError(
+                        f"tip '{node.name}' is not in the first tree. All "
+                        "trees must share the same set of tip names.") from exc
+            else:
+                clade = 0
+                for child in node.children:
+                    clade |= cache[child._idx]
+                cache[node._idx] = clade
+                yield node._idx, clade
+
+    def _count_clades(self) -> None:
+        """First pass: count the occurrence of each rooted clade."""
+        self.ntrees = 0
+        self.clade_counts = {}
+        for tree in self._iter_trees():
+            self.ntrees += 1
+            for _, clade in self._iter_tree_clade_bits(tree):
+                self.clade_counts[clade] = self.clade_counts.get(clade, 0) + 1
+        if not self.ntrees:
+            raise ValueError(f"no trees found in {self.path} after burnin.")
+
+    def _get_tree_score(self, tree: ToyTree) -> float:
+        """Return the clade credibility score of a tree."""
+        freqs = np.array([
+            self.clade_counts[clade] for _, clade in self._iter_tree_clade_bits(tree)
+        ]) / self.ntrees
+        if self.score == "product":
+            return np.log(freqs).sum()
+        return freqs.sum()
+
+    def _get_mcc_tree(self) -> ToyTree:
+        """Second pass: score each tree and return the best."""
+        self.mcc_score = -np.inf
+        best_tree = None
+        for tidx, tree in enumerate(self._iter_trees()):
+            score = self._get_tree_score(tree)
+            if score > self.mcc_score:
+                self.mcc_score = score
+                self.mcc_index = tidx
+                best_tree = tree
+        logger.debug(f"MCC tree index={self.mcc_index} score={self.mcc_score:.6g}")
+        return best_tree
+
+    def _get_clade_heights(self, clades: Dict[int, int]) -> Dict[int, np.ndarray]:
+        """Third pass: return array of heights for each selected clade.
+
+        Memory here scales with ntrees x nclades in the MCC tree only.
+        """
+        heights = {clade: np.zeros(self.clade_counts[clade]) for clade in clades}
+        filled = {clade: 0 for clade in clades}
+        for tree in self._iter_trees():
+            for nidx, clade in self._iter_tree_clade_bits(tree):
+                if clade in heights:
+                    heights[clade][filled[clade]] = tree[nidx].height
+                    filled[clade] += 1
+        return heights
+
+    def run(self) -> ToyTree:
+        """Return the MCC tree with clade support and height features.
+
+        Node features include 'support' (clade credibility), and if
+        `node_heights` is not None, 'height_mean', 'height_median',
+        'height_std', 'height_hpd_min', and 'height_hpd_max'.
+        """
+        self._count_clades()
+        mcc = self._get_mcc_tree()
+
+        # store clade support on internal Nodes
+        clades = dict(self._iter_tree_clade_bits(mcc))
+        support = {i: self.clade_counts[j] / self.ntrees for (i, j) in clades.items()}
+        mcc = mcc.set_node_data("support", support)
+        if self.node_heights is None:
+            return mcc
+
+        # summarize node heights of MCC clades across trees
+        heights = self._get_clade_heights({j: i for (i, j) in clades.items()})
+        hmap = {}
+        for nidx, clade in clades.items():
+            node = mcc[nidx]
+            hpd_min, hpd_max = _get_hpd_interval(heights[clade], self.hpd)
+            node.height_mean = np.mean(heights[clade])
+            node.height_median = np.median(heights[clade])
+            node.height_std = np.std(heights[clade])
+            node.height_hpd_min = hpd_min
+            node.height_hpd_max = hpd_max
+            hmap[nidx] = getattr(node, f"height_{self.node_heights}")
+
+        # set node heights to clade summaries, except where this would
+        # make a Node older than its parent (can occur w/ non-ultrametric
+        # or discordant sampled heights) in which case it is clamped to
+        # the height of its parent.
+        for nidx in sorted(hmap, reverse=True):
+            parent = mcc[nidx].up
+            if parent and hmap[nidx] > hmap[parent._idx]:
+                hmap[nidx] = hmap[parent._idx]
+        return mcc.set_node_data("height", hmap)
+
+
+def mcc_from_file(
+    path: Union[str, Path],
+    burnin: Union[int, float] = 0,
+    score: str = "product",
+    node_heights: Optional[str] = "median",
+    hpd: float = 0.95,
+    **kwargs,
+) -> ToyTree:
+    """Return a maximum clade credibility (MCC) tree from a tree file.
+
+    The MCC tree is the sampled tree with the maximum product (or sum)
+    of the credibilities of its clades, where credibility is the
+    proportion of trees in which a rooted clade occurs. Trees are
+    streamed from the file in multiple passes so that they are never
+    all held in memory. The returned tree is annotated with clade
+    'support' and, as in TreeAnnotator, summaries of the heights of
+    each clade across trees: 'height_mean', 'height_median',
+    'height_std', 'height_hpd_min' and 'height_hpd_max'.
+
+    Parameters
+    ----------
+    path: str or Path
+        A file containing newick or NEXUS trees, usually a posterior
+        sample of rooted (ultrametric) trees.
+    burnin: int or float
+        Number of trees to skip from the start of the file, or if a
+        float < 1, the proportion of trees to skip.
+    score: str
+        "product" (default) or "sum" of clade credibilities.
+    node_heights: str or None
+        Set internal Node heights to the "median" (default) or "mean"
+        height of each clade across trees, or None to keep the heights
+        of the sampled MCC tree.
+    hpd: float
+        Proportion of node heights in the HPD interval. Default=0.95.
+    **kwargs:
+        Additional args passed to the newick parser.
+
+    Examples
+    --------
+    >>> mcc = toytree.infer.mcc_from_file("posterior.trees", burnin=0.1)
+    >>> mcc.get_node_data(["support", "height_hpd_min", "height_hpd_max"])
+    """
+    tool = MaximumCladeCredibilityTree(
+        path=path,
+        burnin=burnin,
+        score=score,
+        node_heights=node_heights,
+        hpd=hpd,
+        **kwargs,
+    )
+    return tool.run()
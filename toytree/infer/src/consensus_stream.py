@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+"""Streaming consensus tree construction from a file of trees.
+
+Trees are parsed and visited one at a time from a newick or NEXUS
+file and only the running summary statistics of each observed clade
+are stored, such that peak memory scales with the number of unique
+clades rather than the number of trees.
+"""
+
+from typing import Dict, Optional, Iterator, Union
+from pathlib import Path
+import numpy as np
+from toytree.core.tree import ToyTree
+from toytree.infer.src.consensus import ConsensusTree, RunningStats, _iter_tree_clades
+
+__all__ = ["ConsensusTreeStream", "consensus_from_file"]
+
+
+class ConsensusTreeStream(ConsensusTree):
+    """An extended majority rule consensus built from a tree file.
+
+    Trees are parsed and visited one at a time from a newick or NEXUS
+    file, and only the counts and running summary statistics (count,
+    mean, std, min, max; see `RunningStats`) of the 'dist' and
+    'height' of each clade are stored. Peak memory thus depends on
+    the number of unique clades, not the number of trees. Median
+    features are not available on the returned tree.
+
+    Parameters
+    ----------
+    path: str or Path
+        A file containing newick or NEXUS trees.
+    burnin: int or float
+        Number of trees to skip from the start of the file. If a float
+        < 1 then this proportion of trees is skipped, which requires
+        a first quick pass over the file to count trees.
+    majority_rule_min: float
+        Cut-off below which clades are collapsed into polytomies.
+    ultrametric: bool or None
+        See `ConsensusTree`. If None this is inferred while streaming.
+    **kwargs:
+        Additional args passed to the newick parser.
+    """
+    def __init__(
+        self,
+        path: Union[str, Path],
+        burnin: Union[int, float] = 0,
+        majority_rule_min: float = 0.0,
+        ultrametric: Optional[bool] = None,
+        **kwargs,
+    ):
+        self.path = path
+        self.best_tree = None
+        self.majority_rule_min = majority_rule_min
+        self.ultrametric = ultrametric
+        self.kwargs = kwargs
+        self.burnin = self._get_burnin_ntrees(burnin)
+        self.ntrees = 0
+
+    def _get_burnin_ntrees(self, burnin: Union[int, float]) -> int:
+        """Return burnin as a number of trees."""
+        if isinstance(burnin, float) and (0 < burnin < 1):
+            # deferred import b/c toytree.io imports MultiTree
+            from toytree.io.src.parse import iter_newicks_from_file
+            ntotal = sum(1 for _ in iter_newicks_from_file(self.path))
+            return int(burnin * ntotal)
+        return int(burnin)
+
+    def _iter_trees(self) -> Iterator[ToyTree]:
+        """Yield trees from the file after skipping burnin."""
+        # deferred import b/c toytree.io imports MultiTree
+        from toytree.io.src.parse import iter_trees_from_file
+        itrees = iter_trees_from_file(self.path, **self.kwargs)
+        for tidx, tree in enumerate(itrees):
+            if tidx >= self.burnin:
+                yield tree
+
+    def _get_all_clade_freqs(self) -> Dict:
+        """Return a dict of {clades: features} streamed from file.
+
+        Same as `ConsensusTree._get_all_clade_freqs` except that
+        dist and height values are stored as RunningStats objects.
+        """
+        clades = {}
+        root = [RunningStats(), RunningStats()]
+        aligned = True
+        for tree in self._iter_trees():
+            self.ntrees += 1
+            for clade, dist, height in _iter_tree_clades(tree):
+                if clade not in clades:
+                    clades[clade] = [0, RunningStats(), RunningStats()]
+                clades[clade][0] += 1
+                clades[clade][1].update(dist)
+                clades[clade][2].update(height)
+            root[0].update(tree.treenode.dist)
+            root[1].update(tree.treenode.height)
+
+            # same test as MultiTree.all_tree_tips_aligned
+            if aligned and (self.ultrametric is None):
+                heights = [i.height for i in tree]
+                aligned = np.allclose(heights, 0, rtol=1e-5, atol=1e-5)
+
+        if not self.ntrees:
+            raise ValueError(f"no trees found in {self.path} after burnin.")
+        if self.ultrametric is None:
+            self.ultrametric = aligned
+
+        # convert counts to proportions and sort high->low support
+        for clade in clades:
+            clades[clade][0] /= self.ntrees
+        sort_clades = sorted(clades, key=lambda x: clades[x][0], reverse=True)
+
+        # add the full (all samples) clade to get stats for it.
+        all_tips = max(clades, key=len) | frozenset(tree.get_tip_labels())
+        clades[all_tips] = (1.0, *root)
+        sort_clades = [all_tips] + [i for i in sort_clades if i != all_tips]
+        return {i: clades[i] for i in sort_clades}
+
+
+def consensus_from_file(
+    path: Union[str, Path],
+    burnin: Union[int, float] = 0,
+    min_freq: float = 0.0,
+    ultrametric: Optional[bool] = None,
+    **kwargs,
+) -> ToyTree:
+    """Return an extended majority rule consensus tree from a tree file.
+
+    Trees are streamed from the file once, accumulating clade counts
+    and running summary statistics of 'dist' and 'height' values using
+    Welford's algorithm, and a consensus tree is built at the end. This
+    returns the same tree as `MultiTree.get_consensus_tree`, but peak
+    memory does not depend on the number of trees in the file. Node
+    features include 'support', 'dist', and the min, max, mean and
+    std of 'dist' and 'height' (medians are not computed).
+
+    Parameters
+    ----------
+    path: str or Path
+        A file containing newick or NEXUS trees.
+    burnin: int or float
+        Number of trees to skip from the start of the file, or if a
+        float < 1, the proportion of trees to skip.
+    min_freq: float
+        Cut-off below which clades are collapsed in the majority
+        rule consensus tree. This is a proportion (e.g., 0.5 means
+        50%). Same as `majority_rule_min` in `get_consensus_tree`.
+    ultrametric: bool or None
+        See `MultiTree.get_consensus_tree`.
+    **kwargs:
+        Additional args passed to the newick parser.
+
+    Examples
+    --------
+    >>> ctree = toytree.infer.consensus_from_file(
+    >>>     "posterior.trees", burnin=0.1, min_freq=0.5)
+    """
+    cons = ConsensusTreeStream(
+        path=path,
+        burnin=burnin,
+        majority_rule_min=min_freq,
+        ultrametric=ultrametric,
+        **kwargs,
+    )
+    return cons.run()
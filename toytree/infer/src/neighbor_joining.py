@@ -11,7 +11,11 @@ import pandas as pd
 import toytree
 
 
-def infer_neighbor_joining_tree(data: pd.DataFrame) -> toytree.ToyTree:
+def infer_neighbor_joining_tree(
+    data: pd.DataFrame,
+    bionj: bool = False,
+    rapid: bool = False,
+) -> toytree.ToyTree:
     """Return a ToyTree inferred by neighbor-joining from a distance matrix.
 
     Neighbor-joining is a clustering algorithm for building trees from
@@ -23,50 +27,56 @@ def infer_neighbor_joining_tree(data: pd.DataFrame) -> toytree.ToyTree:
     ----------
     data: pd.DataFrame
         A symmetric DataFrame with distances measured between samples.
+    bionj: bool
+        If True the BIONJ variant is used, in which the distances of a
+        new Node to others are weighted by the variances of the joined
+        distances (Gascuel 1997), rather than an equal average.
+    rapid: bool
+        If True the pair to join in each iteration is found using the
+        RapidNJ search (Simonsen et al. 2008), which scans rows of
+        distances in sorted order and skips all entries that cannot be
+        smaller than the current best. This returns the same tree
+        (except among tied pairs) much faster for large matrices, at
+        the cost of storing a sorted copy of the matrix.
 
     Example
     -------
-    >>> ...
+    >>> dists = toytree.rtree.unittree(10, seed=123).distance.get_tip_distance_matrix(df=True)
+    >>> tree = toytree.infer.infer_neighbor_joining_tree(dists, bionj=True)
     """
-    # store a copy of dataframe as an array that will be modified.
-    arr = np.array(data).astype(float)
-
-    # dict to store Nodes, starting with tips.
-    nodes = {i: toytree.Node(name=i) for i in data.index}
+    # list to store Nodes in the order of rows of arr, starting with tips.
+    nodes = [toytree.Node(name=i) for i in data.index]
 
     # iterate generator function to get next pair of Nodes to join.
-    for i, j, v_i, v_j in iter_nj_algorithm(arr):
-
-        # get ordered Node names from the nodes dict.
-        names = list(nodes.keys())
-        # print(f"{names[i]}\t{names[j]}\t{v_i:.3f}\t{v_j:.3f}")
-
-        # get Nodes with i, j names and pop from dict
-        node_i = nodes.pop(names[i])
-        node_j = nodes.pop(names[j])
-
-        # create new ancestral Node, store it in nodes, and connect.
-        if nodes:
-            new_name = f"{node_i.name}-{node_j.name}"
-            node_a = toytree.Node(name=new_name)
-            nodes[new_name] = node_a
-
-            # connect i and j to it with edge lengths v_i and v_j
-            node_i._dist = v_i
+    for i, j, v_i, v_j in iter_nj_algorithm(data, bionj=bionj, rapid=rapid):
+        node_i = nodes[i]
+        node_j = nodes[j]
+        node_i._dist = v_i
+
+        # create new ancestral Node, store it in row i, and move the
+        # Node in the last row to row j, matching the array.
+        if len(nodes) > 2:
+            node_a = toytree.Node()
             node_j._dist = v_j
             node_a._add_child(node_i)
             node_a._add_child(node_j)
+            nodes[i] = node_a
+            nodes[j] = nodes[-1]
+            nodes.pop()
 
         # connect final pair of Nodes
         else:
-            node_i._dist = v_i
             node_j._add_child(node_i)
 
     # return final ancestor Node as root of a ToyTree
     return toytree.ToyTree(node_j)
 
 
-def iter_nj_algorithm(arr: ArrayLike) -> Iterator[Tuple[int, int, float, float]]:
+def iter_nj_algorithm(
+    arr: ArrayLike,
+    bionj: bool = False,
+    rapid: bool = False,
+) -> Iterator[Tuple[int, int, float, float]]:
     """Generator function to yield node indices and branch lengths.
 
     Each iteration of the neighbor-joining algorithm finds the pair
@@ -74,43 +84,194 @@ def iter_nj_algorithm(arr: ArrayLike) -> Iterator[Tuple[int, int, float, float]]
     samples. This generator yields the indices (i, j) of the pair given
     an input 2-D distance array, and the branch lengths (v_i, v_j) of
     each of these to their parent node.
-    """
-    # iterate and reduce matrix until all Nodes are joined
-    while 1:
-
-        # get neighbor values (u_i)
-        uvals = arr.sum(axis=0) / (arr.shape[0] - 2)
 
-        # get c_arr as d_ij - u_i - u_j
-        c_arr = arr - uvals - np.expand_dims(uvals, 1)
-
-        # mask diagonal and get (i,j) index of min off-diagonal value
-        mask = np.ones(c_arr.shape, dtype=bool)
-        np.fill_diagonal(mask, False)
-        idxs, jdxs = np.where(c_arr == c_arr[mask].min())
-        i = idxs[0]
-        j = jdxs[0]
+    The input is copied once on entry, and the copy is then updated
+    in place rather than copied each iteration. After each yield the
+    new Node replaces row i (where i < j), and the last active row is
+    moved into row j, such that the active rows are always the first
+    m rows of the array. The final yield is the last pair of Nodes,
+    where j is the most recently joined Node. Row sums are updated
+    incrementally, and the min of Q is found in chunks of rows to
+    limit temporary memory.
+    """
+    arr = np.array(arr, dtype=float)
+    nrows = arr.shape[0]
+    rsums = arr.sum(axis=1)
+    var = arr.copy() if bionj else None
+    rows = _SortedRows(arr) if rapid else None
+
+    # iterate and reduce active rows until all Nodes are joined
+    new = 1
+    for nrows in range(nrows, 2, -1):
+
+        # get neighbor values (u_i) and the pair (i, j) with min Q
+        uvals = rsums[:nrows] / (nrows - 2)
+        if rows is None:
+            i, j = _get_min_q_pair(arr, uvals)
+        else:
+            i, j = rows.get_min_q_pair(uvals)
 
         # get branch lengths from i,j to new internal Node
-        v_i = 0.5 * arr[i, j] + 0.5 * (uvals[i] - uvals[j])
-        v_j = 0.5 * arr[i, j] + 0.5 * (uvals[j] - uvals[i])
+        dij = arr[i, j]
+        v_i = 0.5 * dij + 0.5 * (uvals[i] - uvals[j])
+        v_j = 0.5 * dij + 0.5 * (uvals[j] - uvals[i])
 
         # yield the new Node info (i, j, v_i, v_j)
         yield i, j, v_i, v_j
 
-        # update arr to remove i and j and insert ij ancestor dists.
-        new_dim = arr.shape[0] - 1
-        new_arr = np.zeros(shape=(new_dim, new_dim))
-        mask = np.ones(arr.shape[0], dtype=bool)
-        mask[[i, j]] = False
-        new_arr[:new_dim - 1, :][:, :new_dim - 1] = arr[mask, :][:, mask]
-        new_arr[-1, :-1] = new_arr[:-1, -1] = (arr[i] + arr[j] - arr[i, j])[mask] / 2.
-        arr = new_arr
-
-        # if new arr size is 2 yield final pair and end.
-        if new_dim == 2:
-            yield 0, 1, arr[0, 1], arr[0, 1]
-            break
+        # get dists to ij ancestor as an average (NJ) or a weighted
+        # average by variance of the joined distances (BIONJ).
+        d_i = arr[i, :nrows]
+        d_j = arr[j, :nrows]
+        if bionj:
+            lam = 0.5
+            if var[i, j]:
+                diff = var[j, :nrows].sum() - var[i, :nrows].sum()
+                lam = min(1., max(0., 0.5 + diff / (2 * (nrows - 2) * var[i, j])))
+            dists = lam * (d_i - v_i) + (1 - lam) * (d_j - v_j)
+            varis = lam * var[i, :nrows] + (1 - lam) * var[j, :nrows] - lam * (1 - lam) * var[i, j]
+            varis[[i, j]] = 0
+            var[i, :nrows] = var[:nrows, i] = varis
+        else:
+            dists = 0.5 * (d_i + d_j - dij)
+        dists[[i, j]] = 0
+
+        # update row sums and store ancestor in row i
+        rsums[:nrows] += dists - d_i - d_j
+        rsums[i] = dists.sum()
+        arr[i, :nrows] = arr[:nrows, i] = dists
+        if rows is not None:
+            rows.set_row(i, j, nrows)
+
+        # move the last active row into row j
+        last = nrows - 1
+        if j != last:
+            arr[j, :last] = arr[last, :last]
+            arr[:last, j] = arr[:last, last]
+            arr[j, j] = 0
+            rsums[j] = rsums[last]
+            if bionj:
+                var[j, :last] = var[last, :last]
+                var[:last, j] = var[:last, last]
+                var[j, j] = 0
+            if rows is not None:
+                rows.move_row(last, j, last)
+        new = i
+
+    # yield final pair
+    yield 1 - new, new, arr[0, 1], arr[0, 1]
+
+
+def _get_min_q_pair(arr: np.ndarray, uvals: np.ndarray) -> Tuple[int, int]:
+    """Return (i, j) with i < j of the min Q = d_ij - u_i - u_j.
+
+    Q is computed for chunks of rows of the first m rows of arr,
+    where m is the length of uvals, and the first min is returned.
+    """
+    nrows = uvals.size
+    chunk = max(1, 2 ** 20 // nrows)
+    best = np.inf
+    for start in range(0, nrows, chunk):
+        stop = min(start + chunk, nrows)
+        qarr = arr[start:stop, :nrows] - uvals[start:stop, None]
+        qarr -= uvals
+        qarr[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        idx = qarr.argmin()
+        if qarr.flat[idx] < best:
+            best = qarr.flat[idx]
+            i, j = start + idx // nrows, idx % nrows
+    return (i, j) if i < j else (j, i)
+
+
+class _SortedRows:
+    """Rows of a distance matrix sorted by distance for RapidNJ.
+
+    The sorted distances of each active row are stored with the ids
+    of the Nodes in each column, such that the entries of Nodes that
+    have been joined can be skipped. The rows of a new Node are only
+    sorted when it is created, and all rows are re-sorted when the
+    number of active rows is halved to remove inactive entries.
+    """
+    def __init__(self, arr: np.ndarray):
+        nrows = arr.shape[0]
+        self.arr = arr
+        self.ids = np.arange(nrows)
+        """: id of the Node in each row."""
+        self.rows = np.full(2 * nrows, -1)
+        """: row of each Node id, or -1 if inactive (incl. index -1)."""
+        self.rows[:nrows] = self.ids
+        self.next_id = nrows
+        self.dists = np.full((nrows, max(1, nrows - 1)), np.inf)
+        self.cols = np.full(self.dists.shape, -1, dtype=np.int32)
+        self.nsorted = 0
+        self._sort_rows(nrows)
+
+    def _sort_rows(self, nrows: int) -> None:
+        """Sort the first nrows rows of arr, excluding the diagonal."""
+        chunk = max(1, 2 ** 20 // nrows)
+        for start in range(0, nrows, chunk):
+            stop = min(start + chunk, nrows)
+            block = self.arr[start:stop, :nrows].copy()
+            block[np.arange(stop - start), np.arange(start, stop)] = np.inf
+            order = np.argsort(block, axis=1)[:, :nrows - 1]
+            self.dists[start:stop, :nrows - 1] = np.take_along_axis(block, order, axis=1)
+            self.dists[start:stop, nrows - 1:] = np.inf
+            self.cols[start:stop, :nrows - 1] = self.ids[order]
+            self.cols[start:stop, nrows - 1:] = -1
+        self.nsorted = nrows
+
+    def set_row(self, i: int, j: int, nrows: int) -> None:
+        """Set row i to a new Node joined from the Nodes in rows i, j."""
+        self.rows[self.ids[[i, j]]] = -1
+        self.ids[i] = self.next_id
+        self.rows[self.next_id] = i
+        self.next_id += 1
+        dists = self.arr[i, :nrows]
+        order = np.argsort(dists)
+        order = order[(order != i) & (order != j)]
+        self.dists[i, :order.size] = dists[order]
+        self.dists[i, order.size:] = np.inf
+        self.cols[i, :order.size] = self.ids[order]
+        self.cols[i, order.size:] = -1
+
+    def move_row(self, src: int, dst: int, nrows: int) -> None:
+        """Move row src to row dst, and re-sort rows if many are inactive."""
+        self.dists[dst] = self.dists[src]
+        self.cols[dst] = self.cols[src]
+        self.ids[dst] = self.ids[src]
+        self.rows[self.ids[dst]] = dst
+        if nrows < self.nsorted // 2:
+            self._sort_rows(nrows)
+
+    def get_min_q_pair(self, uvals: np.ndarray) -> Tuple[int, int]:
+        """Return (i, j) with i < j of the min Q = d_ij - u_i - u_j.
+
+        Sorted rows are scanned in windows of doubling size, and a row
+        is no longer scanned once the lower bound on Q of its next
+        entry, d_ik - u_i - max(u), is not less than the best Q.
+        """
+        umax = uvals.max()
+        nrows = uvals.size
+        rows = np.arange(nrows)
+        best = np.inf
+        start, stop = 0, 8
+        width = self.dists.shape[1]
+        while rows.size:
+            stop = min(stop, width)
+            cols = self.rows[self.cols[rows, start:stop]]
+            qarr = self.dists[rows, start:stop] - uvals[rows, None]
+            qarr -= uvals[cols]
+            qarr[cols < 0] = np.inf
+            idx = qarr.argmin()
+            if qarr.flat[idx] < best:
+                best = qarr.flat[idx]
+                i, j = rows[idx // qarr.shape[1]], cols.flat[idx]
+            if stop == width:
+                break
+            bound = self.dists[rows, stop - 1] - uvals[rows] - umax
+            rows = rows[bound < best]
+            start, stop = stop, 2 * stop
+        return (i, j) if i < j else (j, i)
 
 
 if __name__ == "__main__":
@@ -19,47 +19,53 @@ Example
 # infer a hierarchical tree by clustering samples by distances
 >>> edges = scipy.cluster.hierarchy.average(dists)
 
-# draw the tree
+# build a tree from the linkage table and draw it
+>>> tree = _build_tree_from_scipy_dist_table(edges)
 >>> canvas, axes, mark = tree.draw()
 """
 
+from typing import Optional, Sequence
 import numpy as np
 import toytree
 
 
-def _build_tree_from_scipy_dist_table(table: np.ndarray):
-    """Return ToyTree from a scipy distance table.
-    
-    A greedy algorithm to implement hierarchical clustering of samples
-    based on distances in a distance table.
+def _build_tree_from_scipy_dist_table(
+    table: np.ndarray,
+    names: Optional[Sequence[str]] = None,
+    height_scale: float = 1.0,
+) -> toytree.ToyTree:
+    """Return ToyTree from a scipy linkage (distance) table.
+
+    Each row of the table (e.g., from `scipy.cluster.hierarchy.linkage`)
+    joins two clusters (ids < ntips are samples, and id ntips + row
+    is the cluster created by a row) at the distance in column 2.
+    Internal Nodes are placed at height = distance * height_scale, and
+    edge lengths are the differences in heights of parents and children.
+
+    Parameters
+    ----------
+    table: np.ndarray
+        A linkage matrix of shape (ntips - 1, 4).
+    names: Sequence[str] or None
+        Names of samples in id order. If None, ids are used as names.
+    height_scale: float
+        Multiplier of distances to get Node heights, e.g., 0.5 for
+        UPGMA, where the height of a Node is half the distance between
+        the clusters it joins.
     """
-    name_to_node = {}
-    
-    # iterate over rows of the table
+    ntips = table.shape[0] + 1
+    names = [str(i) for i in range(ntips)] if names is None else names
+    nodes = [toytree.Node(name=i) for i in names]
+    heights = [0.] * ntips
+
+    # iterate over rows of the table to join clusters
     for ridx in range(table.shape[0]):
-        
-        # internal name is row number + ntips
-        iname = int(ridx + table[-1, -1])
-        
-        # create new internal node
-        internal = toytree.Node(name=str(iname))
-        name_to_node[iname] = internal
-        
-        # iterate over child indices
-        for cidx in table[ridx, [0, 1]]:
-            cidx = int(cidx)
-            
-            # create child node if it doesn't exist
-            if cidx not in name_to_node:
-                child = toytree.Node(name=str(cidx))
-                name_to_node[cidx] = child
-            else:
-                child = name_to_node[cidx]
-                
-            # set distance
-            child.dist = table[ridx, 2]
-            
-            # connect to parent
-            child.up = internal
-            internal.children.append(child)
-    return toytree.ToyTree(internal)
+        internal = toytree.Node()
+        height = table[ridx, 2] * height_scale
+        for cidx in table[ridx, [0, 1]].astype(int):
+            child = nodes[cidx]
+            child._dist = height - heights[cidx]
+            internal._add_child(child)
+        nodes.append(internal)
+        heights.append(height)
+    return toytree.ToyTree(nodes[-1])
@@ -2,19 +2,13 @@
 
 """Calculate parsimony score of a tree topology given data.
 
-TODO
-----
-- support DNA IUPAC models where ambiguous states are automatically
-expanded.
-- support non DNA (arbitrary multistate including binary) data.
-- vectorize to be faster.
-
-JIT-compiled version
----------------------
-- jit supports sets now, but they are being deprecated to introduce
-a new numba typed.set, but which does not yet exist. So until it does
-its not really worth spending time on...
-- https://numba.pydata.org/numba-doc/dev/reference/pysupported.html#set
+Alignment columns are compressed into unique site patterns with
+weights (counts), and the state(s) of each tip in each pattern are
+encoded as a bitmask, e.g., A=0001, C=0010, R=A|G=0101. Fitch scores
+are then computed by a post-order traversal in which the states of
+each Node for all patterns are computed at once by bitwise AND/OR of
+the arrays of its children. Sankoff scores are computed similarly on
+(npatterns, nstates) arrays of min costs given a cost matrix.
 
 References
 ----------
@@ -26,6 +20,8 @@ References
 - Fitch, Walter M. 1971. “Toward Defining the Course of Evolution:
   Minimum Change for a Specific Tree Topology.” Systematic Biology 20
   (4): 406–16. https://doi.org/10.1093/sysbio/20.4.406.
+- Hartigan, J. A. 1973. “Minimum Mutation Fits to a Given Tree.”
+  Biometrics 29 (1): 53–65. https://doi.org/10.2307/2529676.
 
 - Sankoff (1975)
 - Felsenstein (2004)
@@ -34,18 +30,341 @@ References
 - https://telliott99.blogspot.com/2010/03/fitch-and-sankoff-algorithms-for.html
 """
 
-from typing import TypeVar, Optional
+from typing import TypeVar, Optional, Sequence, Dict, Tuple, Union, Mapping
+from loguru import logger
+import numpy as np
+import pandas as pd
 from numpy.typing import ArrayLike
+from toytree.utils import ToytreeError
 
+logger = logger.bind(name="toytree")
 ToyTree = TypeVar("ToyTree")
 
+__all__ = ["get_parsimony_score", "Parsimony"]
+
+DNA_STATES = ["A", "C", "G", "T"]
+IUPAC_BITS = {
+    "A": 1, "C": 2, "G": 4, "T": 8, "U": 8,
+    "R": 5, "Y": 10, "S": 6, "W": 9, "K": 12, "M": 3,
+    "B": 14, "D": 13, "H": 11, "V": 7,
+    "N": 15, "X": 15, "-": 15, "?": 15, ".": 15,
+}
+MISSING = {"-", "?", ""}
+
+
+def _get_dna_lookup() -> np.ndarray:
+    """Return a uint8 array mapping ASCII codes to DNA bitmasks."""
+    lookup = np.zeros(256, dtype=np.uint8)
+    for char, bits in IUPAC_BITS.items():
+        lookup[ord(char)] = lookup[ord(char.lower())] = bits
+    return lookup
+
+
+def _get_data_matrix(
+    data: Union[ArrayLike, pd.DataFrame, Mapping[str, Sequence]],
+    names: Optional[Sequence[str]] = None,
+) -> Tuple[Optional[list], np.ndarray]:
+    """Return tip names (or None) and a (ntips, nsites) array of data.
+
+    Data can be a DataFrame indexed by tip names, a dict mapping tip
+    names to sequences (strings or lists), or an array with rows in
+    the order of names (or in tip idx order if names is None).
+    """
+    if isinstance(data, pd.DataFrame):
+        return list(data.index), data.to_numpy()
+    if isinstance(data, Mapping):
+        names = list(data)
+        seqs = list(data.values())
+        if all(isinstance(i, str) for i in seqs):
+            lens = {len(i) for i in seqs}
+            if len(lens) > 1:
+                raise ToytreeError("sequences must all be the same length.")
+            arr = np.frombuffer("".join(seqs).encode(), dtype="S1")
+            return names, arr.reshape(len(seqs), -1)
+        return names, np.array(seqs)
+    arr = np.asarray(data)
+    if arr.ndim == 1:
+        arr = arr.reshape(-1, 1)
+    return (None if names is None else list(names)), arr
+
+
+def _encode_states(
+    arr: np.ndarray,
+    data_as_dna: bool,
+) -> Tuple[np.ndarray, list]:
+    """Return (ntips, nsites) array of state bitmasks and state labels.
+
+    String data are encoded as DNA with IUPAC ambiguity codes if
+    data_as_dna=True, else each unique value is a state and missing
+    values ("-", "?", nan) are encoded as all states.
+    """
+    if arr.dtype.kind == "O" and all(isinstance(i, str) for i in arr.flat):
+        arr = arr.astype(str)
+    if arr.dtype.kind in "SU" and data_as_dna:
+        if arr.dtype.kind == "U":
+            if arr.dtype.itemsize > 4:
+                raise ToytreeError("DNA data must be single characters per site.")
+            arr = arr.astype("S1")
+        codes = arr.view(np.uint8).reshape(arr.shape)
+        bits = _get_dna_lookup()[codes]
+        if not bits.all():
+            bad = sorted({chr(i) for i in np.unique(codes[bits == 0])})
+            raise ToytreeError(f"unrecognized DNA characters: {bad}")
+        return bits, list(DNA_STATES)
+
+    # generic discrete states: missing values are all states
+    if arr.dtype.kind == "f":
+        missing = np.isnan(arr)
+    elif arr.dtype.kind in "iub":
+        missing = np.zeros(arr.shape, dtype=bool)
+    else:
+        arr = arr.astype(str)
+        missing = np.isin(arr, list(MISSING)) | (arr == "nan") | (arr == "None")
+    states, inverse = np.unique(arr[~missing], return_inverse=True)
+    if states.size > 16:
+        raise ToytreeError("parsimony supports at most 16 discrete states.")
+    dtype = np.uint8 if states.size <= 8 else np.uint16
+    bits = np.full(arr.shape, (1 << states.size) - 1, dtype=dtype)
+    bits[~missing] = np.left_shift(1, inverse).astype(dtype)
+    return bits, states.tolist()
+
+
+def _compress_patterns(bits: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return unique site patterns, their weights, and the inverse index.
+
+    Columns that are constant (the same single state at every tip)
+    cost zero under any model and are removed, in which case their
+    inverse index is -1.
+    """
+    if bits.shape[1] == 0:
+        return bits, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    # view each column as a single opaque (void) value to unique columns
+    cols = np.ascontiguousarray(bits.T)
+    view = cols.view(np.dtype((np.void, cols.dtype.itemsize * cols.shape[1]))).ravel()
+    _, index, inverse, counts = np.unique(view, return_index=True, return_inverse=True, return_counts=True)
+    patterns = bits[:, index]
+    single = (patterns & (patterns - 1)) == 0
+    constant = (patterns == patterns[0]).all(axis=0) & single[0]
+    keep = np.flatnonzero(~constant)
+    remap = np.full(index.size, -1)
+    remap[keep] = np.arange(keep.size)
+    return np.ascontiguousarray(patterns[:, keep]), counts[keep], remap[inverse.ravel()]
+
+
+class Parsimony:
+    """Maximum parsimony scoring of trees given a data matrix.
+
+    The data are encoded and compressed once into weighted unique site
+    patterns, which can then be used to score many trees. Scores are
+    computed with the Fitch algorithm, or with the Sankoff algorithm
+    if a cost matrix is entered, using vectorized operations over all
+    patterns at each Node in a post-order traversal.
+
+    Note
+    ----
+    The parsimony score does not depend on the rooting of a tree, i.e.,
+    topologies re-rooted at any edge will yield the same score.
+
+    Parameters
+    ----------
+    data: pd.DataFrame, Dict[str, Sequence], or ArrayLike
+        A data matrix of shape (ntips, nsites) containing discrete
+        values for one or more sites (traits) for each tip. This can
+        be a DataFrame indexed by tip names, a dict mapping tip names
+        to sequences (e.g., strings), or an array with rows in the
+        order of `names`, or in tip idx order if names is None.
+    names: Sequence[str] or None
+        Names of the tips in the rows of data if data is an array.
+    cost_matrix: ArrayLike, pd.DataFrame, or None
+        A square matrix of the cost of a change from each state (row)
+        to each other state (column), in which case Sankoff parsimony
+        is used. If it is a DataFrame the row and column names are
+        used to order states, else they should be ordered as the
+        states sorted alphanumerically (e.g., 0, 1, 2 or A, C, G, T).
+        The diagonal must be zero. If None, Fitch parsimony is used,
+        where each change costs 1.
+    data_as_dna: bool
+        If True then string data are encoded as DNA, where IUPAC
+        ambiguity codes (e.g., RWMYSK) represent sets of bases (e.g.,
+        W -> {A, T}) and N, -, ? represent any base.
+
+    Examples
+    ---------
+    >>> tree = toytree.rtree.unittree(20, treeheight=1, seed=123)
+    >>> seqs = {i: "".join(np.random.choice(list("ACGT"), 100)) for i in tree.get_tip_labels()}
+    >>> tool = Parsimony(seqs)
+    >>> tool.get_score(tree)
+    """
+    def __init__(
+        self,
+        data: Union[ArrayLike, pd.DataFrame, Mapping[str, Sequence]],
+        names: Optional[Sequence[str]] = None,
+        cost_matrix: Optional[Union[ArrayLike, pd.DataFrame]] = None,
+        data_as_dna: bool = True,
+    ):
+        self.names, arr = _get_data_matrix(data, names)
+        """: names of tips in the rows of the data, or None for idx order."""
+        if self.names is not None and len(self.names) != arr.shape[0]:
+            raise ToytreeError("names must be the same length as rows of data.")
+        bits, self.states = _encode_states(arr, data_as_dna)
+        """: the state labels represented by each bit, in bit order."""
+        self.patterns, self.weights, self.site_index = _compress_patterns(bits)
+        """: (ntips, npatterns) state bitmasks, counts, and pattern of each site (-1 if constant)."""
+        self.cost_matrix = self._get_cost_matrix(cost_matrix)
+        """: (nstates, nstates) cost matrix, or None for Fitch."""
+        self._tip_costs = self._get_tip_costs()
+        """: index of each tip bitmask and min costs given each, or None for Fitch."""
+        logger.debug(
+            f"compressed {arr.shape[1]} sites into "
+            f"{self.patterns.shape[1]} variable site patterns")
+
+    def __repr__(self) -> str:
+        return (
+            f"<toytree.Parsimony ntips={self.patterns.shape[0]} "
+            f"npatterns={self.patterns.shape[1]} nstates={len(self.states)}>")
+
+    def _get_cost_matrix(self, cost_matrix) -> Optional[np.ndarray]:
+        """Return cost matrix as a float array ordered by states."""
+        if cost_matrix is None:
+            return None
+        if isinstance(cost_matrix, pd.DataFrame):
+            labels = [str(i) for i in self.states]
+            cost_matrix = cost_matrix.rename(index=str, columns=str).loc[labels, labels]
+        costs = np.asarray(cost_matrix, dtype=float)
+        if costs.shape != (len(self.states), len(self.states)):
+            raise ToytreeError(
+                f"cost_matrix must be shape ({len(self.states)}, {len(self.states)}) "
+                f"for states {self.states}.")
+        if np.any(np.diag(costs) != 0):
+            raise ToytreeError("cost_matrix diagonal must be zero.")
+        return costs
+
+    def _get_tip_costs(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Return the column of each tip bitmask and (nstates, ncolumns) costs.
+
+        The min cost of each parent state given the states allowed by
+        a tip bitmask is computed once, only for bitmasks that occur
+        in the patterns, and looked up by column in Sankoff scoring.
+        """
+        if self.cost_matrix is None:
+            return None
+        nstates = len(self.states)
+        masks = np.unique(self.patterns)
+        allowed = ((masks[:, None] >> np.arange(nstates)) & 1).astype(bool)
+        costs = np.where(allowed[:, None, :], self.cost_matrix[None, :, :], np.inf).min(axis=2).T
+        index = np.zeros(1 << nstates, dtype=np.intp)
+        index[masks] = np.arange(masks.size)
+        return index, costs
+
+    def _get_tip_rows(self, tree: ToyTree) -> np.ndarray:
+        """Return the data row of each tip Node in idx order."""
+        if self.names is None:
+            if tree.ntips != self.patterns.shape[0]:
+                raise ToytreeError("number of rows in data does not match ntips.")
+            return np.arange(tree.ntips)
+        rows = {j: i for (i, j) in enumerate(self.names)}
+        try:
+            return np.array([rows[i] for i in tree.get_tip_labels()])
+        except KeyError as exc:
+            raise ToytreeError(f"tip {exc} is not in the data.") from exc
+
+    def get_score(self, tree: ToyTree) -> Union[int, float]:
+        """Return the parsimony score of a tree.
+
+        Fitch scores (int) are computed by bitwise operations on the
+        states of all site patterns at once at each Node, or if a cost
+        matrix was entered, Sankoff scores (float) are computed.
+        """
+        score = np.dot(self.get_pattern_scores(tree), self.weights)
+        return int(score) if self.cost_matrix is None else float(score)
+
+    def get_pattern_scores(self, tree: ToyTree) -> np.ndarray:
+        """Return the parsimony score of each unique site pattern.
+
+        Scores of each site in the data are `scores[site_index]`,
+        where constant sites (site_index=-1) have score zero.
+        """
+        tips = [self.patterns[i] for i in self._get_tip_rows(tree)]
+        if self.cost_matrix is None:
+            return self._fitch_algorithm(tree, tips)
+        return self._sankoff_algorithm(tree, tips)
+
+    def _fitch_algorithm(self, tree: ToyTree, tips: Sequence[np.ndarray]) -> np.ndarray:
+        """Return Fitch score of each pattern by post-order traversal.
+
+        The states of each bifurcating Node are the intersection of
+        the states of its children, or their union (+1 change) if
+        they do not intersect. The states of a multifurcating Node
+        are those in the most children, costing (nchildren - count)
+        changes (Hartigan 1973), of which the binary case is the
+        special case above.
+        """
+        ntips = tree.ntips
+        states: Dict[int, np.ndarray] = {i: tips[i] for i in range(ntips)}
+
+        # changes are counted in uint8 and added to the total every
+        # 255 Nodes, since casting to a larger int is slower.
+        changes = np.zeros(tips[0].size, dtype=np.int64)
+        counter = np.zeros(tips[0].size, dtype=np.uint8)
+        for nidx, node in enumerate(tree[ntips:]):
+            kids = [states.pop(i._idx) for i in node._children]
+            if len(kids) == 2:
+                inter = kids[0] & kids[1]
+                empty = (inter == 0).view(np.uint8)
+                counter += empty
+                union = kids[0] | kids[1]
+                union *= empty
+                inter |= union
+                states[node._idx] = inter
+            else:
+                bits = np.arange(len(self.states))[:, None]
+                counts = np.zeros((bits.size, kids[0].size), dtype=np.int64)
+                for kid in kids:
+                    counts += (kid >> bits) & 1
+                most = counts.max(axis=0)
+                changes += len(kids) - most
+                best = (counts == most).astype(kids[0].dtype) << bits.astype(kids[0].dtype)
+                states[node._idx] = np.bitwise_or.reduce(best, axis=0)
+            if nidx % 255 == 254:
+                changes += counter
+                counter[:] = 0
+        return changes + counter
+
+    def _sankoff_algorithm(self, tree: ToyTree, tips: Sequence[np.ndarray]) -> np.ndarray:
+        """Return Sankoff score of each pattern by post-order traversal.
+
+        Each Node stores the (nstates, npatterns) min cost of its
+        subtree given each of its states. A Node's cost for state i is
+        the sum over children of min_j(costs[i, j] + child[j]), which
+        is computed as a running min over states j.
+        """
+        nstates = len(self.states)
+        ntips = tree.ntips
+        costs = self.cost_matrix
+        index, tipcosts = self._tip_costs
+
+        mins: Dict[int, np.ndarray] = {}
+        for node in tree[ntips:]:
+            total = np.zeros((nstates, tips[0].size))
+            for child in node._children:
+                if child._idx < ntips:
+                    total += tipcosts[:, index[tips[child._idx]]]
+                    continue
+                cmin = mins.pop(child._idx)
+                best = cmin[0][None, :] + costs[:, 0][:, None]
+                for jdx in range(1, nstates):
+                    np.minimum(best, cmin[jdx][None, :] + costs[:, jdx][:, None], out=best)
+                total += best
+            mins[node._idx] = total
+        return mins[tree.treenode._idx].min(axis=0)
+
 
 def get_parsimony_score(
     tree: ToyTree,
-    data: ArrayLike,
-    weights: Optional[ArrayLike],
+    data: Union[ArrayLike, pd.DataFrame, Mapping[str, Sequence]],
+    weights: Optional[ArrayLike] = None,
     data_as_dna: bool = True,
-):
+) -> Union[int, float]:
     """Return the parsimony score of a tree given a data matrix.
 
     The parsimony score is calculated by performing a post-order
@@ -59,13 +378,19 @@ def get_parsimony_score(
     counts as 1 (Fitch parsimony). If multiple states exist in the
     data matrix the sum of scores of each state is returned.
 
+    To score many trees given the same data, create a `Parsimony`
+    object once, which compresses the data into site patterns, and
+    call its `get_score` method for each tree.
+
     Parameters
     ----------
     tree: ToyTree
         A tree on which to calculate the parsimony score.
-    data: ArrayLike
+    data: pd.DataFrame, Dict[str, Sequence], or ArrayLike
         A data matrix of shape (ntips, ntraits) containing discrete
-        values for one or more traits for each tip Node in idxorder.
+        values for one or more traits for each tip Node, as a
+        DataFrame or dict with tip names as keys, or an array in
+        tip idx order.
     weights: None or ArrayLike
         The weights matrix must be square. If it is a dataframe then
         the row and column names will be used, else they should be
@@ -77,87 +402,13 @@ def get_parsimony_score(
         DNA IUPAC ambiguity codes (e.g., RWMYSK) will be expanded to a
         set of the two bases that they represent (e.g., W -> {A, T}).
 
-    Note
-    ----
-    This function uses numba jit-compilation for speed improvements.
-
-    References
-    ----------
-    - ...
-
     Examples
     --------
-    >>> ...
-    """
-    # get tree as an array of idxs in postorder traversal
-    traversal_order = np.array([i.idx for i in tree.traverse("postorder")])
-
-    # get data as a array of ints after expanding ambiguities
-    if data_as_dna:
-        pass
-    else:
-        pass
-
-    # calculate sum of scores and return
-    score = jit_compiled_fitch(
-        tree=traversal_order,
-        data=int_matrix,
-        weights=weights_matrix,
-    )
-    return score
-
-
-class Parsimony:
-    """Infer a phylogenetic tree by Maximum Parsimony.
-
-    Note
-    ----
-    The maximum parsimony algorithm does not infer rooted trees, i.e.,
-    topologies re-rooted at any arbitrary edge will yield the same
-    parsimony score.
-
-    Examples
-    ---------
-    >>> toytree.set_log_level("DEBUG")  # print verbose information
-    >>> data = ...
-    >>> starting_tree = ... distance tree.
-    >>> tool = Parsimony(data)
-    >>> tool.get_score(tree=tree, )
+    >>> tree = toytree.rtree.unittree(10, seed=123)
+    >>> data = np.random.default_rng(123).integers(0, 2, size=(10, 50))
+    >>> toytree.infer.get_parsimony_score(tree, data)
     """
-    def __init__(self, data: ...):
-        self.data = data
-
-    def get_score(self, tree):
-        """Return parsimony score"""
-
-
-    def _fitch_algorithm(self):
-        """Implement the fitch algorithm.
-
-        """
-
-    def _sankoff_algorithm(self):
-        """Implement the Sankoff algorithm.
-
-        The strength of the Sankoff algorithm is that it allows a
-        variety of cost matrices to be used. This is in principal
-        closer to ML, where we would define a substitution model.
-        Here the cost matrix is not inferred, but a priori defined
-        by the user.
-
-        """
-
-    def _tree_move(self, method: str):
-        """Return a ToyTree that is one 'move' from the current tree.
-
-        >>> NNITreeSearcher(scorer)
-        """
-        pass
-
-
-class Fitch:
-    """Implementation of the Fitch parsimony algorithm."""
-    pass
+    return Parsimony(data, cost_matrix=weights, data_as_dna=data_as_dna).get_score(tree)
 
 
 def _validate_against_bio():
@@ -167,8 +418,11 @@ def _validate_against_bio():
 
 if __name__ == "__main__":
 
-    # test parsimony score and inference against Bio
+    import time
     import toytree
-    tree = toytree.rtree.unittree(10, treeheight=1000, seed=123)
-    # data = tree.pcm.simulate_discrete_markov_data("seqs", states=4, reps=10)
-
+    TREE = toytree.rtree.unittree(1000, treeheight=1, seed=123)
+    RNG = np.random.default_rng(123)
+    SEQS = RNG.choice(np.array(list("ACGT"), dtype="S1"), size=(1000, 100_000))
+    TOOL = Parsimony(SEQS)
+    START = time.time()
+    print(TOOL, TOOL.get_score(TREE), f"{time.time() - START:.2f}s")
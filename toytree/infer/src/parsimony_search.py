@@ -0,0 +1,423 @@
+#!/usr/bin/env python
+
+"""Heuristic search for maximum parsimony trees.
+
+During a search the tree is stored as an unrooted binary adjacency
+array of shape (nnodes, 3), and the Fitch state sets on each side of
+every edge are cached as `down` (the subtree below a Node) and `up`
+(the rest of the tree above it) sets when oriented from a tip. The
+length of a tree made by regrafting a pruned subtree X onto an edge
+with sets D and U is the length of the pruned tree and subtree plus
+the (weighted) number of patterns in which X does not intersect the
+Fitch set of the edge (D & U, or D | U if they do not intersect).
+This lets all regraft positions of a pruned subtree be scored in a
+few vectorized operations without building any trees. After a move
+is accepted only the cached sets that it affected are re-computed.
+
+Moves follow the semantics of `move_spr` and `move_nni` in
+toytree.mod: a subtree is pruned and regrafted onto an edge that is
+not in the subtree or adjacent to its prune point, and an NNI is the
+special case of regrafting onto an edge at a distance of one.
+
+References
+----------
+- Goloboff, Pablo A. 1996. "Methods for Faster Parsimony Analysis."
+  Cladistics 12 (3): 199–220.
+- Swofford, David L., and Gary J. Olsen. 1990. "Phylogeny
+  Reconstruction." In Molecular Systematics, 411–501.
+"""
+
+from typing import Optional, Sequence, Tuple, Union, Mapping, TypeVar
+import time
+from loguru import logger
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike
+import toytree
+from toytree.utils import ToytreeError
+from toytree.infer.src.parsimony import Parsimony
+
+logger = logger.bind(name="toytree")
+ToyTree = TypeVar("ToyTree")
+
+__all__ = ["infer_parsimony_tree"]
+
+
+def _get_fitch_sets(set1: np.ndarray, set2: np.ndarray) -> np.ndarray:
+    """Return Fitch sets (intersection, or union if empty) of two arrays."""
+    # in-place ops are faster than np.where on large 2-D arrays
+    inter = set1 & set2
+    union = set1 | set2
+    union *= inter == 0
+    inter |= union
+    return inter
+
+
+class _ParsimonySearch:
+    """Hill-climbing search with cached Fitch state sets.
+
+    Node ids 0-(ntips-1) are tips in the order of rows of the data,
+    and ntips-(2*ntips-3) are internal Nodes. The state sets of each
+    Node are stored in rows of `sets`, where row v is the `down` set
+    of the subtree below Node v, and row v + nnodes is its `up` set,
+    when the tree is oriented from the tip `self.root`.
+    """
+    def __init__(self, tool: Parsimony, rng: np.random.Generator):
+        self.tool = tool
+        self.rng = rng
+        self.ntips = tool.patterns.shape[0]
+        self.nnodes = 2 * self.ntips - 2
+        self.root = 0
+        """: tip from which the tree is oriented for down/up sets."""
+        self.nbrs = np.full((self.nnodes, 3), -1, dtype=np.int64)
+        """: ids of neighbors of each Node (-1 for none)."""
+        self.parent = np.full(self.nnodes, -1, dtype=np.int64)
+        """: id of the Node above each Node when oriented from root."""
+        self.order = []
+        """: Node ids in the tree in pre-order from root."""
+        self.sets = np.zeros((2 * self.nnodes, tool.patterns.shape[1]), dtype=tool.patterns.dtype)
+        self.sets[:self.ntips] = tool.patterns
+        self.weights = tool.weights
+
+    def _get_side_index(self, node: np.ndarray, other: np.ndarray) -> np.ndarray:
+        """Return rows of `sets` for the side of edge (node, other) containing node."""
+        return np.where(self.parent[node] == other, node, self.nnodes + other)
+
+    def _set_order(self) -> None:
+        """Set parent ids and pre-order by traversal from root."""
+        nbrs = self.nbrs.tolist()
+        parent = [-1] * self.nnodes
+        order = [self.root]
+        for node in order:
+            for nbr in nbrs[node]:
+                if nbr != -1 and nbr != parent[node]:
+                    parent[nbr] = node
+                    order.append(nbr)
+        self.parent = np.array(parent, dtype=np.int64)
+        self.order = order
+
+    def _update_sets(self, changed: Sequence[int]) -> None:
+        """Re-compute down/up sets affected by connections of changed Nodes.
+
+        A down set is re-computed only if its Node changed or the
+        down set of one of its children changed, and an up set only
+        if its Node or parent changed or the sets it is computed from
+        changed. This limits updates to the paths affected by a move.
+        """
+        old_parent = self.parent
+        self._set_order()
+        moved = set(changed)
+        for node in np.flatnonzero(old_parent != self.parent).tolist():
+            moved.update((node, old_parent[node], self.parent[node]))
+        moved.discard(-1)
+
+        nbrs = self.nbrs.tolist()
+        parent = self.parent.tolist()
+        children = {
+            i: [j for j in nbrs[i] if j not in (-1, parent[i])]
+            for i in self.order[1:] if i >= self.ntips
+        }
+
+        # down sets in post-order
+        down_changed = set()
+        for node in reversed(self.order[1:]):
+            if node < self.ntips:
+                continue
+            left, right = children[node]
+            if node in moved or left in down_changed or right in down_changed:
+                new = _get_fitch_sets(self.sets[left], self.sets[right])
+                if not np.array_equal(new, self.sets[node]):
+                    self.sets[node] = new
+                    down_changed.add(node)
+
+        # up sets in pre-order, where the up set of the first Node
+        # below root is the root tip's data.
+        first = self.order[1]
+        self.sets[self.nnodes + first] = self.sets[self.root]
+        up_changed = {first}
+        for node in self.order[1:]:
+            if node < self.ntips:
+                continue
+            left, right = children[node]
+            for child, sister in ((left, right), (right, left)):
+                if (
+                    child in moved or node in moved
+                    or node in up_changed or sister in down_changed
+                ):
+                    new = _get_fitch_sets(self.sets[self.nnodes + node], self.sets[sister])
+                    if not np.array_equal(new, self.sets[self.nnodes + child]):
+                        self.sets[self.nnodes + child] = new
+                        up_changed.add(child)
+
+    def get_score(self) -> int:
+        """Return the Fitch score of the current tree from cached sets."""
+        nodes = np.array([i for i in self.order[1:] if i >= self.ntips])
+        kids = self.nbrs[nodes]
+        kids = kids[kids != self.parent[nodes][:, None]].reshape(-1, 2)
+        empty = (self.sets[kids[:, 0]] & self.sets[kids[:, 1]]) == 0
+        score = empty.sum(axis=0)
+        first = self.order[1]
+        score += (self.sets[first] & self.sets[self.root]) == 0
+        return int(np.dot(score, self.weights))
+
+    def _get_insertion_costs(self, subtree: np.ndarray, set1: np.ndarray, set2: np.ndarray) -> np.ndarray:
+        """Return cost of inserting subtree set on edges between set1 and set2."""
+        edge = _get_fitch_sets(set1, set2)
+        return np.dot(((edge & subtree) == 0).view(np.uint8), self.weights)
+
+    def _insert(self, node: int, new: int, nbr1: int, nbr2: int) -> None:
+        """Connect node to a new internal Node inserted on edge (nbr1, nbr2)."""
+        self.nbrs[new] = (node, nbr1, nbr2)
+        self.nbrs[nbr1][self.nbrs[nbr1] == nbr2] = new
+        self.nbrs[nbr2][self.nbrs[nbr2] == nbr1] = new
+
+    def set_tree_stepwise(self, order: Sequence[int]) -> None:
+        """Build a tree by stepwise addition of tips in a given order.
+
+        Each tip is inserted on the edge where it adds the fewest
+        changes, with ties broken at random.
+        """
+        self.nbrs[:] = -1
+        new = self.ntips
+        self.root = int(order[0])
+        self.nbrs[new] = order[:3]
+        for tip in order[:3]:
+            self.nbrs[tip, 0] = new
+        self._update_sets(range(self.nnodes))
+        for tip in order[3:]:
+            new += 1
+            nodes = np.array(self.order[1:])
+            costs = self._get_insertion_costs(
+                self.sets[tip], self.sets[nodes], self.sets[nodes + self.nnodes])
+            best = np.flatnonzero(costs == costs.min())
+            node = nodes[self.rng.choice(best)]
+            self.nbrs[tip, 0] = new
+            self._insert(tip, new, node, self.parent[node])
+            self._update_sets([tip, new, node, self.parent[node]])
+
+    def set_tree(self, tree: ToyTree) -> None:
+        """Set the current tree from a bifurcating ToyTree."""
+        tree = tree.unroot()
+        if not tree.is_bifurcating(include_root=False):
+            raise ToytreeError("starting tree must be bifurcating.")
+        rows = self.tool._get_tip_rows(tree)
+        ids = {}
+        for node in tree[:]:
+            ids[node] = rows[node._idx] if node.is_leaf() else self.ntips + node._idx - tree.ntips
+        self.nbrs[:] = -1
+        for node in tree[:]:
+            nbrs = [ids[i] for i in node._children]
+            if node._up is not None:
+                nbrs.append(ids[node._up])
+            self.nbrs[ids[node], :len(nbrs)] = nbrs
+        self.root = 0
+        self._update_sets(range(self.nnodes))
+
+    def _get_best_regraft(self, node: int, prune: int, radius: Optional[int]) -> Tuple[int, int, int]:
+        """Return (delta, nbr1, nbr2) for the best regraft of a subtree.
+
+        The subtree is the side of edge (node, prune) containing node,
+        and it is pruned by removing the internal Node `prune` and
+        joining its two other neighbors. Edges of the remaining tree
+        are visited in breadth-first order outward from the joined
+        edge (up to radius), computing the set on the side facing the
+        prune point of each from the set of its parent edge.
+        """
+        subtree = self.sets[self._get_side_index(node, prune)]
+        nbr1, nbr2 = self.nbrs[prune][self.nbrs[prune] != node]
+        set1 = self.sets[self._get_side_index(nbr1, prune)]
+        set2 = self.sets[self._get_side_index(nbr2, prune)]
+        cost0 = self._get_insertion_costs(subtree, set1, set2)
+        best = (0, nbr1, nbr2)
+
+        # frontier of edges (src, dst) with sets on the src side
+        src = np.array([prune, prune])
+        dst = np.array([nbr2, nbr1])
+        sets = np.stack([set1, set2])
+        dist = 0
+        while radius is None or dist < radius:
+            keep = dst >= self.ntips
+            if not keep.any():
+                break
+            src, dst, sets = src[keep], dst[keep], sets[keep]
+            nbrs = self.nbrs[dst]
+            nbrs = nbrs[nbrs != src[:, None]].reshape(-1, 2)
+            dst, src = nbrs.ravel(), np.repeat(dst, 2)
+            sister = nbrs[:, ::-1].ravel()
+            sets = _get_fitch_sets(
+                np.repeat(sets, 2, axis=0), self.sets[self._get_side_index(sister, src)])
+            costs = self._get_insertion_costs(
+                subtree, sets, self.sets[self._get_side_index(dst, src)])
+            idx = costs.argmin()
+            if costs[idx] - cost0 < best[0]:
+                best = (int(costs[idx] - cost0), src[idx], dst[idx])
+            dist += 1
+        return best
+
+    def search(self, radius: Optional[int], deadline: Optional[float]) -> int:
+        """Apply improving SPR moves until none are found or time expires.
+
+        Prune points are visited in random order each round, and the
+        best regraft of each pruned subtree is applied if it lowers
+        the score. Returns the number of moves applied.
+        """
+        nmoves = 0
+        improved = True
+        while improved:
+            improved = False
+            prunes = [
+                (i, j) for j in range(self.ntips, self.nnodes) for i in self.nbrs[j]
+            ]
+            for idx in self.rng.permutation(len(prunes)):
+                if deadline is not None and time.time() > deadline:
+                    return nmoves
+                node, prune = prunes[idx]
+                if node not in self.nbrs[prune]:
+                    continue
+                delta, nbr1, nbr2 = self._get_best_regraft(node, prune, radius)
+                if delta < 0:
+                    old1, old2 = self.nbrs[prune][self.nbrs[prune] != node]
+                    self.nbrs[old1][self.nbrs[old1] == prune] = old2
+                    self.nbrs[old2][self.nbrs[old2] == prune] = old1
+                    self._insert(node, prune, nbr1, nbr2)
+                    self._update_sets([node, prune, old1, old2, nbr1, nbr2])
+                    nmoves += 1
+                    improved = True
+        return nmoves
+
+    def get_tree(self, names: Sequence[str]) -> ToyTree:
+        """Return the current tree as an unrooted ToyTree."""
+        nodes = {i: toytree.Node(name=names[i] if i < self.ntips else "", dist=1.) for i in self.order}
+        parent = self.parent.tolist()
+        for node in self.order[2:]:
+            nodes[parent[node]]._add_child(nodes[node])
+        top = nodes[self.order[1]]
+        top._add_child(nodes[self.root])
+        return toytree.ToyTree(top)
+
+
+def infer_parsimony_tree(
+    data: Union[Parsimony, ArrayLike, pd.DataFrame, Mapping[str, Sequence]],
+    names: Optional[Sequence[str]] = None,
+    tree: Optional[ToyTree] = None,
+    method: str = "spr",
+    radius: Optional[int] = None,
+    nstarts: int = 1,
+    max_time: Optional[float] = None,
+    seed: Optional[int] = None,
+    data_as_dna: bool = True,
+) -> ToyTree:
+    """Return an unrooted ToyTree inferred by a maximum parsimony search.
+
+    A starting tree is built by random-addition (stepwise addition of
+    tips in a random order, each at the edge where it adds the fewest
+    changes), or is entered by the user, and is then improved by
+    hill-climbing with SPR or NNI moves until no move lowers the
+    Fitch parsimony score. Repeating the search from multiple random
+    starting trees (nstarts) makes it less likely to end on a local
+    optimum. The best tree found is returned.
+
+    Note
+    ----
+    The data must be associated with tip names (a DataFrame indexed
+    by names, a dict, an array with `names`, or a Parsimony object
+    created with names). Unnamed array data is matched to tips by
+    their idx order when scoring a tree, but the idx order of the
+    tips of an inferred tree is not known in advance, so the rows
+    could not be matched to its tips.
+
+    Parameters
+    ----------
+    data: Parsimony, pd.DataFrame, Dict[str, Sequence], or ArrayLike
+        A Parsimony object, or a data matrix of shape (ntips, nsites)
+        in any format accepted by Parsimony. A cost matrix is not
+        supported, only Fitch parsimony.
+    names: Sequence[str] or None
+        Names of the tips in the rows of data if data is an array.
+    tree: ToyTree or None
+        An optional bifurcating starting tree. If entered, the first
+        search starts from this tree instead of random addition.
+    method: str
+        "spr" to prune and regraft subtrees onto any edge (or within
+        `radius` edges of the prune point), or "nni" for nearest-
+        neighbor interchanges (SPR moves with radius=1).
+    radius: int or None
+        The max distance (in edges) of regraft positions from a prune
+        point for SPR moves. None searches all edges.
+    nstarts: int
+        Number of searches to run from random-addition trees.
+    max_time: float or None
+        Time budget in seconds. The search stops after the current
+        move when the budget is exceeded, and the best tree found so
+        far is returned.
+    seed: int or None
+        Seed for the random number generator.
+    data_as_dna: bool
+        If True then string data are encoded as DNA with IUPAC codes.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(50, seed=123)
+    >>> seqs = np.random.default_rng(123).choice(list("ACGT"), size=(50, 200))
+    >>> data = pd.DataFrame(seqs, index=tree.get_tip_labels())
+    >>> ptree = toytree.infer.infer_parsimony_tree(data, nstarts=5, seed=123)
+    >>> toytree.infer.get_parsimony_score(ptree, data)
+    """
+    if isinstance(data, Parsimony):
+        tool = data
+    else:
+        tool = Parsimony(data, names=names, data_as_dna=data_as_dna)
+    if tool.names is None:
+        raise ToytreeError(
+            "tree search requires tip names for the rows of data, e.g., "
+            "a DataFrame indexed by names, a dict, or an array with names.")
+    if tool.cost_matrix is not None:
+        raise ToytreeError("tree search is only supported for Fitch parsimony.")
+    if method == "nni":
+        radius = 1
+    elif method != "spr":
+        raise ValueError("method must be 'spr' or 'nni'.")
+    names = tool.names
+    if len(names) < 3:
+        raise ToytreeError("tree search requires at least 3 tips.")
+    if tree is not None and sorted(tree.get_tip_labels()) != sorted(names):
+        missing = sorted(set(names) - set(tree.get_tip_labels()))
+        extra = sorted(set(tree.get_tip_labels()) - set(names))
+        raise ToytreeError(
+            "starting tree tips must match the names in data: "
+            f"missing from tree={missing}, not in data={extra}.")
+
+    rng = np.random.default_rng(seed)
+    start = time.time()
+    deadline = None if max_time is None else start + max_time
+    best_score = np.inf
+    best_tree = None
+    for rep in range(max(nstarts, 1)):
+        search = _ParsimonySearch(tool, rng)
+        if rep == 0 and tree is not None:
+            search.set_tree(tree)
+        else:
+            search.set_tree_stepwise(rng.permutation(len(names)))
+        score0 = search.get_score()
+        nmoves = search.search(radius, deadline)
+        score = search.get_score()
+        logger.debug(
+            f"start {rep}: score {score0} -> {score} in {nmoves} moves "
+            f"({time.time() - start:.1f}s)")
+        if score < best_score:
+            best_score = score
+            best_tree = search.get_tree(names)
+        if deadline is not None and time.time() > deadline:
+            break
+    return best_tree
+
+
+if __name__ == "__main__":
+
+    toytree.set_log_level("DEBUG")
+    TREE = toytree.rtree.unittree(500, treeheight=1, seed=123)
+    RNG = np.random.default_rng(123)
+    SEQS = RNG.choice(list("ACGT"), size=(500, 1000))
+    DATA = pd.DataFrame(SEQS, index=TREE.get_tip_labels())
+    PTREE = infer_parsimony_tree(DATA, nstarts=1, max_time=300, seed=123)
+    print(PTREE, Parsimony(DATA).get_score(PTREE))
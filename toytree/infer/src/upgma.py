@@ -2,92 +2,152 @@
 
 """Infer a tree from a distance matrix using UPGMA clustering.
 
+UPGMA (average linkage) and WPGMA (weighted linkage) are implemented
+with the nearest-neighbor chain algorithm, which is O(n^2) in time
+and modifies a single copy of the distance matrix in place. This is
+possible because both linkages are reducible, such that clusters
+that are reciprocal nearest neighbors can be joined in any order to
+yield the same hierarchy as joining the closest pair each iteration.
+The result is returned as a scipy-compatible linkage matrix, from
+which a ToyTree is built.
+
+References
+----------
+- Murtagh, Fionn, and Pedro Contreras. 2012. "Algorithms for
+  Hierarchical Clustering: An Overview." WIREs Data Mining and
+  Knowledge Discovery 2 (1): 86–97.
+- Müllner, Daniel. 2011. "Modern Hierarchical, Agglomerative
+  Clustering Algorithms." arXiv:1109.2378.
 """
 
+from numpy.typing import ArrayLike
 import numpy as np
 import pandas as pd
 import toytree
+from toytree.infer.src.parse_tree_from_table import _build_tree_from_scipy_dist_table
 
 
-def infer_upgma_tree(data: pd.DataFrame) -> toytree.ToyTree:
+def infer_upgma_tree(data: pd.DataFrame, weighted: bool = False) -> toytree.ToyTree:
     """Return a ToyTree inferred by UPGMA from a distance matrix.
 
+    UPGMA clusters the closest pair of samples (or clusters) at each
+    iteration, and the distance of the new cluster to others is the
+    average distance among all of their samples. The tree is
+    ultrametric with the height of each internal Node equal to half
+    of the distance between the two clusters it joins.
+
     Parameters
     ----------
-    ...
+    data: pd.DataFrame
+        A symmetric DataFrame with distances measured between samples.
+    weighted: bool
+        If True the WPGMA method is used, in which the distance of a
+        new cluster to others is the unweighted average of the
+        distances of its two child clusters, regardless of their size.
 
     Examples
     --------
-    >>> ...
+    >>> tree = toytree.rtree.unittree(10, seed=123)
+    >>> dists = tree.distance.get_tip_distance_matrix(df=True)
+    >>> utree = toytree.infer.infer_upgma_tree(dists)
     """
-    # convert data to an array for faster processing.
-    arr = np.array(data, dtype=float)
+    table = get_upgma_linkage(data, weighted=weighted)
+    return _build_tree_from_scipy_dist_table(table, names=list(data.index), height_scale=0.5)
+
+
+def get_upgma_linkage(data: ArrayLike, weighted: bool = False) -> np.ndarray:
+    """Return a scipy-compatible linkage matrix from UPGMA clustering.
 
-    # store tip Nodes, and add ntips attribute.
-    nodes = {}
-    for name in data.index:
-        node = toytree.Node(name=name, dist=0)
-        node._ntips = 1
-        nodes[name] = node
-
-    # loop to cluster and reduce matrix until only 1 sample left.
-    while arr.shape[0] > 1:
-
-        # get ordered names from nodes dict
-        names = list(nodes.keys())
-
-        # get index (i,j) of minvalue on off-diagonal.
-        mask = np.ones(arr.shape, dtype=bool)
-        np.fill_diagonal(mask, False)
-        min_value = arr[mask].min()
-        idxs = np.where(arr == min_value)[0]
-
-        # create a new interior Node as ancestor of (i,j)
-        new_name = f"internal-{arr.shape[0]}"
-        new_node = toytree.Node(name=new_name, dist=0)
-        nodes[new_name] = new_node
-
-        # connect i,j to new Node with equal branch lengths
-        for idx in idxs:
-            name = names[idx]
-            node = nodes[name]
-            node._dist = (min_value / 2) - node._height
-            new_node._add_child(node)
-
-        # set height of new Node to be used by its parent to find dist.
-        new_node._height = node._height + node._dist
-
-        # count n leaves descended from new Node
-        new_node._ntips = sum(i._ntips for i in new_node._children)
-
-        # update the distance matrix to remove i,j and add new Node.
-        new_dim = arr.shape[0] - 1
-        new_arr = np.zeros(shape=(new_dim, new_dim))
-
-        # index of rows to keep
-        nidxs = [i for i in range(arr.shape[0]) if i not in idxs]
-
-        # # fill kept rows into the new_arr
-        new_arr[:new_dim - 1, :][:, :new_dim - 1] = arr[nidxs, :][:, nidxs]
-
-        # remove i,j from nodes, and get ntips of each.
-        nti = nodes.pop(names[idxs[0]])._ntips
-        ntj = nodes.pop(names[idxs[1]])._ntips
-
-        # get avg distance of new Node to every other Node.
-        diks = arr[idxs[0], nidxs]
-        djks = arr[idxs[1], nidxs]
-        wdiks = (nti / (nti + ntj)) * diks
-        wdjks = (ntj / (nti + ntj)) * djks
-        avg_dists = wdiks + wdjks
-        new_arr[-1, :-1] = avg_dists
-        new_arr[:-1, -1] = avg_dists
-
-        # advance internal node name counter
-        arr = new_arr
-
-    # return the top-level Node as a ToyTree
-    return toytree.ToyTree(nodes[new_name])
+    The returned array of shape (nsamples - 1, 4) is in the format
+    returned by `scipy.cluster.hierarchy.linkage` with method
+    'average' (or 'weighted' if weighted=True), where each row
+    records the two cluster ids that were joined, the distance
+    between them, and the number of samples in the new cluster,
+    which is given id nsamples + row. Rows are sorted by distance.
+
+    Parameters
+    ----------
+    data: ArrayLike
+        A square symmetric matrix of distances between samples.
+    weighted: bool
+        If True the WPGMA method is used, else UPGMA.
+
+    Examples
+    --------
+    >>> dists = toytree.rtree.unittree(10, seed=123).distance.get_tip_distance_matrix()
+    >>> table = toytree.infer.get_upgma_linkage(dists)
+    >>> tree = toytree.infer.infer_upgma_tree(pd.DataFrame(dists))
+    """
+    # a single copy of data is modified in place, with inf on the
+    # diagonal and in rows and columns of joined clusters.
+    arr = np.array(data, dtype=float)
+    nsamples = arr.shape[0]
+    if arr.shape != (nsamples, nsamples):
+        raise ValueError("data must be a square distance matrix.")
+    np.fill_diagonal(arr, np.inf)
+    sizes = np.ones(nsamples)
+
+    # each cluster is stored in the row of one of its samples.
+    merges = np.zeros((max(nsamples - 1, 0), 3))
+    chain = []
+    for ridx in range(nsamples - 1):
+
+        # extend the chain of nearest neighbors until the last two
+        # are reciprocal nearest neighbors, preferring the previous
+        # link on ties to avoid cycles.
+        if not chain:
+            chain.append(int(np.argmin(sizes == 0)))
+        while 1:
+            idx = chain[-1]
+            jdx = int(arr[idx].argmin())
+            if len(chain) > 1 and arr[idx, chain[-2]] <= arr[idx, jdx]:
+                jdx = chain[-2]
+                break
+            chain.append(jdx)
+        chain = chain[:-2]
+
+        # record the join and update distances to the new cluster in
+        # row idx, and remove row jdx.
+        merges[ridx] = idx, jdx, arr[idx, jdx]
+        if weighted:
+            dists = 0.5 * (arr[idx] + arr[jdx])
+        else:
+            dists = (sizes[idx] * arr[idx] + sizes[jdx] * arr[jdx]) / (sizes[idx] + sizes[jdx])
+        arr[idx] = arr[:, idx] = dists
+        arr[idx, idx] = np.inf
+        arr[jdx] = arr[:, jdx] = np.inf
+        sizes[idx] += sizes[jdx]
+        sizes[jdx] = 0
+    return _get_linkage_from_merges(merges, nsamples)
+
+
+def _get_linkage_from_merges(merges: np.ndarray, nsamples: int) -> np.ndarray:
+    """Return linkage matrix from (sample, sample, dist) rows of joins.
+
+    Joins are sorted by distance (stably) and the clusters containing
+    each pair of samples are found by union-find to assign cluster ids
+    in the scipy format.
+    """
+    merges = merges[np.argsort(merges[:, 2], kind="stable")]
+    parent = list(range(nsamples))
+    cluster = list(range(nsamples))
+    sizes = [1] * nsamples
+    table = np.zeros((merges.shape[0], 4))
+
+    def find(idx: int) -> int:
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+        return idx
+
+    for ridx, (idx, jdx, dist) in enumerate(merges):
+        idx, jdx = find(int(idx)), find(int(jdx))
+        ids = sorted((cluster[idx], cluster[jdx]))
+        parent[jdx] = idx
+        cluster[idx] = nsamples + ridx
+        sizes[idx] += sizes[jdx]
+        table[ridx] = ids[0], ids[1], dist, sizes[idx]
+    return table
 
 
 if __name__ == "__main__":
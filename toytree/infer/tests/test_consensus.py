@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+"""Test consensus tree functions
+
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+import toytree
+
+
+NEXUS = """\
+#NEXUS
+begin trees;
+    translate
+        1 a,
+        2 b,
+        3 c,
+        4 d
+        ;
+    tree t1 = [&R] ((1:1,2:1):1,(3:1,4:1):1);
+    tree t2 = [&R] ((1:1,3:1):1,(2:1,4:1):1);
+    tree t3 = [&R] ((1:1,2:1):1,(3:1,4:1):1);
+end;
+"""
+
+
+class TestConsensusFromFile(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "trees.nwk"
+        trees = [
+            toytree.rtree.unittree(10, seed=i % 5).mod.edges_multiplier(1 + i / 10)
+            for i in range(20)
+        ]
+        self.mtree = toytree.mtree(trees)
+        self.mtree.write(self.path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_consensus_from_file_matches_multitree(self):
+        for min_freq in (0.0, 0.5):
+            ctree1 = self.mtree.get_consensus_tree(majority_rule_min=min_freq)
+            ctree2 = toytree.infer.consensus_from_file(self.path, min_freq=min_freq)
+            self.assertEqual(ctree1.get_topology_id(), ctree2.get_topology_id())
+            for feat in ["support", "dist", "dist_std", "height_mean", "height_max"]:
+                data1 = ctree1.get_node_data(feat).sort_index()
+                data2 = ctree2.get_node_data(feat).sort_index()
+                self.assertTrue(np.allclose(data1, data2, atol=1e-8))
+
+    def test_consensus_from_file_burnin(self):
+        ctree1 = toytree.mtree(self.mtree.treelist[5:]).get_consensus_tree()
+        ctree2 = toytree.infer.consensus_from_file(self.path, burnin=5)
+        ctree3 = toytree.infer.consensus_from_file(self.path, burnin=0.25)
+        for ctree in (ctree2, ctree3):
+            self.assertEqual(ctree1.get_topology_id(), ctree.get_topology_id())
+            data1 = ctree1.get_node_data("support").sort_index()
+            data2 = ctree.get_node_data("support").sort_index()
+            self.assertTrue(np.allclose(data1, data2))
+
+    def test_consensus_from_nexus_file(self):
+        self.path.write_text(NEXUS)
+        ctree = toytree.infer.consensus_from_file(self.path)
+        self.assertEqual(ctree.write(), toytree.mtree(NEXUS).get_consensus_tree().write())
+
+
+class TestMCCFromFile(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "trees.nwk"
+        self.best = toytree.rtree.unittree(8, seed=123, treeheight=10)
+        trees = []
+        for i in range(30):
+            if i % 3:
+                tree = self.best.mod.edges_scale_to_root_height(10 + i / 10)
+            else:
+                tree = toytree.rtree.unittree(8, seed=i, treeheight=10)
+            trees.append(tree)
+        toytree.mtree(trees).write(self.path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_mcc_from_file_topology_and_support(self):
+        for score in ("product", "sum"):
+            mcc = toytree.infer.mcc_from_file(self.path, score=score)
+            self.assertEqual(mcc.get_topology_id(), self.best.get_topology_id())
+            self.assertAlmostEqual(mcc.treenode.support, 1.0)
+            for node in mcc[mcc.ntips:]:
+                self.assertGreaterEqual(node.support, 0.66)
+
+    def test_mcc_from_file_node_heights(self):
+        mcc = toytree.infer.mcc_from_file(self.path, node_heights="median")
+        for node in mcc[mcc.ntips:]:
+            self.assertAlmostEqual(node.height, node.height_median)
+            self.assertLessEqual(node.height_hpd_min, node.height_median)
+            self.assertGreaterEqual(node.height_hpd_max, node.height_median)
+
+
+if __name__ == "__main__":
+
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+"""Test neighbor-joining tree inference.
+
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+import toytree
+from toytree.infer.src.neighbor_joining import iter_nj_algorithm
+
+
+def _get_split_dists(tree):
+    """Return dict mapping each split (as set of tips) to its edge length."""
+    tree = tree.unroot()
+    tips = set(tree.get_tip_labels())
+    first = min(tips)
+    splits = {}
+    for node in tree[:-1]:
+        side = set(node.get_leaf_names())
+        side = tips - side if first in side else side
+        splits[frozenset(side)] = round(node.dist, 8)
+    return splits
+
+
+class TestNeighborJoining(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(123)
+        tree = toytree.rtree.rtree(30, seed=123)
+        self.tree = tree.set_node_data("dist", {i: rng.uniform(0.1, 1) for i in range(tree.nnodes)})
+        self.dists = self.tree.distance.get_tip_distance_matrix(df=True)
+
+    def test_additive_distances_recover_tree(self):
+        true = _get_split_dists(self.tree)
+        for bionj in (False, True):
+            for rapid in (False, True):
+                tree = toytree.infer.infer_neighbor_joining_tree(self.dists, bionj=bionj, rapid=rapid)
+                self.assertEqual(_get_split_dists(tree), true)
+
+    def test_rapid_matches_exact(self):
+        rng = np.random.default_rng(123)
+        for ntips in (4, 10, 50):
+            points = rng.random((ntips, 5))
+            data = np.sqrt(((points[:, None] - points[None]) ** 2).sum(axis=2))
+            dists = pd.DataFrame(data, index=[f"r{i}" for i in range(ntips)])
+            for bionj in (False, True):
+                tree1 = toytree.infer.infer_neighbor_joining_tree(dists, bionj=bionj)
+                tree2 = toytree.infer.infer_neighbor_joining_tree(dists, bionj=bionj, rapid=True)
+                self.assertEqual(_get_split_dists(tree1), _get_split_dists(tree2))
+
+    def test_input_array_not_modified(self):
+        arr = self.dists.to_numpy()
+        orig = arr.copy()
+        for bionj in (False, True):
+            for rapid in (False, True):
+                list(iter_nj_algorithm(arr, bionj=bionj, rapid=rapid))
+                self.assertTrue(np.array_equal(arr, orig))
+
+
+if __name__ == "__main__":
+
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+"""Test parsimony scores.
+
+"""
+
+import itertools
+import unittest
+import numpy as np
+import pandas as pd
+import toytree
+
+
+def _get_brute_force_score(tree, data, costs, bitsmap):
+    """Return min cost over all assignments of internal Node states."""
+    nstates = costs.shape[0]
+    total = 0
+    for col in data.T:
+        best = np.inf
+        for assign in itertools.product(range(nstates), repeat=tree.nnodes - tree.ntips):
+            states = dict(zip(range(tree.ntips, tree.nnodes), assign))
+            cost = 0
+            for node in tree[tree.ntips:]:
+                for child in node.children:
+                    if child.is_leaf():
+                        cost += min(costs[states[node.idx], i] for i in bitsmap[col[child.idx]])
+                    else:
+                        cost += costs[states[node.idx], states[child.idx]]
+            best = min(best, cost)
+        total += best
+    return total
+
+
+class TestParsimony(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(123)
+        self.bitsmap = {"A": [0], "C": [1], "G": [2], "T": [3], "R": [0, 2], "N": [0, 1, 2, 3]}
+        self.costs = np.array([[0, 2, 1, 2], [2, 0, 2, 1], [1, 2, 0, 2], [2, 1, 2, 0]], dtype=float)
+
+    def test_fitch_and_sankoff_match_brute_force(self):
+        for seed in range(8):
+            tree = toytree.rtree.rtree(6, seed=seed)
+            if seed % 2:
+                tree = tree.unroot()
+            if seed % 4 == 2:
+                tree = tree.mod.collapse_nodes(7)
+            data = self.rng.choice(list("ACGTRN"), size=(6, 4), p=[0.2, 0.2, 0.2, 0.2, 0.1, 0.1])
+            fitch = toytree.infer.get_parsimony_score(tree, data)
+            sankoff = toytree.infer.get_parsimony_score(tree, data, weights=self.costs)
+            unit = 1 - np.eye(4)
+            self.assertEqual(fitch, _get_brute_force_score(tree, data, unit, self.bitsmap))
+            self.assertEqual(sankoff, _get_brute_force_score(tree, data, self.costs, self.bitsmap))
+
+    def test_fitch_polytomies_match_brute_force(self):
+        unit = 1 - np.eye(4)
+        for seed in range(6):
+            tree = toytree.rtree.rtree(7, seed=seed)
+            tree = tree.mod.collapse_nodes(*self.rng.choice(range(7, 12), 2, replace=False).tolist())
+            data = self.rng.choice(list("ACGTRN"), size=(7, 4), p=[0.2, 0.2, 0.2, 0.2, 0.1, 0.1])
+            fitch = toytree.infer.get_parsimony_score(tree, data)
+            self.assertEqual(fitch, _get_brute_force_score(tree, data, unit, self.bitsmap))
+            self.assertEqual(fitch, toytree.infer.get_parsimony_score(tree, data, weights=unit))
+
+    def test_score_is_independent_of_rooting(self):
+        tree = toytree.rtree.rtree(20, seed=123)
+        data = pd.DataFrame(
+            self.rng.integers(0, 3, size=(20, 50)),
+            index=tree.get_tip_labels(),
+        )
+        tool = toytree.infer.Parsimony(data)
+        score = tool.get_score(tree)
+        for tip in ("r3", "r10"):
+            self.assertEqual(tool.get_score(tree.root(tip)), score)
+            self.assertEqual(tool.get_score(tree.root(tip).unroot()), score)
+
+    def test_site_patterns(self):
+        tree = toytree.rtree.rtree(10, seed=123)
+        seqs = {i: "".join(self.rng.choice(list("ACGT"), 20)) for i in tree.get_tip_labels()}
+        seqs = {i: j + j + "AAAA" for (i, j) in seqs.items()}
+        tool = toytree.infer.Parsimony(seqs)
+        self.assertLessEqual(tool.patterns.shape[1], 20)
+        self.assertEqual(tool.weights.sum(), (tool.site_index >= 0).sum())
+        scores = tool.get_pattern_scores(tree)
+        site_scores = np.where(tool.site_index >= 0, scores[tool.site_index], 0)
+        self.assertEqual(site_scores.sum(), tool.get_score(tree))
+        self.assertEqual(site_scores[:20].tolist(), site_scores[20:40].tolist())
+
+
+class TestParsimonySearch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(123)
+        self.tree = toytree.rtree.unittree(30, seed=123)
+        states = {self.tree.treenode.idx: rng.integers(0, 4, 200)}
+        for node in self.tree[::-1][1:]:
+            seq = states[node.up.idx].copy()
+            mask = rng.random(200) < 0.1
+            seq[mask] = rng.integers(0, 4, mask.sum())
+            states[node.idx] = seq
+        self.data = pd.DataFrame(
+            [np.array(list("ACGT"))[states[i]] for i in range(self.tree.ntips)],
+            index=self.tree.get_tip_labels(),
+        )
+
+    def test_cached_regraft_costs_match_rescoring(self):
+        from toytree.infer.src.parsimony_search import _ParsimonySearch
+        tool = toytree.infer.Parsimony(self.data)
+        search = _ParsimonySearch(tool, np.random.default_rng(123))
+        search.set_tree_stepwise(np.arange(self.tree.ntips))
+        score = search.get_score()
+        self.assertEqual(score, tool.get_score(search.get_tree(tool.names)))
+        while search.search(radius=None, deadline=None):
+            new_score = search.get_score()
+            self.assertLess(new_score, score)
+            self.assertEqual(new_score, tool.get_score(search.get_tree(tool.names)))
+            score = new_score
+
+    def test_search_improves_starting_tree(self):
+        tool = toytree.infer.Parsimony(self.data)
+        start = toytree.rtree.unittree(30, seed=321)
+        for method in ("nni", "spr"):
+            tree = toytree.infer.infer_parsimony_tree(tool, tree=start, method=method, seed=123)
+            self.assertEqual(sorted(tree.get_tip_labels()), sorted(self.data.index))
+            self.assertLess(tool.get_score(tree), tool.get_score(start))
+        tree = toytree.infer.infer_parsimony_tree(self.data, nstarts=3, seed=123)
+        self.assertLessEqual(tool.get_score(tree), tool.get_score(self.tree))
+
+    def test_search_start_tree_must_match_data(self):
+        tree = self.tree.mod.drop_tips(0, 1)
+        with self.assertRaisesRegex(toytree.utils.ToytreeError, self.tree[0].name):
+            toytree.infer.infer_parsimony_tree(self.data, tree=tree, seed=123)
+
+    def test_search_requires_named_data(self):
+        arr = self.data.to_numpy()
+        with self.assertRaises(toytree.utils.ToytreeError):
+            toytree.infer.infer_parsimony_tree(arr, seed=123)
+        names = list(self.data.index)
+        tree = toytree.infer.infer_parsimony_tree(arr, names=names, seed=123)
+        score = toytree.infer.Parsimony(arr, names=names).get_score(tree)
+        self.assertEqual(score, toytree.infer.get_parsimony_score(tree, self.data))
+
+
+if __name__ == "__main__":
+
+    unittest.main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+
+"""Test UPGMA and WPGMA tree inference.
+
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from scipy.cluster import hierarchy
+from scipy.spatial.distance import pdist, squareform
+import toytree
+
+
+class TestUPGMA(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(123)
+        self.cdists = pdist(rng.random((30, 5)))
+        self.dists = pd.DataFrame(
+            squareform(self.cdists),
+            index=[f"r{i}" for i in range(30)],
+        )
+
+    def test_linkage_matches_scipy(self):
+        for weighted, method in ((False, "average"), (True, "weighted")):
+            table = toytree.infer.get_upgma_linkage(self.dists, weighted=weighted)
+            self.assertTrue(np.allclose(table, hierarchy.linkage(self.cdists, method)))
+
+    def test_ultrametric_tree_from_clock_tree(self):
+        tree = toytree.rtree.unittree(20, treeheight=10, seed=123)
+        dists = tree.distance.get_tip_distance_matrix(df=True)
+        utree = toytree.infer.infer_upgma_tree(dists)
+        self.assertEqual(toytree.distance.get_treedist_rf(tree, utree), 0)
+        self.assertTrue(np.allclose(utree.get_node_data("height")[:20], 0))
+        self.assertAlmostEqual(utree.treenode.height, 10)
+
+
+if __name__ == "__main__":
+
+    unittest.main()
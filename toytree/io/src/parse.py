@@ -4,7 +4,7 @@
 
 """
 
-from typing import Union, TypeVar, List, Tuple, Mapping
+from typing import Union, TypeVar, List, Tuple, Mapping, Iterator, Dict
 import re
 from pathlib import Path
 from loguru import logger
@@ -154,6 +154,95 @@ def parse_tree_object(data: Union[str, Url, Path], **kwargs) -> Union[ToyTree, M
     return translate_node_names(tree, tdict)
 
 
+def iter_newicks_from_file(path: Union[str, Path]) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Generator to yield (newick, translate dict) from a tree file.
+
+    The file is read line by line so that only a single newick string
+    is held in memory at a time. This supports the same newick (one
+    tree per ';'-terminated entry) and NEXUS (trees block with an
+    optional translate block) formats as `parse_multitree`, but does
+    not support URLs or str data.
+    """
+    path = Path(path).expanduser()
+    if not path.exists():
+        raise IOError(f"Path {path} does not exist.")
+
+    with open(path, 'r', encoding='utf-8') as indata:
+        # find the first non-empty line to check the format
+        for line in indata:
+            if line.strip():
+                break
+        else:
+            return
+
+        # newick: accumulate lines until a semicolon ends each tree
+        if line.strip()[:6].upper() != "#NEXUS":
+            chunk = []
+            while True:
+                chunk.append(line.strip())
+                if chunk[-1].endswith(";"):
+                    yield replace_whitespace("".join(chunk)), {}
+                    chunk = []
+                line = next(indata, None)
+                if line is None:
+                    break
+            if "".join(chunk):
+                yield replace_whitespace("".join(chunk)), {}
+            return
+
+        # nexus: skip to the trees block
+        for line in indata:
+            if line.strip().lower().startswith("begin trees"):
+                break
+        else:
+            raise IOError("NEXUS file must contain a 'begin trees' block.")
+
+        # iterate over statements in the trees block ending in ';'
+        tdict = {}
+        statement = []
+        for line in indata:
+            statement.append(line.strip())
+            if not statement[-1].endswith(";"):
+                continue
+            text = " ".join(statement).strip()
+            statement = []
+            key = text.split(None, 1)[0].lower() if text else ""
+
+            # end of the trees block
+            if key in ("end;", "endblock;"):
+                break
+
+            # translate: comma separated 'label name' entries
+            if key == "translate":
+                for item in text[9:].rstrip(";").split(","):
+                    if item.strip():
+                        label, value = item.strip().split(None, 1)
+                        tdict[label] = value.strip()
+
+            # tree: ignore name, optional * and [&R] before the newick
+            elif key == "tree":
+                data = text.split("=", 1)[1]
+                yield replace_whitespace(data[data.find("("):]), tdict
+
+
+def iter_trees_from_file(path: Union[str, Path], **kwargs) -> Iterator[ToyTree]:
+    """Generator to yield ToyTrees parsed one at a time from a file.
+
+    This is a memory-efficient alternative to `toytree.mtree` for
+    files containing many trees (e.g., a posterior sample of trees)
+    that only need to be visited once. Additional kwargs are passed
+    to `parse_newick_string`.
+
+    Examples
+    --------
+    >>> for tree in iter_trees_from_file("posterior.trees"):
+    >>>     print(tree.ntips)
+    """
+    for nwk, tdict in iter_newicks_from_file(path):
+        tree = parse_newick_string(nwk, **kwargs)
+        yield translate_node_names(tree, tdict)
+
+
 if __name__ == "__main__":
 
     TEST = "/home/deren/Downloads/Clustal_Omega_Dec3.txt"
@@ -42,9 +42,9 @@ def root_on_midpoint(tree: ToyTree, inplace: bool = False) -> ToyTree:
 
     Rooting on the "midpoint" assumes a clock-like evolutionary rate
     (i.e., branch lengths are equal to time) and may yield odd results
-    when this assumption is violated. This algorithm calculates the
-    pairwise path length between all tips in an unrooted tree and roots
-    on the midpoint of the longest path.
+    when this assumption is violated. This algorithm finds the longest
+    path between any two tips in the tree (its diameter) in linear time
+    and roots on the midpoint of this path.
 
     Parameters
     ----------
@@ -64,15 +64,17 @@ def root_on_midpoint(tree: ToyTree, inplace: bool = False) -> ToyTree:
     >>> tree = toytree.rtree.unittree(10).unroot()
     >>> rtree = tree.mod.root_by_midpoint()
     """
-    # get matrix of pairwise tip distances
-    dmat = tree.distance.get_tip_distance_matrix()
-
-    # get any pair of Nodes that span the max distance
-    pairs = np.where(dmat == dmat.max())
-    n0, n1 = pairs[0][0], pairs[1][0]
+    # get a pair of Nodes that span the max distance in O(n) time
+    diameter, node0, node1 = tree.distance.get_tree_diameter(return_nodes=True)
+    n0, n1 = node0._idx, node1._idx
 
     # midpoint is half this distance
-    dist_to_new_root = dmat[n0, n1] / 2.
+    dist_to_new_root = diameter / 2.
+
+    # the diameter is computed from Node depths and can differ by
+    # float rounding from the sum of edges along the path, so edges
+    # are compared with a tolerance and root_dist is clamped.
+    eps = 1e-9 * max(1., diameter)
 
     # going up this dist from one of the two Nodes will hit the
     # pseudo-root, but not for the other. Select the other.
@@ -81,9 +83,9 @@ def root_on_midpoint(tree: ToyTree, inplace: bool = False) -> ToyTree:
         dist_below = 0.
         while 1:
             # this is the correct edge to root on
-            if (node._dist + dist_below) >= dist_to_new_root:
+            if (node._dist + dist_below) >= dist_to_new_root - eps:
                 root_node = node
-                root_node_dist = dist_to_new_root - dist_below
+                root_node_dist = min(max(dist_to_new_root - dist_below, 0.), node._dist)
                 break
 
             # cannot test any higher, restart from other tip Node.
@@ -191,12 +193,11 @@ def root_on_minimal_ancestor_deviation(
     dmat[dmat < min_dist] = min_dist
     dmat[np.diag_indices_from(dmat)] = 0.
 
-    # store paths between pairs of tips, {(0, 2): [1, 5, 2]... }
-    paths = {}
-    for path in itertools.combinations(range(tree.ntips), 2):
-        node_path = tree.distance.get_node_path(*path)
-        paths[path] = [i.idx for i in node_path][1:-1]
-        paths[path[::-1]] = paths[path][::-1]
+    # get LCA of every tip and every Node, used to find the Node on the
+    # path between two tips closest to a third Node (their median).
+    levels = tree.distance.get_node_path_lengths(tree.nnodes - 1, range(tree.nnodes), True)
+    lcas = tree.distance.get_node_lcas(
+        np.arange(tree.ntips)[:, None], np.arange(tree.nnodes)[None, :])
 
     # get npairs and a dict to store the Rbranch statistics
     npairs = int((tree.ntips * (tree.ntips - 1)) / 2)
@@ -238,7 +239,7 @@ def root_on_minimal_ancestor_deviation(
         # iterate over pairs of tips both in seti
         for tipb, tipc in itertools.combinations(seti, 2):
             dbc = dmat[tipb, tipc]
-            aidx = max(paths[(tipb, tipc)])
+            aidx = lcas[tipb, tipc]
             dab = dmat[tipb, aidx]
             relative_deviations[pidx] = abs(((2 * dab) / dbc) - 1)
             pidx += 1
@@ -247,7 +248,7 @@ def root_on_minimal_ancestor_deviation(
         above_j = setj - set(i._idx for i in node_j.iter_descendants())
         for tipb, tipc in itertools.combinations(above_j, 2):
             dbc = dmat[tipb, tipc]
-            aidx = min(paths[(tipb, tipc)], key=lambda x: dmat[jdx, x])
+            aidx = max(lcas[tipb, tipc], lcas[tipb, jdx], lcas[tipc, jdx], key=lambda x: levels[x])
             dab = dmat[tipb, aidx]
             relative_deviations[pidx] = abs(((2 * dab) / dbc) - 1)
             pidx += 1
@@ -256,7 +257,7 @@ def root_on_minimal_ancestor_deviation(
         below_j = setj - above_j
         for tipb, tipc in itertools.combinations(below_j, 2):
             dbc = dmat[tipb, tipc]
-            aidx = max(paths[(tipb, tipc)])
+            aidx = lcas[tipb, tipc]
             dab = dmat[tipb, aidx]
             relative_deviations[pidx] = abs(((2 * dab) / dbc) - 1)
             pidx += 1
@@ -174,6 +174,20 @@ class TestRoot(unittest.TestCase):
                 dist = tre.distance.get_node_distance(m1, m2)
                 self.assertAlmostEqual(odist, dist)
 
+    def test_root_on_midpoint(self):
+        """Midpoint rooting splits the tree diameter into equal halves."""
+        for seed in range(20):
+            for tree in (
+                toytree.rtree.unittree(12, seed=seed),
+                toytree.rtree.bdtree(12, seed=seed),
+            ):
+                rtree = toytree.mod.root_on_midpoint(tree)
+                heights = [i.height for i in rtree.treenode.children]
+                dists = [i.dist for i in rtree.treenode.children]
+                diameter = tree.distance.get_tree_diameter()
+                self.assertAlmostEqual(max(heights[0] + dists[0], heights[1] + dists[1]), diameter / 2)
+                self.assertTrue(all(i >= 0 for i in dists))
+
     def test_root_dist_midpoint_default(self):
         """The root_dist arg uses midpoint as default."""
 